@@ -0,0 +1,49 @@
+"""Chat transcripts for AIDA conversation analysis
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 00:00:00.000000
+
+Table chat_transcripts : chaque tour de conversation AIDA (question, reponse,
+chemin de traitement), ecrit par lots par le backend (TranscriptSink).
+
+RLS activee sans policy : la table n'est accessible que via service_role
+(backend), comme les tables admin-only de la migration 007.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS chat_transcripts (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            session_id TEXT NOT NULL,
+            user_id UUID REFERENCES user_profiles(id) ON DELETE SET NULL,
+            user_message TEXT NOT NULL,
+            assistant_reply TEXT NOT NULL,
+            path TEXT NOT NULL, -- 'llm', 'cache', 'off_domain', 'rejected'
+            intent TEXT, -- intention detectee pour les refus hors-domaine
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+    """)
+
+    # Pas de policy -> acces refuse par defaut pour anon/authenticated
+    op.execute("ALTER TABLE chat_transcripts ENABLE ROW LEVEL SECURITY;")
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chat_transcripts_created_at ON chat_transcripts(created_at);
+        CREATE INDEX IF NOT EXISTS idx_chat_transcripts_session_id ON chat_transcripts(session_id);
+        CREATE INDEX IF NOT EXISTS idx_chat_transcripts_path ON chat_transcripts(path);
+    """)
+
+
+def downgrade() -> None:
+    # Les index sont supprimes avec la table
+    op.execute("DROP TABLE IF EXISTS chat_transcripts;")
@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, Query, Request
 from app.core.logging import get_logger
 from app.core.security import get_current_admin, get_current_super_admin
 from app.repositories.admin.careers_repository import get_careers_admin_repository
+from app.services.recommendation_table import recommendation_table
 from app.schemas.admin.careers import (
     CareerListResponse,
     CareerDetail,
@@ -143,6 +144,7 @@ async def create_career(
     """Creer une carriere."""
     repo = get_careers_admin_repository()
     result = await repo.create_career(body)
+    recommendation_table.upsert_career(result.model_dump())
     _log_audit(admin, "create", "career", result.id, body.model_dump())
     return result
 
@@ -158,6 +160,7 @@ async def update_career(
     """Modifier une carriere."""
     repo = get_careers_admin_repository()
     result = await repo.update_career(career_id, body)
+    recommendation_table.upsert_career(result.model_dump())
     _log_audit(admin, "update", "career", career_id, body.model_dump(exclude_unset=True))
     return result
 
@@ -172,5 +175,6 @@ async def delete_career(
     """Supprimer une carriere (super_admin)."""
     repo = get_careers_admin_repository()
     await repo.delete_career(career_id)
+    recommendation_table.remove_career(career_id)
     _log_audit(admin, "delete", "career", career_id)
     return {"success": True, "message": "Carriere supprimee"}
@@ -1,14 +1,18 @@
 """
 Admin — Gestion de la base de connaissances AÏDA.
 
-POST /admin/knowledge-base/refresh → Invalide le cache KB (force rechargement depuis Supabase)
+POST /admin/knowledge-base/refresh → Invalide le cache KB (tout ou une catégorie) et reconstruit l'index de recherche
 GET  /admin/knowledge-base/preview → Affiche le contenu actuel de la KB
 """
 
-from fastapi import APIRouter, Depends
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
 
 from app.core.security import get_current_admin
 from app.repositories.knowledge_base_repository import knowledge_base_repository
+from app.services.llm.kb_retriever import kb_retriever
 
 router = APIRouter()
 
@@ -17,17 +21,29 @@ router = APIRouter()
     "/refresh",
     summary="Rafraîchir le cache de la base de connaissances AÏDA",
     description=(
-        "Invalide le cache Redis et mémoire de la KB. "
-        "Le prochain appel à AÏDA rechargera les données depuis Supabase. "
-        "Utile après avoir ajouté ou modifié des entrées dans la table knowledge_base."
+        "Invalide le cache Redis et mémoire de la KB puis reconstruit l'index "
+        "de recherche BM25 depuis Supabase. "
+        "Utile après avoir ajouté ou modifié des entrées dans la table knowledge_base. "
+        "Avec `category`, seule cette catégorie est relue et recompilée."
     ),
 )
 async def refresh_knowledge_base(
+    category: Optional[str] = Query(None, description="Catégorie modifiée (toutes par défaut)"),
     admin=Depends(get_current_admin),
 ) -> dict:
-    knowledge_base_repository.invalidate_cache()
+    def _refresh() -> tuple[int, list[dict]]:
+        knowledge_base_repository.invalidate_cache(category)
+        return kb_retriever.rebuild(), knowledge_base_repository.get_compiled_categories()
+
+    # Lectures Supabase/Redis et tokenisation synchrones : hors de la boucle d'evenements
+    entries, categories = await asyncio.to_thread(_refresh)
     return {
-        "message": "Cache KB invalidé. La prochaine conversation AÏDA rechargera les données depuis Supabase.",
+        "message": "Cache KB invalidé et index de recherche reconstruit.",
+        "entries": entries,
+        "categories": [
+            {"category": c["category"], "version": c["version"], "hash": c["hash"], "entries": len(c["entries"])}
+            for c in categories
+        ],
         "admin": str(admin["user_id"]),
     }
 
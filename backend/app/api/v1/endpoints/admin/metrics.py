@@ -0,0 +1,65 @@
+"""
+Admin — Métriques applicatives (compteurs et latences en mémoire).
+
+GET /admin/metrics     → Tous les compteurs et histogrammes du worker
+GET /admin/metrics/llm → Agrégat AÏDA : providers, TTFT, débit, fallbacks, cache, quotas,
+                         file d'attente du chat, santé des backends
+
+Les valeurs sont propres au worker qui répond (registre en mémoire) et
+repartent de zéro à chaque redémarrage : elles ne sont pas agrégées entre
+les workers uvicorn. Chaque réponse porte le pid du worker ("worker") pour
+distinguer les séries d'un scraping à l'autre.
+"""
+
+import os
+
+from fastapi import APIRouter, Depends
+
+from app.core.metrics import metrics
+from app.core.security import get_current_admin
+from app.services.llm.concurrency_gate import chat_gate
+from app.services.llm.llm_metrics import llm_summary
+from app.services.llm_service import llm_service
+
+router = APIRouter()
+
+
+def _worker() -> dict:
+    """Identifie le worker dont le registre en mémoire est renvoyé."""
+    return {"pid": os.getpid()}
+
+
+@router.get(
+    "",
+    summary="Métriques brutes du worker",
+)
+async def get_metrics(
+    admin=Depends(get_current_admin),
+) -> dict:
+    return {**metrics.snapshot(), "worker": _worker()}
+
+
+@router.get(
+    "/llm",
+    summary="Métriques LLM d'AÏDA",
+    description=(
+        "Par provider (Groq, Ollama) : nombre d'appels, part du trafic, TTFT, "
+        "durée, débit de sortie et tokens estimés (p50/p95). Également : raisons "
+        "et taux de fallback, tours de conversation, refus hors-domaine sans LLM, "
+        "taille des prompts, replis de l'historique en résumé, transcriptions "
+        "écrites ou perdues, taux de hit du cache de réponses, débordements du "
+        "quota Groq, conversations en cours, profondeur et temps d'attente de "
+        "la file du chat, "
+        "disponibilité et latence lissée de chaque backend. "
+        "Valeurs du seul worker qui répond (pid dans `worker`)."
+    ),
+)
+async def get_llm_metrics(
+    admin=Depends(get_current_admin),
+) -> dict:
+    return {
+        **llm_summary(),
+        "chat_gate": chat_gate.stats(),
+        "backends": llm_service.health(),
+        "worker": _worker(),
+    }
@@ -1,13 +1,19 @@
 """Admin orientation tests management endpoints."""
 
+import asyncio
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query, Request
 
+from app.core.cache import get_cache
+from app.core.exceptions import AppException
 from app.core.logging import get_logger
 from app.core.security import get_current_admin, get_current_super_admin
 from app.repositories.admin.tests_repository import get_tests_admin_repository
+from app.repositories.orientation_repository import get_orientation_repository
+from app.services.rescoring_job import CacheCheckpoint, RescoringJob
 from app.schemas.admin.orientation import (
     TestListResponse,
     TestDetail,
@@ -17,6 +23,8 @@ from app.schemas.admin.orientation import (
     QuestionUpdate,
     OptionCreate,
     OptionUpdate,
+    RescoringRequest,
+    RescoringStatus,
 )
 
 
@@ -249,3 +257,93 @@ async def delete_option(
     repo = get_tests_admin_repository()
     await repo.delete_option(option_id)
     return {"success": True, "message": "Option supprimee"}
+
+
+# =========================================================================
+# RE-SCORING DES RESULTATS HISTORIQUES
+# =========================================================================
+
+_RESCORE_CHECKPOINT_KEY = "jobs:rescore:checkpoint"
+_RESCORE_STATUS_KEY = "jobs:rescore:status"
+_RESCORE_STATUS_TTL = 7 * 24 * 3600
+# Un job "running" sans progression depuis ce delai est considere comme mort
+_RESCORE_STALE_AFTER = timedelta(minutes=10)
+
+_rescore_task: Optional[asyncio.Task] = None
+
+
+def _save_rescore_status(state: dict) -> None:
+    get_cache().set(_RESCORE_STATUS_KEY, state, ttl=_RESCORE_STATUS_TTL)
+
+
+def _rescore_running_elsewhere() -> bool:
+    state = get_cache().get(_RESCORE_STATUS_KEY)
+    if not state or state.get("status") != "running":
+        return False
+    try:
+        updated_at = datetime.fromisoformat(state["updated_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return datetime.now(timezone.utc) - updated_at < _RESCORE_STALE_AFTER
+
+
+async def _run_rescoring(job: RescoringJob, resume: bool) -> None:
+    try:
+        await job.run(resume=resume)
+    except Exception as e:
+        logger.error(f"Rescoring job failed: {e}", exc_info=True)
+        state = get_cache().get(_RESCORE_STATUS_KEY) or {}
+        state.update({"status": "failed", "updated_at": datetime.now(timezone.utc).isoformat()})
+        _save_rescore_status(state)
+
+
+@router.post("/rescore", response_model=RescoringStatus, status_code=202)
+
+async def start_rescoring(
+    request: Request,
+    body: RescoringRequest,
+    admin: dict = Depends(get_current_super_admin),
+):
+    """
+    Lance le re-scoring en lot des resultats historiques (super_admin).
+    Le job tourne en tache de fond et reprend au dernier point de reprise.
+    """
+    global _rescore_task
+    if (_rescore_task and not _rescore_task.done()) or _rescore_running_elsewhere():
+        raise AppException(
+            message="Un re-scoring est deja en cours",
+            code="job_already_running",
+            status_code=409,
+        )
+
+    checkpoint = CacheCheckpoint(_RESCORE_CHECKPOINT_KEY)
+    if body.restart and not body.dry_run:
+        checkpoint.clear()
+
+    job = RescoringJob(
+        repo=get_orientation_repository(),
+        checkpoint=checkpoint,
+        batch_size=body.batch_size,
+        dry_run=body.dry_run,
+        on_progress=_save_rescore_status,
+    )
+    initial = {
+        **({} if body.dry_run or body.restart else (checkpoint.load() or {})),
+        "status": "running",
+        "dry_run": body.dry_run,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    _save_rescore_status(initial)
+    _rescore_task = asyncio.create_task(_run_rescoring(job, resume=not body.restart))
+    _log_audit(admin, "rescore", "test_results", None, body.model_dump())
+    return RescoringStatus(**initial)
+
+
+@router.get("/rescore/status", response_model=RescoringStatus)
+
+async def get_rescoring_status(
+    request: Request,
+    admin: dict = Depends(get_current_admin),
+):
+    """Progression du dernier re-scoring (debit, sessions traitees, point de reprise)."""
+    return RescoringStatus(**(get_cache().get(_RESCORE_STATUS_KEY) or {}))
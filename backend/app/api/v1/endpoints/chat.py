@@ -6,23 +6,46 @@ POST /api/v1/chat/message/stream   → Envoyer un message à AÏDA (SSE streamin
 DELETE /api/v1/chat/session/{session_id} → Effacer l'historique
 
 L'assistant AÏDA utilise Groq (gratuit) avec llama-3.1-8b-instant.
+Le nombre de conversations simultanées est borné (chat_gate) : au-delà d'une
+courte file d'attente, réponse 503 immédiate avec Retry-After.
+
+Streaming : si l'élève ferme l'app, la génération amont (requête httpx vers
+Groq/Ollama) est annulée aussitôt ; des commentaires SSE de heartbeat
+empêchent les proxys (nginx, Traefik) de couper ou bufferiser un stream muet.
 """
 
+import asyncio
 import json
+import logging
 import uuid
 from datetime import datetime, timezone
 from typing import AsyncGenerator, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
 
+from app.core.exceptions import ServiceOverloadedError
+from app.core.metrics import metrics
 from app.core.security import get_current_user_id
+from app.services.llm.concurrency_gate import chat_gate
+from app.services.llm.llm_metrics import CHAT_DISCONNECTS_METRIC
 from app.services.llm_service import llm_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Commentaire SSE envoyé après ce délai sans événement (proxys : timeout ~60s)
+SSE_HEARTBEAT_SECONDS = 15.0
+# Fréquence de vérification de la déconnexion du client
+DISCONNECT_POLL_SECONDS = 1.0
+SSE_HEARTBEAT = ": keep-alive\n\n"
+
+_STREAM_END = object()
+
 
 # ---------------------------------------------------------------------------
 # Schémas
@@ -63,7 +86,10 @@ class ChatRequest(BaseModel):
     history: Optional[list[HistoryMessage]] = Field(
         default=None,
         max_length=10,
-        description="Historique récent pour restaurer le contexte après redémarrage",
+        description=(
+            "Optionnel : historique récent, utilisé uniquement si la session "
+            "est inconnue du serveur (expirée)"
+        ),
     )
 
 
@@ -80,6 +106,62 @@ class SessionClearedResponse(BaseModel):
     session_id: str
 
 
+# ---------------------------------------------------------------------------
+# Streaming SSE
+# ---------------------------------------------------------------------------
+
+
+async def _relay_until_disconnect(
+    http_request: Request,
+    source: AsyncGenerator[dict, None],
+) -> AsyncGenerator[Optional[dict], None]:
+    """
+    Relaie les événements de `source` tant que le client est connecté.
+
+    La source est consommée par une tâche dédiée : dès que la déconnexion est
+    détectée, la tâche est annulée, ce qui ferme la requête httpx amont et
+    arrête la génération (et la consommation du quota Groq). Yield None quand
+    aucun événement n'est arrivé depuis SSE_HEARTBEAT_SECONDS.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for event in source:
+                queue.put_nowait(event)
+        except Exception as exc:
+            queue.put_nowait(exc)
+        finally:
+            queue.put_nowait(_STREAM_END)
+
+    task = asyncio.ensure_future(pump())
+    loop = asyncio.get_running_loop()
+    last_sent = loop.time()
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=DISCONNECT_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                if await http_request.is_disconnected():
+                    metrics.incr(CHAT_DISCONNECTS_METRIC)
+                    logger.info("Client SSE déconnecté — génération AÏDA annulée")
+                    return
+                if loop.time() - last_sent >= SSE_HEARTBEAT_SECONDS:
+                    last_sent = loop.time()
+                    yield None
+                continue
+            if event is _STREAM_END:
+                return
+            if isinstance(event, Exception):
+                raise event
+            last_sent = loop.time()
+            yield event
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await source.aclose()
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
@@ -109,12 +191,16 @@ async def send_message(
         client_history = [h.model_dump() for h in request.history]
 
     try:
-        result = await llm_service.chat(
-            message=request.message,
-            session_id=session_id,
-            orientation_context=context_dict,
-            client_history=client_history,
-        )
+        async with chat_gate.slot():
+            result = await llm_service.chat(
+                message=request.message,
+                session_id=session_id,
+                orientation_context=context_dict,
+                client_history=client_history,
+                user_id=str(user_id),
+            )
+    except ServiceOverloadedError:
+        raise
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -142,11 +228,13 @@ async def send_message(
         200: {
             "content": {"text/event-stream": {}},
             "description": "Stream SSE de la réponse AÏDA",
-        }
+        },
+        503: {"description": "Trop de conversations en cours — réessayer après Retry-After"},
     },
 )
 async def send_message_stream(
     request: ChatRequest,
+    http_request: Request,
     user_id: UUID = Depends(get_current_user_id),
 ) -> StreamingResponse:
     session_id = request.session_id or f"{user_id}:{uuid.uuid4()}"
@@ -159,28 +247,44 @@ async def send_message_stream(
     if request.history:
         client_history = [h.model_dump() for h in request.history]
 
+    # Avant l'envoi des en-têtes SSE : un rejet reste un 503 rapide
+    lease = await chat_gate.acquire()
+
     async def event_generator() -> AsyncGenerator[str, None]:
+        events = _relay_until_disconnect(http_request, llm_service.chat_stream(
+            message=request.message,
+            session_id=session_id,
+            orientation_context=context_dict,
+            client_history=client_history,
+            user_id=str(user_id),
+        ))
         try:
-            async for chunk in llm_service.chat_stream(
-                message=request.message,
-                session_id=session_id,
-                orientation_context=context_dict,
-                client_history=client_history,
-            ):
-                if chunk.get("done"):
+            async for chunk in events:
+                if chunk is None:
+                    yield SSE_HEARTBEAT
+                elif chunk.get("done"):
                     yield f"data: {json.dumps({'done': True, 'session_id': session_id})}\n\n"
                 else:
                     content = chunk.get("chunk", "")
                     yield f"data: {json.dumps({'chunk': content})}\n\n"
         except Exception:
             yield f"data: {json.dumps({'error': 'Le service AÏDA est temporairement indisponible.'})}\n\n"
+        finally:
+            await events.aclose()
+            chat_gate.release(lease)
 
     return StreamingResponse(
         event_generator(),
+        # Client parti avant le premier chunk : le générateur ne démarre jamais
+        # (pas de finally), le créneau est rendu après la réponse (release idempotent)
+        background=BackgroundTask(chat_gate.release, lease),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "X-Accel-Buffering": "no",
+            # Écarte le GZipMiddleware, qui bufferise le stream jusqu'à la fin
+            # pour tout client qui accepte gzip (TTFT = durée totale)
+            "Content-Encoding": "identity",
         },
     )
 
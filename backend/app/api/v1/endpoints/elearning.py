@@ -16,7 +16,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.core.cache import get_cache, TTL_LISTS
-from app.core.security import get_current_user_id, get_user_from_token
+from app.core.security import get_current_user_id, get_user_from_token_async
 from app.repositories.elearning_repository import elearning_repository
 from app.schemas.elearning import (
     CourseListItem,
@@ -45,7 +45,7 @@ async def get_optional_user_id(
     if credentials is None:
         return None
     try:
-        user_data = get_user_from_token(credentials.credentials)
+        user_data = await get_user_from_token_async(credentials.credentials)
         return UUID(user_data["user_id"])
     except Exception:
         return None
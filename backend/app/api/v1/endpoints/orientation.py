@@ -12,7 +12,7 @@ Gere:
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 
 from app.core.logging import get_logger
 from app.core.exceptions import TestNotFoundError, QueryError
@@ -34,6 +34,7 @@ from app.schemas.orientation import (
 )
 from app.services.orientation_engine import orientation_engine
 from app.services.career_matcher import career_matcher
+from app.services.submission_dedup import submission_dedup
 from app.repositories.orientation_repository import (
     get_orientation_repository,
     OrientationRepository,
@@ -203,8 +204,10 @@ async def get_mobile_career(
 @strict_limit("30/minute")
 async def submit_test(
     request: Request,
+    response: Response,
     test_id: UUID,
     submission: TestSubmission,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=128),
     user_id: Optional[UUID] = Depends(get_current_user_id_optional),
     repo: OrientationRepository = Depends(get_repo),
 ):
@@ -214,7 +217,36 @@ async def submit_test(
     et les programmes scolaires recommandes.
     L'authentification est optionnelle: les resultats sont toujours calcules,
     mais la session n'est sauvegardee que pour les utilisateurs connectes.
+
+    Idempotente: un renvoi identique (meme en-tete Idempotency-Key, ou a defaut
+    memes utilisateur, test et reponses) dans la fenetre de deduplication
+    rejoue le resultat deja calcule sans recreer de session.
     """
+    dedup_key, fingerprint = submission_dedup.key_for(
+        user_id, test_id, submission.responses, idempotency_key
+    )
+    replayed = await submission_dedup.begin(dedup_key, fingerprint)
+    if replayed is not None:
+        response.headers["Idempotent-Replayed"] = "true"
+        return replayed
+
+    try:
+        result = await _score_and_save(test_id, submission, user_id, repo)
+    except Exception:
+        submission_dedup.abort(dedup_key)
+        raise
+
+    submission_dedup.complete(dedup_key, fingerprint, result)
+    return result
+
+
+async def _score_and_save(
+    test_id: UUID,
+    submission: TestSubmission,
+    user_id: Optional[UUID],
+    repo: OrientationRepository,
+) -> TestResult:
+    """Calcule, enrichit et (si connecte) sauvegarde le resultat d'une soumission."""
     try:
         test = await repo.get_test_by_id(test_id)
         test_type = test["type"]
@@ -334,6 +366,11 @@ async def get_recommendations(
     }
     full_traits = [trait_mapping.get(t, t) for t in trait_list]
 
+    # Table pre-calculee par code de profil (lecture O(1) apres la premiere requete)
+    ranked = await career_matcher.recommend_for_traits(full_traits, repo, limit=limit)
+    if ranked is not None:
+        return ranked
+
     try:
         careers = await repo.get_careers_by_traits(full_traits, limit=limit)
         return [
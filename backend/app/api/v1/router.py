@@ -12,6 +12,7 @@ from app.api.v1.endpoints.admin import (
     mentors as admin_mentors,
     settings as admin_settings,
     knowledge_base as admin_knowledge_base,
+    metrics as admin_metrics,
 )
 from app.api.v1.endpoints.school import (
     auth as school_auth,
@@ -53,6 +54,7 @@ api_router.include_router(admin_gamification.router, prefix="/admin/gamification
 api_router.include_router(admin_mentors.router, prefix="/admin/mentors", tags=["admin-mentors"])
 api_router.include_router(admin_settings.router, prefix="/admin", tags=["admin-settings"])
 api_router.include_router(admin_knowledge_base.router, prefix="/admin/knowledge-base", tags=["admin-knowledge-base"])
+api_router.include_router(admin_metrics.router, prefix="/admin/metrics", tags=["admin-metrics"])
 
 # =============================================================================
 # SCHOOL ADMIN ENDPOINTS
@@ -73,6 +73,11 @@ class CacheClient:
             self._redis = None
             return None
 
+    @property
+    def redis(self):
+        """Client Redis brut (None si indisponible) pour les structures non clé/valeur."""
+        return self._get_redis()
+
     def get(self, key: str) -> Optional[Any]:
         """
         Recupere une valeur du cache.
@@ -130,6 +135,60 @@ class CacheClient:
             self._memory_cache.clear()
         self._memory_cache[key] = (value, time.time() + ttl)
 
+    def add(self, key: str, value: Any, ttl: int = TTL_LISTS) -> bool:
+        """
+        Stocke une valeur uniquement si la cle n'existe pas (SET NX).
+
+        Args:
+            key: Cle de cache
+            value: Valeur a cacher (doit etre serialisable JSON)
+            ttl: Duree de vie en secondes
+
+        Returns:
+            True si la cle a ete creee, False si elle existait deja
+        """
+        redis = self._get_redis()
+
+        if redis:
+            try:
+                return bool(redis.set(key, json.dumps(value, default=str), ex=ttl, nx=True))
+            except Exception as e:
+                logger.warning(f"Redis add error for '{key}': {e}")
+                # Fallback vers memoire
+
+        if self.get(key) is not None:
+            return False
+        self.set(key, value, ttl)
+        return True
+
+    def incr(self, key: str, ttl: int = TTL_LISTS) -> int:
+        """
+        Incremente atomiquement un compteur (INCR) et renouvelle sa duree de vie.
+
+        Args:
+            key: Cle du compteur (creee a 1 si absente)
+            ttl: Duree de vie en secondes
+
+        Returns:
+            Nouvelle valeur du compteur
+        """
+        redis = self._get_redis()
+
+        if redis:
+            try:
+                pipe = redis.pipeline()
+                pipe.incr(key)
+                pipe.expire(key, ttl)
+                value, _ = pipe.execute()
+                return int(value)
+            except Exception as e:
+                logger.warning(f"Redis incr error for '{key}': {e}")
+                # Fallback vers memoire
+
+        value = int(self.get(key) or 0) + 1
+        self.set(key, value, ttl)
+        return value
+
     def delete(self, key: str) -> None:
         """Supprime une cle du cache."""
         redis = self._get_redis()
@@ -22,6 +22,12 @@ class Settings(BaseSettings):
     # Recommande en production : valide les tokens Supabase localement (0 appel reseau)
     # Generer depuis Supabase Dashboard > Settings > API > JWT Secret
     SUPABASE_JWT_SECRET: Optional[str] = None
+    # Cles publiques de signature (JWKS) pour les tokens ES256/RS256, rafraichies en tache de fond
+    # Par defaut : {SUPABASE_URL}/auth/v1/.well-known/jwks.json
+    SUPABASE_JWKS_URL: Optional[str] = None
+    AUTH_JWKS_REFRESH_SECONDS: int = 600
+    # Un token rejete est refuse pendant ce delai (s) sans nouvelle verification
+    AUTH_REJECTED_TOKEN_TTL_SECONDS: int = 30
 
     # SECRET_KEY : sert a signer les tokens JWT internes (reset mot de passe,
     # tokens de session internes). Generer avec : python -c "import secrets; print(secrets.token_urlsafe(48))"
@@ -35,6 +41,33 @@ class Settings(BaseSettings):
 
     # LLM - AÏDA
     GROQ_API_KEY: Optional[str] = None
+    # Plafond memoire des sessions de chat gardees dans le process (fallback sans Redis)
+    CHAT_SESSION_MEMORY_MB: int = 32
+    # Budget de tokens d'entree par appel LLM (prompt systeme + KB + historique + message)
+    CHAT_INPUT_TOKEN_BUDGET: int = 3000
+    # Quotas Groq (free tier llama-3.1-8b-instant), partages entre workers via Redis
+    GROQ_REQUESTS_PER_MINUTE: int = 30
+    GROQ_REQUESTS_PER_DAY: int = 14400
+    GROQ_TOKENS_PER_MINUTE: int = 6000
+    # Sans premier token Groq apres ce delai (s), Ollama est lance en parallele
+    CHAT_HEDGE_TTFT_SECONDS: float = 2.5
+    # Intervalle (s) de la sonde de sante d'Ollama ; un backend en panne est reessaye apres ce delai
+    LLM_HEALTH_INTERVAL_SECONDS: float = 15.0
+    # Confiance minimale du classifieur local pour refuser un message hors-domaine sans LLM
+    # (> 1 = desactive ; calibree en leave-one-out sur intent_dataset : aucun refus a tort)
+    CHAT_OFF_DOMAIN_THRESHOLD: float = 0.9
+    # Conversations AIDA simultanees : par worker et pour tout le cluster (Redis, 0 = sans limite)
+    CHAT_MAX_CONCURRENT_PER_WORKER: int = 20
+    CHAT_MAX_CONCURRENT_GLOBAL: int = 60
+    # File d'attente courte au-dela de la limite, puis 503 + Retry-After
+    CHAT_QUEUE_MAX_WAITERS: int = 10
+    CHAT_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    # Transcriptions du chat ecrites par lots dans Supabase : taille d'un lot,
+    # delai max avant ecriture (s) et plafond du tampon (au-dela, tours perdus et comptes)
+    CHAT_TRANSCRIPTS_ENABLED: bool = True
+    CHAT_TRANSCRIPT_BATCH_SIZE: int = 50
+    CHAT_TRANSCRIPT_FLUSH_SECONDS: float = 5.0
+    CHAT_TRANSCRIPT_MAX_BUFFERED: int = 2000
 
     # CORS - Liste vide par defaut, doit etre configuree
     BACKEND_CORS_ORIGINS: list[str] = []
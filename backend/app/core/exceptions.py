@@ -21,11 +21,13 @@ class AppException(Exception):
         code: str = "app_error",
         status_code: int = status.HTTP_400_BAD_REQUEST,
         details: Optional[dict[str, Any]] = None,
+        headers: Optional[dict[str, str]] = None,
     ):
         self.message = message
         self.code = code
         self.status_code = status_code
         self.details = details or {}
+        self.headers = headers or {}
         super().__init__(self.message)
 
     def to_dict(self) -> dict[str, Any]:
@@ -43,6 +45,7 @@ class AppException(Exception):
         return HTTPException(
             status_code=self.status_code,
             detail=self.to_dict(),
+            headers=self.headers or None,
         )
 
 
@@ -254,6 +257,34 @@ class TestAlreadyCompletedError(TestSessionError):
         )
 
 
+class SubmissionInProgressError(AppException):
+    """Soumission identique encore en cours de calcul."""
+
+    def __init__(self):
+        super().__init__(
+            message="Une soumission identique est deja en cours de traitement",
+            code="submission_in_progress",
+            status_code=status.HTTP_409_CONFLICT,
+        )
+
+
+class ServiceOverloadedError(AppException):
+    """Trop de requetes simultanees : le client doit reessayer plus tard."""
+
+    def __init__(
+        self,
+        retry_after: int,
+        message: str = "Service momentanement sature, reessayez dans quelques instants",
+    ):
+        super().__init__(
+            message=message,
+            code="service_overloaded",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            details={"retry_after": retry_after},
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 class InvalidTestResponseError(ValidationError):
     """Reponse de test invalide."""
 
@@ -0,0 +1,115 @@
+"""
+Cache des cles publiques de signature Supabase Auth (JWKS).
+
+Les projets Supabase a cles asymetriques signent les tokens en ES256/RS256 :
+sans ces cles, chaque token devait etre valide par un appel a l'API Auth.
+Ce module :
+- telecharge le JWKS au demarrage puis le rafraichit en tache de fond
+- sert les cles par `kid`, sans reseau, a la validation de chaque token
+- declenche un rafraichissement (limite en frequence) si un token porte un
+  `kid` inconnu : rotation de cle cote Supabase
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("core.jwks")
+
+# Algorithmes asymetriques acceptes pour les tokens Supabase
+ASYMMETRIC_ALGORITHMS = ("ES256", "RS256")
+
+_FETCH_TIMEOUT_SECONDS = 5.0
+# Intervalle minimal entre deux rafraichissements declenches par un kid inconnu
+_MIN_REFRESH_INTERVAL_SECONDS = 30.0
+
+
+def default_jwks_url() -> str:
+    return settings.SUPABASE_JWKS_URL or f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+
+
+class JWKSCache:
+    """Cles publiques Supabase par kid, rafraichies en tache de fond."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        refresh_interval: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._url = url
+        self._refresh_interval = refresh_interval or settings.AUTH_JWKS_REFRESH_SECONDS
+        self._transport = transport
+        self._keys: dict[str, dict] = {}
+        self._last_attempt = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        """Cle publique (JWK) du kid, ou None si inconnue."""
+        return self._keys.get(kid) if kid else None
+
+    async def refresh(self) -> bool:
+        """Telecharge le JWKS ; les cles precedentes sont gardees en cas d'echec."""
+        self._last_attempt = time.monotonic()
+        try:
+            async with httpx.AsyncClient(transport=self._transport, timeout=_FETCH_TIMEOUT_SECONDS) as client:
+                response = await client.get(self._url or default_jwks_url())
+                response.raise_for_status()
+                keys = {
+                    key["kid"]: key
+                    for key in response.json().get("keys", [])
+                    if key.get("kid") and key.get("alg", "ES256") in ASYMMETRIC_ALGORITHMS
+                }
+        except Exception as e:
+            logger.warning(f"JWKS refresh failed: {e}")
+            return False
+
+        if set(keys) != set(self._keys):
+            logger.info(f"JWKS refreshed: {len(keys)} signing key(s)")
+        self._keys = keys
+        return True
+
+    def request_refresh(self) -> None:
+        """
+        Rafraichissement anticipe (kid inconnu), sans attendre le resultat.
+        Au plus un toutes les _MIN_REFRESH_INTERVAL_SECONDS.
+        """
+        if self._pending is not None and not self._pending.done():
+            return
+        if time.monotonic() - self._last_attempt < _MIN_REFRESH_INTERVAL_SECONDS:
+            return
+        try:
+            self._pending = asyncio.get_running_loop().create_task(self.refresh())
+        except RuntimeError:
+            pass  # Hors boucle d'evenements (thread, script) : prochain cycle de fond
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self._refresh_interval)
+
+    def start(self) -> None:
+        """Lance le rafraichissement periodique (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._pending):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(t for t in (self._task, self._pending) if t is not None), return_exceptions=True)
+        self._task = None
+        self._pending = None
+
+
+# Singleton
+jwks_cache = JWKSCache()
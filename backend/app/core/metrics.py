@@ -0,0 +1,143 @@
+"""
+Metriques applicatives en memoire pour ActivEducation API.
+
+Compteurs et histogrammes etiquetes, propres a chaque worker (pas de
+dependance externe). Lus par les endpoints admin et les scripts de mesure.
+
+Usage:
+    from app.core.metrics import metrics
+    metrics.incr("aida_answer_cache", result="hit")
+    metrics.ratio("aida_answer_cache", "result", "hit")
+    metrics.observe("aida_llm_ttft_seconds", 0.42, provider="groq")
+    metrics.summary("aida_llm_ttft_seconds", provider="groq")  # count, avg, p50, p95, max
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Any
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+# Observations conservees par serie d'histogramme pour les percentiles
+HISTOGRAM_WINDOW = 2048
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Percentile (rang le plus proche) d'une liste triee non vide."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class _Histogram:
+    """Nombre et somme de toutes les observations + fenetre des plus recentes."""
+
+    __slots__ = ("count", "total", "recent")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.recent: deque[float] = deque(maxlen=HISTOGRAM_WINDOW)
+
+
+class Metrics:
+    """Registre de compteurs et d'histogrammes etiquetes (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Incremente un compteur."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def count(self, name: str, **labels: Any) -> float:
+        """Somme des series d'un compteur correspondant aux etiquettes donnees."""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(
+                value
+                for key, value in self._counters.get(name, {}).items()
+                if wanted.issubset(key)
+            )
+
+    def ratio(self, name: str, label: str, value: str) -> float:
+        """Part des evenements ou `label == value` (ex: taux de hit d'un cache)."""
+        total = self.count(name)
+        return self.count(name, **{label: value}) / total if total else 0.0
+
+    def label_values(self, name: str, label: str) -> list[str]:
+        """Valeurs prises par une etiquette dans un compteur ou un histogramme."""
+        with self._lock:
+            keys = list(self._counters.get(name, {})) + list(self._histograms.get(name, {}))
+        return sorted({v for key in keys for k, v in key if k == label})
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Ajoute une observation a un histogramme (latence, taille...)."""
+        key = _label_key(labels)
+        with self._lock:
+            histogram = self._histograms.setdefault(name, {}).setdefault(key, _Histogram())
+            histogram.count += 1
+            histogram.total += value
+            histogram.recent.append(value)
+
+    def summary(self, name: str, **labels: Any) -> dict[str, float]:
+        """
+        Resume des series d'un histogramme correspondant aux etiquettes.
+
+        count et avg portent sur toutes les observations ; p50, p95 et max
+        sur les HISTOGRAM_WINDOW plus recentes de chaque serie.
+        """
+        wanted = set(_label_key(labels))
+        count, total = 0, 0.0
+        recent: list[float] = []
+        with self._lock:
+            for key, histogram in self._histograms.get(name, {}).items():
+                if wanted.issubset(key):
+                    count += histogram.count
+                    total += histogram.total
+                    recent.extend(histogram.recent)
+        if not count:
+            return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        recent.sort()
+        return {
+            "count": count,
+            "avg": total / count,
+            "p50": _percentile(recent, 0.50),
+            "p95": _percentile(recent, 0.95),
+            "max": recent[-1],
+        }
+
+    def snapshot(self) -> dict[str, dict[str, list[dict[str, Any]]]]:
+        """Etat courant de tous les compteurs et histogrammes, serialisable JSON."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in sorted(series.items())]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {name: [dict(key) for key in sorted(series)] for name, series in sorted(self._histograms.items())}
+        return {
+            "counters": counters,
+            "histograms": {
+                name: [{"labels": labels, **self.summary(name, **labels)} for labels in series]
+                for name, series in histograms.items()
+            },
+        }
+
+    def reset(self) -> None:
+        """Remet tous les compteurs et histogrammes a zero (tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Singleton global
+metrics = Metrics()
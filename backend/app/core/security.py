@@ -2,11 +2,15 @@
 Module de securite pour l'authentification via Supabase Auth.
 
 Gere:
-- Validation des tokens Supabase JWT
+- Validation locale des tokens Supabase JWT (secret HS256 ou cles JWKS
+  ES256/RS256), l'API Supabase Auth n'etant appelee qu'en dernier recours
 - Dependencies FastAPI pour l'authentification
 - Cache des tokens valides (evite d'appeler Supabase a chaque requete)
+- Cache court des tokens rejetes (un client qui reessaie un mauvais token
+  ne declenche aucune nouvelle verification)
 """
 
+import asyncio
 import hashlib
 from typing import Any, Optional
 from uuid import UUID
@@ -17,6 +21,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.cache import get_cache
+from app.core.jwks import ASYMMETRIC_ALGORITHMS, jwks_cache
 from app.core.exceptions import (
     AuthenticationError,
     TokenExpiredError,
@@ -36,10 +41,17 @@ _TOKEN_CACHE_TTL_SECONDS = 60
 _ADMIN_LOOKUP_CACHE_TTL_SECONDS = 60
 
 
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def _token_cache_key(token: str) -> str:
     """Cle de cache deterministe sans exposer le token brut en clair."""
-    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
-    return f"auth:token:{digest}"
+    return f"auth:token:{_token_digest(token)}"
+
+
+def _rejected_token_cache_key(token: str) -> str:
+    return f"auth:rejected:{_token_digest(token)}"
 
 
 def _get_cached_user(token: str) -> Optional[dict]:
@@ -59,6 +71,32 @@ def _cache_user(token: str, user_data: dict) -> None:
         logger.warning(f"Token cache write failed: {e}")
 
 
+def _cache_rejection(token: str, error: AuthenticationError) -> None:
+    """Memorise un rejet definitif (signature, format, expiration) pour ce token."""
+    reason = "expired" if isinstance(error, TokenExpiredError) else "invalid"
+    try:
+        get_cache().set(
+            _rejected_token_cache_key(token),
+            {"reason": reason},
+            ttl=settings.AUTH_REJECTED_TOKEN_TTL_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(f"Rejected token cache write failed: {e}")
+
+
+def _raise_if_rejected(token: str) -> None:
+    """Releve l'erreur d'origine si ce token a ete rejete recemment."""
+    try:
+        rejected = get_cache().get(_rejected_token_cache_key(token))
+    except Exception as e:
+        logger.warning(f"Rejected token cache read failed: {e}")
+        return
+    if rejected:
+        if rejected.get("reason") == "expired":
+            raise TokenExpiredError()
+        raise InvalidTokenError("Token invalide")
+
+
 def _admin_profile_cache_key(user_id: UUID) -> str:
     return f"auth:admin_profile:{user_id}"
 
@@ -87,12 +125,74 @@ def _cache_admin_profile(user_id: UUID, profile: dict) -> None:
 # =============================================================================
 
 
-def _validate_token_via_supabase(token: str) -> dict[str, Any]:
+def _user_from_claims(payload: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "user_id": payload["sub"],
+        "email": payload.get("email"),
+        "role": payload.get("role", "authenticated"),
+    }
+
+
+def _validate_token_locally(token: str) -> Optional[dict[str, Any]]:
+    """
+    Valide un token JWT sans reseau.
+
+    HS256 avec SUPABASE_JWT_SECRET, ES256/RS256 avec la cle JWKS du kid.
+
+    Returns:
+        Dict avec user_id, email, role ; None si aucune cle locale ne permet
+        de verifier ce token (pas de secret, kid inconnu, ou signature HS256
+        refusee : un SUPABASE_JWT_SECRET errone ou renouvele ne doit pas
+        bloquer tous les utilisateurs, l'API Supabase tranche)
+
+    Raises:
+        TokenExpiredError: Si le token est expire
+        InvalidTokenError: Si le token est malforme ou sa signature invalide
     """
-    Valide un token JWT aupres de Supabase et retourne les donnees utilisateur.
+    from jose import JWTError, jwt as jose_jwt
+    from jose.exceptions import ExpiredSignatureError
 
-    Essaie d'abord la validation locale (si SUPABASE_JWT_SECRET est configure),
-    sinon appelle l'API Supabase.
+    try:
+        header = jose_jwt.get_unverified_header(token)
+    except JWTError:
+        raise InvalidTokenError("Token invalide")
+
+    algorithm = header.get("alg")
+    key: Any
+    if algorithm == "HS256":
+        secret = settings.SUPABASE_JWT_SECRET
+        if not secret:
+            return None
+        key = secret
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        jwk = jwks_cache.get_key(header.get("kid"))
+        if jwk is None:
+            # Rotation de cle probable : le prochain token passera en local
+            jwks_cache.request_refresh()
+            return None
+        if jwk.get("alg", algorithm) != algorithm:
+            raise InvalidTokenError("Token invalide")
+        key = jwk
+    else:
+        raise InvalidTokenError("Token invalide")
+
+    try:
+        payload = jose_jwt.decode(token, key, algorithms=[algorithm], audience="authenticated")
+    except ExpiredSignatureError:
+        raise TokenExpiredError()
+    except JWTError as e:
+        if algorithm == "HS256":
+            logger.warning(f"Local HS256 validation failed, falling back to Supabase API: {e}")
+            return None
+        logger.warning(f"Local JWT validation failed: {e}")
+        raise InvalidTokenError("Token invalide")
+    return _user_from_claims(payload)
+
+
+def _validate_token_via_supabase(token: str) -> dict[str, Any]:
+    """
+    Valide un token JWT aupres de l'API Supabase Auth (appel reseau bloquant :
+    a executer hors de la boucle d'evenements).
 
     Args:
         token: Token JWT Supabase
@@ -104,37 +204,16 @@ def _validate_token_via_supabase(token: str) -> dict[str, Any]:
         TokenExpiredError: Si le token est expire
         InvalidTokenError: Si le token est invalide
     """
-    # Tentative de validation locale (performante, 0 reseau)
-    if settings.SUPABASE_JWT_SECRET:
-        try:
-            from jose import JWTError, jwt as jose_jwt
-            from jose.exceptions import ExpiredSignatureError
-
-            payload = jose_jwt.decode(
-                token,
-                settings.SUPABASE_JWT_SECRET,
-                algorithms=["HS256"],
-                audience="authenticated",
-            )
-            return {
-                "user_id": payload["sub"],
-                "email": payload.get("email"),
-                "role": payload.get("role", "authenticated"),
-            }
-        except ExpiredSignatureError:
-            raise TokenExpiredError()
-        except JWTError as e:
-            logger.warning(f"Local JWT validation failed, trying Supabase API: {e}")
-            # Fallback vers l'API Supabase
-
-    # Validation via API Supabase (si pas de JWT secret local)
     try:
         from app.db.supabase_client import get_supabase_client
         db = get_supabase_client()
         response = db.client.auth.get_user(token)
 
+        error: AuthenticationError
         if not response or not response.user:
-            raise InvalidTokenError("Token invalide")
+            error = InvalidTokenError("Token invalide")
+            _cache_rejection(token, error)
+            raise error
 
         return {
             "user_id": response.user.id,
@@ -147,15 +226,53 @@ def _validate_token_via_supabase(token: str) -> dict[str, Any]:
     except Exception as e:
         error_msg = str(e).lower()
         if "expired" in error_msg or "jwt expired" in error_msg:
-            raise TokenExpiredError()
+            error = TokenExpiredError()
+            _cache_rejection(token, error)
+            raise error
         logger.warning(f"Token validation error: {e}")
-        raise InvalidTokenError("Token invalide ou expire")
+        error = InvalidTokenError("Token invalide ou expire")
+        # Seul un refus explicite de Supabase (4xx) est memorise : une panne
+        # reseau ne doit pas bloquer un token valide
+        if 400 <= (getattr(e, "status", None) or 0) < 500:
+            _cache_rejection(token, error)
+        raise error
+
+
+def _get_user_without_network(token: str) -> Optional[dict[str, Any]]:
+    """
+    Cache des tokens valides, cache des rejets, puis validation locale.
+    None si seule l'API Supabase peut trancher.
+    """
+    cached = _get_cached_user(token)
+    if cached:
+        return cached
+
+    _raise_if_rejected(token)
+
+    try:
+        user_data = _validate_token_locally(token)
+    except (TokenExpiredError, InvalidTokenError) as e:
+        _cache_rejection(token, e)
+        raise
+
+    if user_data:
+        _cache_user(token, user_data)
+    return user_data
+
+
+def _get_user_via_supabase(token: str) -> dict[str, Any]:
+    user_data = _validate_token_via_supabase(token)
+    _cache_user(token, user_data)
+    return user_data
 
 
 def get_user_from_token(token: str) -> dict[str, Any]:
     """
     Valide un token et retourne les donnees utilisateur (avec cache).
 
+    Variante synchrone : hors d'une boucle d'evenements uniquement, l'appel
+    eventuel a l'API Supabase est bloquant (voir get_user_from_token_async).
+
     Args:
         token: Token JWT Supabase
 
@@ -165,12 +282,17 @@ def get_user_from_token(token: str) -> dict[str, Any]:
     Raises:
         TokenExpiredError, InvalidTokenError
     """
-    cached = _get_cached_user(token)
-    if cached:
-        return cached
+    return _get_user_without_network(token) or _get_user_via_supabase(token)
 
-    user_data = _validate_token_via_supabase(token)
-    _cache_user(token, user_data)
+
+async def get_user_from_token_async(token: str) -> dict[str, Any]:
+    """
+    Comme get_user_from_token, mais l'appel a l'API Supabase (dernier
+    recours) est execute dans un thread pour ne pas bloquer l'event loop.
+    """
+    user_data = _get_user_without_network(token)
+    if user_data is None:
+        user_data = await asyncio.to_thread(_get_user_via_supabase, token)
     return user_data
 
 
@@ -199,7 +321,7 @@ async def get_current_user_id(
         raise AuthenticationError("Token d'authentification requis")
 
     try:
-        user_data = get_user_from_token(credentials.credentials)
+        user_data = await get_user_from_token_async(credentials.credentials)
         return UUID(user_data["user_id"])
     except (TokenExpiredError, InvalidTokenError) as e:
         raise e
@@ -222,7 +344,7 @@ async def get_current_user_id_optional(
         return None
 
     try:
-        user_data = get_user_from_token(credentials.credentials)
+        user_data = await get_user_from_token_async(credentials.credentials)
         return UUID(user_data["user_id"])
     except (TokenExpiredError, InvalidTokenError):
         raise
@@ -248,13 +370,11 @@ async def get_current_admin(
     Returns:
         dict avec user_id (UUID) et role (str)
     """
-    import asyncio
-
     if credentials is None:
         raise AuthenticationError("Token d'authentification requis")
 
     try:
-        user_data = get_user_from_token(credentials.credentials)
+        user_data = await get_user_from_token_async(credentials.credentials)
         user_id = UUID(user_data["user_id"])
     except (TokenExpiredError, InvalidTokenError):
         raise
@@ -323,13 +443,11 @@ async def get_current_school_admin(
     Returns:
         dict avec user_id (UUID), school_id (str), email (str)
     """
-    import asyncio
-
     if credentials is None:
         raise AuthenticationError("Token d'authentification requis")
 
     try:
-        user_data = get_user_from_token(credentials.credentials)
+        user_data = await get_user_from_token_async(credentials.credentials)
         user_id = UUID(user_data["user_id"])
     except (TokenExpiredError, InvalidTokenError):
         raise
@@ -5,6 +5,7 @@ Application FastAPI avec:
 - Securite: CORS, Rate Limiting, Security Headers
 - Logging: Structure JSON en production, colore en dev
 - Middleware: Request logging avec correlation IDs
+- Lifecycle: fermeture des clients HTTP sortants au shutdown
 """
 
 from contextlib import asynccontextmanager
@@ -67,9 +68,15 @@ async def lifespan(app: FastAPI):
             "debug": settings.DEBUG,
         },
     )
+    from app.core.jwks import jwks_cache
+    from app.services.llm_service import llm_service
+    jwks_cache.start()
+    llm_service.start()
     yield
     # Shutdown
     logger.info("Shutting down ActivEducation API")
+    await llm_service.aclose()
+    await jwks_cache.stop()
 
 
 # Creation de l'application FastAPI
@@ -105,7 +112,7 @@ if cors_origins:
         allow_credentials=not is_wildcard,
         allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
         allow_headers=["*"],
-        expose_headers=["X-Correlation-ID", "X-Process-Time"],
+        expose_headers=["X-Correlation-ID", "X-Process-Time", "Idempotent-Replayed", "Retry-After"],
     )
 
 # 3. Compression GZip pour les reponses > 1KB
@@ -237,6 +244,7 @@ async def app_exception_handler(request: Request, exc: AppException):
     response = JSONResponse(
         status_code=exc.status_code,
         content=response_content,
+        headers=exc.headers or None,
     )
     return _apply_cors_headers(request, response)
 
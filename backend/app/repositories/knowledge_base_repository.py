@@ -3,18 +3,63 @@ Repository pour la base de connaissances AÏDA.
 
 Charge les entrées depuis Supabase (table knowledge_base) avec cache Redis 1h.
 Fallback sur la KB statique embarquée si Supabase ou Redis est indisponible.
+
+La KB est compilée par catégorie (entrées, texte formaté, empreinte du
+contenu, version) : une modification admin ne recompile que la catégorie
+touchée, et le texte complet est réassemblé à partir des catégories
+inchangées. Chaque catégorie a sa version partagée (hash Redis) ; un numéro
+de version global est incrémenté à chaque invalidation : les workers s'en
+servent pour recompiler prompt et index de recherche.
 """
 
+import hashlib
+import json
 import logging
 import time
-from typing import Optional
+from typing import Any, Optional
+
+from app.core.cache import get_cache
 
 logger = logging.getLogger(__name__)
 
-# Cache mémoire local (fallback si Redis indisponible)
-_memory_cache: dict = {}
 _KB_CACHE_TTL = 3600  # 1 heure
 
+# Catégories compilées partagées entre workers (effacées par invalidate_cache())
+_CATEGORY_KEY_PREFIX = "knowledge_base:category:"
+_CATEGORIES_KEY = "knowledge_base:categories"
+
+# Hors du motif "knowledge_base:*" effacé par invalidate_cache()
+_VERSION_KEY = "knowledge_base_version"
+_CATEGORY_VERSIONS_KEY = "knowledge_base_category_versions"
+_VERSION_CHECK_INTERVAL = 30  # secondes entre deux lectures de la version partagée
+
+# Champ du hash des versions : invalidation de toutes les catégories
+_ALL_CATEGORIES = "*"
+
+
+def compile_category(category: str, rows: list[dict], version: int = 0) -> dict:
+    """
+    Compile une catégorie : entrées triées par titre, texte formaté (bloc de
+    la KB complète) et empreinte du contenu.
+    """
+    entries = sorted(
+        (
+            {"category": category, "title": row.get("title", ""), "content": row.get("content", "")}
+            for row in rows
+        ),
+        key=lambda e: e["title"],
+    )
+    lines = [f"\n**{category.upper()} :**\n"]
+    lines.extend(f"- {e['title']} : {e['content']}" for e in entries)
+    digest = hashlib.sha256(json.dumps(entries, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    return {
+        "category": category,
+        "version": version,
+        "hash": digest,
+        "entries": entries,
+        "content": "\n".join(lines),
+    }
+
 
 class KnowledgeBaseRepository:
     """Accès à la base de connaissances AÏDA depuis Supabase."""
@@ -22,23 +67,28 @@ class KnowledgeBaseRepository:
     TABLE = "knowledge_base"
 
     def __init__(self) -> None:
-        self._redis: Optional[object] = None
-        self._supabase: Optional[object] = None
+        # Client Redis brut partagé (CacheClient.redis), None si indisponible
+        self._redis: Optional[Any] = None
+        self._supabase: Any = None
         self._initialized = False
+        self._version = 0
+        self._version_checked_at = 0.0
+        # Catégories compilées de ce worker, et versions locales (sans Redis)
+        self._categories: dict[str, dict] = {}
+        self._loaded_at = 0.0
+        self._all_version = 0
+        self._local_versions: dict[str, int] = {}
+        # Dernier assemblage : (empreintes des catégories, texte, entrées)
+        self._assembled: Optional[tuple[tuple, str, list[dict]]] = None
 
     def _init_clients(self) -> None:
         if self._initialized:
             return
         self._initialized = True
 
-        try:
-            import redis as redis_lib
-            from app.core.config import settings
-            self._redis = redis_lib.from_url(settings.REDIS_URL, decode_responses=True)
-            self._redis.ping()
-        except Exception as exc:
-            logger.warning("Redis indisponible pour la KB — fallback mémoire: %s", exc)
-            self._redis = None
+        self._redis = get_cache().redis
+        if self._redis is None:
+            logger.warning("Redis indisponible pour la KB — fallback mémoire")
 
         try:
             from app.db.supabase_client import get_supabase_client
@@ -50,87 +100,244 @@ class KnowledgeBaseRepository:
     def get_content(self, category: Optional[str] = None) -> str:
         """
         Retourne le contenu de la KB sous forme de texte formaté.
-        Cache Redis 1h — fallback mémoire — fallback KB statique.
+        Catégories compilées (Redis 1h, puis Supabase) — fallback KB statique.
         """
-        self._init_clients()
-        cache_key = f"knowledge_base:{category or 'all'}"
-
-        # 1. Tenter Redis
-        if self._redis:
-            try:
-                cached = self._redis.get(cache_key)
-                if cached:
-                    return cached
-            except Exception:
-                pass
+        if category:
+            unit = self._compiled_categories().get(category)
+            if unit:
+                return unit["content"]
+        else:
+            content, _ = self._assemble()
+            if content:
+                return content
 
-        # 2. Tenter mémoire locale
-        if cache_key in _memory_cache:
-            entry = _memory_cache[cache_key]
-            if time.time() - entry["ts"] < _KB_CACHE_TTL:
-                return entry["content"]
+        logger.info("Utilisation de la KB statique (Supabase non disponible)")
+        return _STATIC_KB
 
-        # 3. Tenter Supabase
-        if self._supabase:
+    def get_entries(self) -> list[dict]:
+        """
+        Retourne les entrées brutes de la KB ({category, title, content}),
+        pour l'index de recherche. Même cascade de caches que get_content().
+        """
+        _, entries = self._assemble()
+        if entries:
+            return entries
+
+        logger.info("Utilisation des entrées KB statiques (Supabase non disponible)")
+        return _static_entries()
+
+    def get_compiled_categories(self) -> list[dict]:
+        """Catégories compilées, par ordre alphabétique."""
+        categories = self._compiled_categories()
+        return [categories[name] for name in sorted(categories)]
+
+    def _assemble(self) -> tuple[str, list[dict]]:
+        """Texte complet et entrées, réassemblés seulement si une catégorie a changé."""
+        units = self.get_compiled_categories()
+        signature = tuple((u["category"], u["hash"]) for u in units)
+        if self._assembled is None or self._assembled[0] != signature:
+            content = "\n".join(u["content"] for u in units)
+            entries = [e for u in units for e in u["entries"]]
+            self._assembled = (signature, content, entries)
+        return self._assembled[1], self._assembled[2]
+
+    # ------------------------------------------------------------------
+    # Compilation incrémentale
+    # ------------------------------------------------------------------
+
+    def _compiled_categories(self) -> dict[str, dict]:
+        """
+        Catégories à jour : rechargement complet à expiration ou après une
+        invalidation globale, sinon seules les catégories dont la version
+        partagée a changé sont recompilées.
+        """
+        self._init_clients()
+        versions = self._category_versions()
+        all_version = versions.pop(_ALL_CATEGORIES, 0)
+
+        if (
+            not self._categories
+            or all_version != self._all_version
+            or time.monotonic() - self._loaded_at >= _KB_CACHE_TTL
+        ):
+            self._load_all(versions)
+            self._all_version = all_version
+            return self._categories
+
+        stale = {name for name, unit in self._categories.items() if unit["version"] != versions.get(name, 0)}
+        stale.update(name for name in versions if name not in self._categories)
+        for name in sorted(stale):
+            self._load_category(name, versions.get(name, 0))
+        return self._categories
+
+    def _load_all(self, versions: dict[str, int]) -> None:
+        units = self._cached_units()
+        if units is None and self._supabase:
             try:
-                content = self._fetch_from_supabase(category)
-                if content:
-                    self._store_in_cache(cache_key, content)
-                    return content
+                grouped: dict[str, list[dict]] = {}
+                for row in self._fetch_rows_from_supabase(None):
+                    grouped.setdefault(row.get("category", ""), []).append(row)
+                units = [compile_category(name, rows, versions.get(name, 0)) for name, rows in grouped.items()]
+                self._store_units(units)
             except Exception as exc:
-                logger.warning("Erreur lecture KB Supabase: %s — fallback statique", exc)
-
-        # 4. Fallback KB statique
-        logger.info("Utilisation de la KB statique (Supabase non disponible)")
-        return _STATIC_KB
+                logger.warning("Erreur lecture KB Supabase: %s", exc)
+        if not units:
+            # Supabase indisponible : on garde les catégories déjà compilées
+            return
 
-    def _fetch_from_supabase(self, category: Optional[str]) -> str:
-        """Charge les entrées KB depuis Supabase et les formate en texte."""
+        # Une catégorie au contenu inchangé garde son objet compilé
+        loaded = {}
+        for unit in units:
+            previous = self._categories.get(unit["category"])
+            loaded[unit["category"]] = previous if previous and previous["hash"] == unit["hash"] else unit
+            loaded[unit["category"]]["version"] = unit["version"]
+        recompiled = sum(1 for name, unit in loaded.items() if self._categories.get(name) is not unit)
+        self._categories = loaded
+        self._loaded_at = time.monotonic()
+        logger.info("KB chargée : %d catégories (%d recompilées)", len(loaded), recompiled)
+
+    def _load_category(self, name: str, version: int) -> None:
+        unit = self._cached_unit(name)
+        if (unit is None or unit["version"] != version) and self._supabase:
+            try:
+                rows = self._fetch_rows_from_supabase(name)
+            except Exception as exc:
+                logger.warning("Erreur lecture KB Supabase (%s): %s", name, exc)
+                return
+            unit = compile_category(name, rows, version) if rows else None
+            if unit:
+                self._store_units([unit], replace_index=False)
+        if unit is None:
+            self._categories.pop(name, None)
+            logger.info("Catégorie KB retirée : %s", name)
+            return
+        previous = self._categories.get(name)
+        if previous and previous["hash"] == unit["hash"]:
+            previous["version"] = version
+        else:
+            self._categories[name] = unit
+            logger.info("Catégorie KB recompilée : %s (v%s)", name, version)
+
+    def _fetch_rows_from_supabase(self, category: Optional[str]) -> list[dict]:
+        """Charge les entrées KB depuis Supabase, triées par catégorie puis titre."""
         query = self._supabase.table(self.TABLE).select("category, title, content")
         if category:
             query = query.eq("category", category)
         result = query.order("category").order("title").execute()
+        return result.data or []
 
-        if not result.data:
-            return ""
+    # ------------------------------------------------------------------
+    # Cache Redis des catégories compilées (partagé entre workers)
+    # ------------------------------------------------------------------
 
-        lines = []
-        current_category = None
-        for row in result.data:
-            cat = row.get("category", "")
-            if cat != current_category:
-                current_category = cat
-                lines.append(f"\n**{cat.upper()} :**\n")
-            title = row.get("title", "")
-            content = row.get("content", "")
-            lines.append(f"- {title} : {content}")
+    def _cached_units(self) -> Optional[list[dict]]:
+        """Toutes les catégories compilées depuis Redis, ou None s'il en manque une."""
+        if not self._redis:
+            return None
+        try:
+            names = self._redis.get(_CATEGORIES_KEY)
+            if not names:
+                return None
+            raw = self._redis.mget([_CATEGORY_KEY_PREFIX + name for name in json.loads(names)])
+            if not raw or any(r is None for r in raw):
+                return None
+            return [json.loads(r) for r in raw]
+        except Exception:
+            return None
+
+    def _cached_unit(self, name: str) -> Optional[dict]:
+        if not self._redis:
+            return None
+        try:
+            raw = self._redis.get(_CATEGORY_KEY_PREFIX + name)
+            return json.loads(raw) if raw else None
+        except Exception:
+            return None
+
+    def _store_units(self, units: list[dict], replace_index: bool = True) -> None:
+        """Stocke les catégories compilées dans Redis (et la liste des catégories)."""
+        if not self._redis:
+            return
+        try:
+            pipe = self._redis.pipeline()
+            for unit in units:
+                pipe.setex(_CATEGORY_KEY_PREFIX + unit["category"], _KB_CACHE_TTL, json.dumps(unit, ensure_ascii=False))
+            if replace_index:
+                pipe.setex(_CATEGORIES_KEY, _KB_CACHE_TTL, json.dumps(sorted(u["category"] for u in units)))
+            pipe.execute()
+        except Exception as exc:
+            logger.debug("Catégories KB non mises en cache Redis: %s", exc)
 
-        return "\n".join(lines)
+    # ------------------------------------------------------------------
+    # Versions
+    # ------------------------------------------------------------------
 
-    def _store_in_cache(self, key: str, content: str) -> None:
-        """Stocke dans Redis et dans le cache mémoire."""
+    def _category_versions(self) -> dict[str, int]:
+        """Versions partagées des catégories (et de l'invalidation globale)."""
         if self._redis:
             try:
-                self._redis.setex(key, _KB_CACHE_TTL, content)
-                return
+                return {name: int(v) for name, v in self._redis.hgetall(_CATEGORY_VERSIONS_KEY).items()}
+            except Exception:
+                pass
+        return dict(self._local_versions)
+
+    def current_version(self) -> int:
+        """
+        Version courante de la KB. La valeur partagée n'est relue dans Redis
+        qu'une fois toutes les _VERSION_CHECK_INTERVAL secondes.
+        """
+        now = time.monotonic()
+        if now - self._version_checked_at < _VERSION_CHECK_INTERVAL:
+            return self._version
+        self._version_checked_at = now
+
+        self._init_clients()
+        if self._redis:
+            try:
+                shared = self._redis.get(_VERSION_KEY)
+                if shared is not None:
+                    self._version = int(shared)
             except Exception:
                 pass
-        _memory_cache[key] = {"content": content, "ts": time.time()}
+        return self._version
 
-    def invalidate_cache(self) -> None:
-        """Invalide le cache KB (à appeler via endpoint admin)."""
-        keys_to_delete = [k for k in _memory_cache if k.startswith("knowledge_base:")]
-        for k in keys_to_delete:
-            del _memory_cache[k]
+    def bump_version(self) -> int:
+        """Incrémente la version partagée (visible des autres workers sous 30 s)."""
+        self._init_clients()
+        version = self._version + 1
+        if self._redis:
+            try:
+                version = int(self._redis.incr(_VERSION_KEY))
+            except Exception as exc:
+                logger.warning("Version KB non partagée (Redis indisponible): %s", exc)
+        self._version = version
+        self._version_checked_at = time.monotonic()
+        return version
+
+    def invalidate_cache(self, category: Optional[str] = None) -> None:
+        """
+        Invalide le cache KB et publie une nouvelle version (endpoint admin).
+        Avec `category`, seule cette catégorie sera recompilée.
+        """
+        self._init_clients()
+        field = category or _ALL_CATEGORIES
+        self._local_versions[field] = self._local_versions.get(field, 0) + 1
 
         if self._redis:
             try:
-                for key in self._redis.scan_iter("knowledge_base:*"):
-                    self._redis.delete(key)
-                logger.info("Cache KB Redis invalidé")
+                if category:
+                    # La liste des catégories est effacée aussi (catégorie ajoutée ou vidée)
+                    self._redis.delete(_CATEGORY_KEY_PREFIX + category, _CATEGORIES_KEY)
+                else:
+                    for key in self._redis.scan_iter("knowledge_base:*"):
+                        self._redis.delete(key)
+                self._redis.hincrby(_CATEGORY_VERSIONS_KEY, field, 1)
+                logger.info("Cache KB Redis invalidé (%s)", field)
             except Exception as exc:
                 logger.warning("Erreur invalidation cache Redis KB: %s", exc)
 
+        self.bump_version()
+
 
 # ---------------------------------------------------------------------------
 # KB statique — fallback si Supabase indisponible
@@ -197,5 +404,27 @@ CHU Sylvanus Olympio, Port Autonome de Lomé.
 """
 
 
+def _static_entries() -> list[dict]:
+    """Découpe la KB statique en entrées indexables (un bloc = une entrée)."""
+    entries: list[dict] = []
+    category = ""
+    for block in _STATIC_KB.split("\n\n"):
+        block = block.strip()
+        if not block:
+            continue
+        if block.startswith("**"):
+            header, _, block = block.partition("\n")
+            category = "ecoles" if "ÉCOLES" in header else "metiers"
+            if not block:
+                continue
+        # "4. ESA | privé | ..." ou "SANTÉ : Médecin (...)" -> titre + reste du bloc
+        separator = "|" if "|" in block.split("\n", 1)[0] else ":"
+        title, _, content = block.partition(separator)
+        title = title.lstrip("0123456789. ").strip()
+        content = " ".join(line.strip() for line in content.split("\n"))
+        entries.append({"category": category, "title": title, "content": content.strip()})
+    return entries
+
+
 # Singleton
 knowledge_base_repository = KnowledgeBaseRepository()
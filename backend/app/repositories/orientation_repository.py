@@ -6,8 +6,10 @@ Gere les interactions avec la base de donnees Supabase pour:
 - Sessions de test
 - Resultats
 - Carrieres
+- Re-scoring en lot des resultats historiques
 """
 
+import asyncio
 from datetime import datetime, timezone
 from typing import Any, Optional
 from uuid import UUID
@@ -21,11 +23,19 @@ from app.core.exceptions import (
     NotFoundError,
     QueryError,
 )
-from app.schemas.orientation import TestResult
+from app.schemas.orientation import CareerSummary, TestResult
 
 logger = get_logger("repositories.orientation")
 
 
+def serialize_recommendations(recommendations: Optional[list[CareerSummary]]) -> list[str]:
+    """
+    Format de la colonne test_results.recommendations : ids des carrieres
+    recommandees, dans l'ordre. Partage par la soumission et le re-scoring.
+    """
+    return [str(r.id) for r in (recommendations or [])]
+
+
 class OrientationRepository:
     """Repository pour les operations liees a l'orientation."""
 
@@ -269,7 +279,7 @@ class OrientationRepository:
                 "test_id": str(test_id),
                 "scores": result.scores,
                 "dominant_traits": result.dominant_traits,
-                "recommendations": [str(r) for r in (result.recommendations or [])],
+                "recommendations": serialize_recommendations(result.recommendations),
             }
 
             saved_result = self._db.insert(table="test_results", data=result_data)
@@ -290,6 +300,73 @@ class OrientationRepository:
             logger.error(f"Error completing test session: {e}")
             raise QueryError(f"Erreur lors de la completion du test: {str(e)}")
 
+    # =========================================================================
+    # RE-SCORING EN LOT
+    # =========================================================================
+
+    async def fetch_completed_sessions_after(
+        self,
+        after_id: Optional[str],
+        limit: int = 200,
+    ) -> list[dict[str, Any]]:
+        """
+        Page de sessions completees (avec leurs reponses) triees par id.
+
+        Pagination par cle (id > after_id) : stable et sans OFFSET, meme sur
+        une table volumineuse modifiee pendant le parcours.
+        """
+        try:
+            query = (
+                self._db.client.table("user_test_sessions")
+                .select("id, user_id, test_id, responses")
+                .eq("status", "completed")
+            )
+            if after_id:
+                query = query.gt("id", after_id)
+            result = await asyncio.to_thread(query.order("id").limit(limit).execute)
+            return result.data or []
+        except Exception as e:
+            logger.error(f"Error fetching completed sessions: {e}")
+            raise QueryError(f"Erreur lors du parcours des sessions: {str(e)}")
+
+    async def bulk_write_test_results(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Ecrit en lot les resultats recalcules (une ligne par session_id).
+
+        Les resultats existants sont mis a jour par cle primaire (upsert),
+        les sessions sans resultat recoivent une nouvelle ligne.
+
+        Returns:
+            Nombre de lignes ecrites
+        """
+        if not rows:
+            return 0
+        try:
+            client = self._db.client
+            session_ids = [r["session_id"] for r in rows]
+            existing = await asyncio.to_thread(
+                client.table("test_results")
+                .select("id, session_id")
+                .in_("session_id", session_ids)
+                .execute
+            )
+            id_by_session = {r["session_id"]: r["id"] for r in (existing.data or [])}
+
+            updates = [
+                {**r, "id": id_by_session[r["session_id"]]}
+                for r in rows if r["session_id"] in id_by_session
+            ]
+            inserts = [r for r in rows if r["session_id"] not in id_by_session]
+
+            if updates:
+                await asyncio.to_thread(client.table("test_results").upsert(updates).execute)
+            if inserts:
+                await asyncio.to_thread(client.table("test_results").insert(inserts).execute)
+            return len(updates) + len(inserts)
+        except Exception as e:
+            logger.error(f"Error writing test results in bulk: {e}")
+            raise QueryError(f"Erreur lors de l'ecriture des resultats: {str(e)}")
+
     # =========================================================================
     # CARRIERES
     # =========================================================================
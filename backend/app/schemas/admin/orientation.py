@@ -107,3 +107,22 @@ class OptionUpdate(BaseModel):
     option_value: Optional[int] = None
     display_order: Optional[int] = None
     icon: Optional[str] = None
+
+
+class RescoringRequest(BaseModel):
+    dry_run: bool = False
+    restart: bool = False
+    batch_size: int = Field(200, ge=10, le=1000)
+
+
+class RescoringStatus(BaseModel):
+    status: str = "idle"
+    dry_run: bool = False
+    last_session_id: Optional[str] = None
+    processed: int = 0
+    written: int = 0
+    skipped: int = 0
+    failed: int = 0
+    sessions_per_second: float = 0.0
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
@@ -5,6 +5,7 @@ Extrait de submit_test pour respecter le principe de responsabilité unique.
 Gère :
 - L'enrichissement des résultats avec le score de correspondance
 - La diversification des recommandations (anti-biais alphabétique)
+- La lecture du classement pré-calculé par code de profil (RecommendationTable)
 - La récupération des programmes scolaires correspondants
 """
 
@@ -14,59 +15,19 @@ from typing import Optional
 from uuid import UUID
 
 from app.schemas.orientation import CareerSummary, TestResult
-from app.services.orientation_engine import orientation_engine, EN_TO_FR, CODE_TO_FR
+from app.services.orientation_engine import orientation_engine
+from app.services.career_summary import build_career_summary, normalize_career_trait
 from app.repositories.orientation_repository import OrientationRepository
+from app.services.recommendation_table import RecommendationTable, recommendation_table
 
 logger = logging.getLogger(__name__)
 
-# Variantes d'accentuation connues
-_NO_ACCENT_TO_ACCENT = {"Realiste": "Réaliste"}
-
 # Nombre max de carrières recommandées dans la réponse
 MAX_RECOMMENDATIONS = 6
 # Marge de score pour regrouper en "tier" avant diversification
 TIER_MARGIN = 8
 
 
-def _normalize_career_trait(trait: str) -> str:
-    """Normalise un trait carrière vers le français accentué."""
-    return EN_TO_FR.get(trait) or CODE_TO_FR.get(trait) or _NO_ACCENT_TO_ACCENT.get(trait) or trait
-
-
-def _extract_education_level(career_data: dict) -> str:
-    """Extrait le niveau d'éducation minimum d'une carrière."""
-    import json as _json
-    edu = career_data.get("education_path")
-    if isinstance(edu, str):
-        try:
-            edu = _json.loads(edu)
-        except Exception:
-            return "BAC"
-    if isinstance(edu, dict):
-        return edu.get("minimum_level", "BAC")
-    return "BAC"
-
-
-def _build_career_summary(c: dict, match_score: float, matching_traits: list[str]) -> CareerSummary:
-    """Construit un objet CareerSummary à partir des données brutes de la DB."""
-    return CareerSummary(
-        id=c["id"],
-        name=c["name"],
-        description=c.get("description", ""),
-        sector_name=c.get("sector_name", ""),
-        job_demand=c.get("job_demand"),
-        salary_avg_fcfa=c.get("salary_avg_fcfa"),
-        salary_min_fcfa=c.get("salary_min_fcfa"),
-        salary_max_fcfa=c.get("salary_max_fcfa"),
-        image_url=c.get("image_url"),
-        match_score=match_score,
-        matching_traits=matching_traits,
-        required_skills=(c.get("required_skills") or [])[:5],
-        related_traits=c.get("related_traits") or [],
-        education_minimum_level=_extract_education_level(c),
-    )
-
-
 def _diversify_by_tier(ranked: list[CareerSummary]) -> list[CareerSummary]:
     """
     Diversifie les recommandations en mélangeant les carrières dans la même
@@ -92,22 +53,34 @@ class CareerMatcherService:
     et les programmes scolaires recommandés.
     """
 
+    def __init__(self, table: Optional[RecommendationTable] = None) -> None:
+        self._table = table if table is not None else RecommendationTable()
+
+    @property
+    def table(self) -> RecommendationTable:
+        return self._table
+
     async def enrich_result(
         self,
         result: TestResult,
         repo: OrientationRepository,
+        with_programs: bool = True,
     ) -> TestResult:
         """
         Enrichit result.recommendations avec les carrières scorées et
         result.matching_programs avec les programmes scolaires.
 
+        with_programs=False évite la requête des programmes (non persistés),
+        utile pour le re-scoring en lot.
+
         Modifie result en place et le retourne.
         """
         if not result.dominant_traits:
             return result
 
         result.recommendations = await self._match_careers(result, repo)
-        result.matching_programs = await self._fetch_school_programs(result, repo)
+        if with_programs:
+            result.matching_programs = await self._fetch_school_programs(result, repo)
         return result
 
     async def _match_careers(
@@ -118,7 +91,16 @@ class CareerMatcherService:
         """
         Récupère les carrières correspondant aux traits dominants,
         calcule leur score de correspondance et les trie.
+
+        Lit d'abord la table pré-calculée (O(1) une fois l'entrée matérialisée) ;
+        repli sur la requête par traits si la table est indisponible ou si le
+        profil n'est pas RIASEC.
         """
+        if await self._table.ensure_loaded(repo):
+            ranked = self._table.lookup(result.dominant_traits, result.scores)
+            if ranked is not None:
+                return [s.model_copy() for s in _diversify_by_tier(ranked)[:MAX_RECOMMENDATIONS]]
+
         try:
             careers = await repo.get_careers_by_traits(result.dominant_traits, limit=25)
         except Exception as e:
@@ -133,10 +115,10 @@ class CareerMatcherService:
                 user_dominant_traits=result.dominant_traits,
                 user_scores=result.scores,
             )
-            normalized_traits = [_normalize_career_trait(t) for t in career_traits]
+            normalized_traits = [normalize_career_trait(t) for t in career_traits]
             matching = [t for t in normalized_traits if t in result.dominant_traits]
 
-            enriched.append(_build_career_summary(c, match_score, matching))
+            enriched.append(build_career_summary(c, match_score, matching))
 
         enriched.sort(key=lambda r: r.match_score, reverse=True)
         return _diversify_by_tier(enriched)[:MAX_RECOMMENDATIONS]
@@ -156,5 +138,22 @@ class CareerMatcherService:
             logger.error("Erreur récupération programmes scolaires : %s", e)
             return []
 
+    async def recommend_for_traits(
+        self,
+        traits: list[str],
+        repo: OrientationRepository,
+        limit: int = 10,
+    ) -> Optional[list[CareerSummary]]:
+        """
+        Recommandations pour une liste de traits sans scores (endpoint
+        /recommendations). Retourne None si la table ne couvre pas ce profil.
+        """
+        if not await self._table.ensure_loaded(repo):
+            return None
+        ranked = self._table.lookup(traits)
+        if ranked is None:
+            return None
+        return [s.model_copy() for s in _diversify_by_tier(ranked)[:limit]]
+
 
-career_matcher = CareerMatcherService()
+career_matcher = CareerMatcherService(recommendation_table)
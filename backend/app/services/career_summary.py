@@ -0,0 +1,55 @@
+"""
+Construction des résumés de carrières recommandées.
+
+Partagé par CareerMatcherService (chemin de repli par requête) et
+RecommendationTable (entrées pré-calculées) :
+- La normalisation des traits carrière vers le français accentué
+- L'extraction du niveau d'éducation minimum
+- La construction d'un CareerSummary à partir d'une ligne brute de la DB
+"""
+
+import json
+
+from app.schemas.orientation import CareerSummary
+from app.services.orientation_engine import EN_TO_FR, CODE_TO_FR
+
+# Variantes d'accentuation connues
+_NO_ACCENT_TO_ACCENT = {"Realiste": "Réaliste"}
+
+
+def normalize_career_trait(trait: str) -> str:
+    """Normalise un trait carrière vers le français accentué."""
+    return EN_TO_FR.get(trait) or CODE_TO_FR.get(trait) or _NO_ACCENT_TO_ACCENT.get(trait) or trait
+
+
+def extract_education_level(career_data: dict) -> str:
+    """Extrait le niveau d'éducation minimum d'une carrière."""
+    edu = career_data.get("education_path")
+    if isinstance(edu, str):
+        try:
+            edu = json.loads(edu)
+        except Exception:
+            return "BAC"
+    if isinstance(edu, dict):
+        return edu.get("minimum_level", "BAC")
+    return "BAC"
+
+
+def build_career_summary(c: dict, match_score: float, matching_traits: list[str]) -> CareerSummary:
+    """Construit un objet CareerSummary à partir des données brutes de la DB."""
+    return CareerSummary(
+        id=c["id"],
+        name=c["name"],
+        description=c.get("description", ""),
+        sector_name=c.get("sector_name", ""),
+        job_demand=c.get("job_demand"),
+        salary_avg_fcfa=c.get("salary_avg_fcfa"),
+        salary_min_fcfa=c.get("salary_min_fcfa"),
+        salary_max_fcfa=c.get("salary_max_fcfa"),
+        image_url=c.get("image_url"),
+        match_score=match_score,
+        matching_traits=matching_traits,
+        required_skills=(c.get("required_skills") or [])[:5],
+        related_traits=c.get("related_traits") or [],
+        education_minimum_level=extract_education_level(c),
+    )
@@ -0,0 +1,68 @@
+"""
+AnswerCache — Cache des réponses AÏDA aux questions fréquentes.
+
+Les élèves posent sans cesse les mêmes questions d'ouverture (« quelles écoles
+d'informatique à Lomé ? », « combien gagne un comptable ? »). Pour une
+première question sans historique, la réponse ne dépend que de la question,
+du profil RIASEC et de la KB : on la sert depuis le cache partagé (Redis).
+
+Clé : question normalisée + code de profil RIASEC + version de la KB
+(un rafraîchissement de la KB rend donc toutes les anciennes réponses caduques).
+"""
+
+import hashlib
+import logging
+import re
+from typing import Optional
+
+from app.core.cache import get_cache
+from app.core.metrics import metrics
+from app.services.llm.kb_retriever import fold_accents
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_TTL = 6 * 3600  # secondes
+# Au-delà, une question est trop spécifique pour être reposée à l'identique
+MAX_CACHEABLE_QUESTION_CHARS = 200
+
+HIT_RATE_METRIC = "aida_answer_cache"
+
+_KEY_PREFIX = "aida:answer:"
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_question(question: str) -> str:
+    """Minuscules, accents repliés, ponctuation et espaces multiples retirés."""
+    return _NON_WORD_RE.sub(" ", fold_accents(question)).strip()
+
+
+class AnswerCache:
+    """Réponses mises en cache pour les premières questions d'une conversation."""
+
+    def __init__(self, kb_repository, ttl: int = ANSWER_CACHE_TTL) -> None:
+        self._kb_repository = kb_repository
+        self._ttl = ttl
+
+    def key_for(self, question: str, orientation_context: Optional[dict]) -> Optional[str]:
+        """Clé de cache, ou None si la question n'est pas éligible."""
+        normalized = normalize_question(question)
+        if not normalized or len(normalized) > MAX_CACHEABLE_QUESTION_CHARS:
+            return None
+        profile = (orientation_context or {}).get("profile_code") or "-"
+        version = self._kb_repository.current_version()
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+        return f"{_KEY_PREFIX}v{version}:{profile.upper()}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Réponse en cache (et comptabilise le hit/miss)."""
+        reply = get_cache().get(key)
+        metrics.incr(HIT_RATE_METRIC, result="hit" if reply else "miss")
+        return reply
+
+    def set(self, key: str, reply: str) -> None:
+        get_cache().set(key, reply, ttl=self._ttl)
+
+    @staticmethod
+    def hit_rate() -> float:
+        """Taux de hit du cache sur ce worker depuis le démarrage."""
+        return metrics.ratio(HIT_RATE_METRIC, "result", "hit")
@@ -0,0 +1,267 @@
+"""
+ConcurrencyGate — Limite le nombre de conversations AÏDA traitées en même temps.
+
+Un stream SSE occupe une connexion du worker pendant toute la génération.
+Sans limite, une rafale (une classe entière qui ouvre le chat) épuise les
+descripteurs de fichiers et affame les endpoints d'orientation du même worker.
+
+Ce composant :
+- borne les conversations simultanées par worker (compteur local)
+- et pour tout le cluster (baux dans un sorted set Redis, expirés
+  automatiquement si un worker meurt sans les rendre ; appels Redis hors de
+  la boucle d'événements, limite locale seule pendant une panne Redis)
+- fait patienter brièvement les requêtes en excès, dans l'ordre d'arrivée,
+  dans une file bornée
+- rejette le reste immédiatement (503 + Retry-After)
+"""
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from app.core.cache import get_cache
+from app.core.exceptions import ServiceOverloadedError
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Durée de vie d'un bail : couvre la génération la plus longue (timeout Ollama inclus)
+LEASE_TTL = 300
+# Intervalle de nouvelle tentative quand la limite globale est atteinte
+# (les créneaux libérés par les autres workers ne sont pas notifiés)
+GLOBAL_POLL_INTERVAL = 0.1
+# Bornes du Retry-After suggéré (secondes)
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 30
+# Redis absent ou en panne : limite locale seule pendant ce délai avant de le retenter
+REDIS_RETRY_SECONDS = 30.0
+
+GATE_METRIC = "aida_chat_gate"
+QUEUE_WAIT_METRIC = "aida_chat_queue_wait_seconds"
+QUEUE_DEPTH_METRIC = "aida_chat_queue_depth"
+SLOT_DURATION_METRIC = "aida_chat_slot_seconds"
+
+_LEASES_KEY = "aida:chat:leases"
+
+# KEYS[1] = baux en cours (score = expiration)
+# ARGV = maintenant, expiration, limite, identifiant du bail, TTL de la clé
+_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+
+class ConcurrencyGate:
+    """Sémaphore par worker + limite globale Redis, avec file d'attente bornée."""
+
+    def __init__(
+        self,
+        max_per_worker: Optional[int] = None,
+        max_global: Optional[int] = None,
+        max_waiters: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ) -> None:
+        from app.core.config import settings
+        self._max_per_worker = settings.CHAT_MAX_CONCURRENT_PER_WORKER if max_per_worker is None else max_per_worker
+        self._max_global = settings.CHAT_MAX_CONCURRENT_GLOBAL if max_global is None else max_global
+        self._max_waiters = settings.CHAT_QUEUE_MAX_WAITERS if max_waiters is None else max_waiters
+        self._queue_timeout = settings.CHAT_QUEUE_TIMEOUT_SECONDS if queue_timeout is None else queue_timeout
+        # Baux locaux : identifiant -> (début, expiration)
+        self._leases: dict[str, tuple[float, float]] = {}
+        self._waiters: deque[asyncio.Event] = deque()
+        self._redis_retry_at = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._leases)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def stats(self) -> dict:
+        """État courant et mesures de la file (endpoint admin)."""
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_per_worker": self._max_per_worker,
+            "max_global": self._max_global,
+            "max_waiters": self._max_waiters,
+            "admitted": metrics.count(GATE_METRIC, outcome="admitted"),
+            "rejected": metrics.count(GATE_METRIC, outcome="rejected"),
+            "queue_wait_seconds": metrics.summary(QUEUE_WAIT_METRIC),
+            "queue_depth_on_arrival": metrics.summary(QUEUE_DEPTH_METRIC),
+        }
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    async def acquire(self) -> str:
+        """
+        Obtient un créneau et retourne l'identifiant du bail à rendre via release().
+
+        Raises:
+            ServiceOverloadedError: file pleine ou attente dépassant queue_timeout.
+        """
+        # Pas de resquille : s'il y a une file, on s'y place
+        lease = None if self._waiters else await self._try_acquire()
+        if lease:
+            metrics.incr(GATE_METRIC, outcome="admitted", queued=False)
+            return lease
+
+        metrics.observe(QUEUE_DEPTH_METRIC, len(self._waiters))
+        if len(self._waiters) >= self._max_waiters:
+            self._reject("file pleine")
+
+        started = time.monotonic()
+        deadline = started + self._queue_timeout
+        waiter = asyncio.Event()
+        self._waiters.append(waiter)
+        try:
+            while True:
+                # Ordre d'arrivée : seule la tête de file tente sa chance
+                if self._waiters[0] is waiter:
+                    lease = await self._try_acquire()
+                    if lease:
+                        metrics.incr(GATE_METRIC, outcome="admitted", queued=True)
+                        metrics.observe(QUEUE_WAIT_METRIC, time.monotonic() - started)
+                        return lease
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.observe(QUEUE_WAIT_METRIC, time.monotonic() - started)
+                    self._reject("attente trop longue")
+                waiter.clear()
+                try:
+                    await asyncio.wait_for(waiter.wait(), timeout=min(GLOBAL_POLL_INTERVAL, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiters.remove(waiter)
+            self._wake_next()
+
+    def release(self, lease: str) -> None:
+        """Rend un créneau (idempotent)."""
+        held = self._leases.pop(lease, None)
+        if held is None:
+            return
+        metrics.observe(SLOT_DURATION_METRIC, time.monotonic() - held[0])
+        self._wake_next()
+        if self._max_global and time.monotonic() >= self._redis_retry_at:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._release_global(lease)  # Hors boucle d'événements (script)
+            else:
+                # Sans attendre : release() est appelé depuis des blocs finally
+                loop.run_in_executor(None, self._release_global, lease)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[str]:
+        """Créneau tenu le temps du bloc `async with`."""
+        lease = await self.acquire()
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    # ------------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------------
+
+    async def _try_acquire(self) -> Optional[str]:
+        now = time.monotonic()
+        # Baux jamais rendus (stream abandonné sans finalisation)
+        for lease, (_, expires_at) in list(self._leases.items()):
+            if expires_at <= now:
+                del self._leases[lease]
+                logger.warning("Créneau chat expiré sans libération: %s", lease)
+
+        if len(self._leases) >= self._max_per_worker:
+            return None
+        lease = uuid.uuid4().hex
+        # Créneau local réservé avant l'appel Redis : les autres coroutines le voient
+        self._leases[lease] = (now, now + LEASE_TTL)
+        try:
+            granted = not self._max_global or await self._acquire_global(lease)
+        except BaseException:
+            # Requête annulée pendant l'appel Redis : le créneau local est rendu
+            self._leases.pop(lease, None)
+            self._wake_next()
+            raise
+        if not granted:
+            del self._leases[lease]
+            return None
+        return lease
+
+    async def _acquire_global(self, lease: str) -> bool:
+        """Bail dans le sorted set Redis ; sans Redis, seule la limite par worker s'applique."""
+        if time.monotonic() < self._redis_retry_at:
+            return True
+        loop = asyncio.get_running_loop()
+        # Client Redis synchrone (connexion comprise) : hors de la boucle d'événements
+        pending = loop.run_in_executor(None, self._acquire_shared, lease)
+        try:
+            granted = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Le script Redis va jusqu'au bout : le bail est retiré une fois posé
+            pending.add_done_callback(lambda _: loop.run_in_executor(None, self._release_global, lease))
+            raise
+        except Exception as exc:
+            logger.warning("Limite globale du chat indisponible (Redis), limite locale seule: %s", exc)
+            granted = None
+        if granted is None:
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            return True
+        return granted
+
+    def _acquire_shared(self, lease: str) -> Optional[bool]:
+        redis = get_cache().redis
+        if redis is None:
+            return None
+        now = time.time()
+        return bool(redis.eval(
+            _ACQUIRE_SCRIPT, 1, _LEASES_KEY,
+            now, now + LEASE_TTL, self._max_global, lease, LEASE_TTL,
+        ))
+
+    def _release_global(self, lease: str) -> None:
+        redis = get_cache().redis
+        if redis is None:
+            return
+        try:
+            redis.zrem(_LEASES_KEY, lease)
+        except Exception as exc:
+            logger.warning("Libération du créneau chat Redis impossible: %s", exc)
+
+    def _wake_next(self) -> None:
+        if self._waiters:
+            self._waiters[0].set()
+
+    def _retry_after(self) -> int:
+        """Durée typique d'occupation d'un créneau, bornée."""
+        typical = metrics.summary(SLOT_DURATION_METRIC)["p50"] or MIN_RETRY_AFTER
+        return max(MIN_RETRY_AFTER, min(MAX_RETRY_AFTER, math.ceil(typical)))
+
+    def _reject(self, reason: str) -> None:
+        metrics.incr(GATE_METRIC, outcome="rejected")
+        retry_after = self._retry_after()
+        logger.warning(
+            "Chat saturé (%s) — %d en cours, %d en attente, Retry-After %ds",
+            reason, self.in_flight, self.queue_depth, retry_after,
+        )
+        raise ServiceOverloadedError(retry_after=retry_after)
+
+
+# Singleton partagé (un par worker)
+chat_gate = ConcurrencyGate()
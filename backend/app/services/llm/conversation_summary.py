@@ -0,0 +1,69 @@
+"""
+Résumé courant des conversations AÏDA.
+
+Au-delà de MAX_HISTORY messages, les échanges les plus anciens étaient
+perdus, et les 10 derniers renvoyés mot pour mot à chaque appel. Ici :
+- dès FOLD_THRESHOLD messages, tout sauf les KEEP_RECENT derniers est replié
+  dans un résumé court (ancien résumé + échanges repliés)
+- le résumé est injecté dans le prompt système à la place des échanges
+- le résumé est produit après la réponse, hors du chemin de latence
+  (voir LLMService._schedule_fold)
+"""
+
+from typing import Optional
+
+from app.services.llm.groq_provider import is_degraded_reply
+from app.services.llm.token_budget import truncate_to_tokens
+
+# Taille de l'historique qui déclenche un repli (laisse un échange de marge
+# avant que MAX_HISTORY ne fasse sortir des messages non résumés)
+FOLD_THRESHOLD = 8
+# Messages les plus récents toujours conservés mot pour mot
+KEEP_RECENT = 4
+# Taille max d'un résumé (tokens estimés)
+MAX_SUMMARY_TOKENS = 200
+# Un message replié plus long est abrégé avant d'être envoyé au résumé
+MAX_FOLDED_TURN_TOKENS = 300
+
+_INSTRUCTIONS = """\
+Tu résumes une conversation entre un élève et AÏDA, conseillère d'orientation.
+Écris un résumé factuel de 3 à 6 phrases, en français, à la troisième personne : \
+profil et centres d'intérêt de l'élève, filières, métiers et écoles évoqués, \
+conseils déjà donnés et questions restées ouvertes. \
+N'invente rien et n'ajoute aucun commentaire : réponds uniquement par le résumé.\
+"""
+
+_ROLES = {"user": "Élève", "assistant": "AÏDA"}
+
+
+def should_fold(history: list[dict]) -> bool:
+    """Vrai si l'historique est assez long pour replier ses premiers échanges."""
+    return len(history) >= FOLD_THRESHOLD
+
+
+def turns_to_fold(history: list[dict]) -> list[dict]:
+    """Messages à replier : tout l'historique sauf les KEEP_RECENT derniers."""
+    return history[:-KEEP_RECENT]
+
+
+def build_summary_messages(previous_summary: str, turns: list[dict]) -> list[dict]:
+    """Messages de l'appel LLM qui fusionne l'ancien résumé et les échanges repliés."""
+    parts = []
+    if previous_summary:
+        parts.append(f"Résumé précédent :\n{previous_summary}")
+    transcript = "\n".join(
+        f"{_ROLES.get(t['role'], t['role'])} : {truncate_to_tokens(t['content'], MAX_FOLDED_TURN_TOKENS)}"
+        for t in turns
+    )
+    parts.append(f"Suite de la conversation :\n{transcript}")
+    return [
+        {"role": "system", "content": _INSTRUCTIONS},
+        {"role": "user", "content": "\n\n".join(parts)},
+    ]
+
+
+def clean_summary(reply: Optional[str]) -> Optional[str]:
+    """Résumé exploitable, ou None (pas de réponse, réponse de secours)."""
+    if not reply or is_degraded_reply(reply):
+        return None
+    return truncate_to_tokens(reply.strip(), MAX_SUMMARY_TOKENS) or None
@@ -4,59 +4,190 @@ GroqProvider — Appels à l'API Groq avec streaming et fallback Ollama.
 Gère :
 - Appels Groq (principal, gratuit, 14 400 req/jour)
 - Appels Ollama (fallback local, auto-hébergé)
-- Streaming SSE via générateurs asynchrones
+- Streaming SSE (Groq) et NDJSON (Ollama) via générateurs asynchrones
+- Requête de couverture : sans premier token Groq après un délai, Ollama est
+  lancé en parallèle, le premier à streamer gagne et l'autre est annulé
+- Bascule en cours de stream de Groq vers Ollama, qui reprend la réponse entamée
+- Quotas du free tier Groq (QuotaScheduler) : débordement routé vers Ollama
+- Santé des backends (HealthMonitor) : sonde Ollama en tâche de fond, échecs
+  Groq relevés sur les vraies requêtes ; le routage n'attend aucune sonde
+- Clients HTTP persistants (keep-alive, HTTP/2 si disponible) fermés au shutdown
+- Mesures par appel (provider, raison du fallback, TTFT, durée, tokens)
 """
 
+import asyncio
+import json
 import logging
 import os
+import time
+from contextlib import aclosing
 from typing import AsyncGenerator, Optional
 
 import httpx
 
+from app.services.llm.llm_metrics import (
+    FALLBACK_DISABLED,
+    FALLBACK_GROQ_ERROR,
+    FALLBACK_GROQ_UNHEALTHY,
+    FALLBACK_HEDGE,
+    FALLBACK_MID_STREAM,
+    FALLBACK_QUOTA,
+    LLMCallTrace,
+)
+from app.services.llm.health_monitor import HealthMonitor
+from app.services.llm.quota_scheduler import QuotaScheduler, estimate_request_tokens
+
 logger = logging.getLogger(__name__)
 
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_API_URL = os.environ.get("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 GROQ_MODEL = "llama-3.1-8b-instant"
 GROQ_TIMEOUT = 30.0
 
 OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama3.1:8b")
 OLLAMA_TIMEOUT = 90.0
+OLLAMA_CHECK_TIMEOUT = 5.0
+CONNECT_TIMEOUT = 5.0
+
+# Groq écarté après ce nombre d'échecs consécutifs, puis réessayé après GROQ_RETRY_AFTER (s)
+GROQ_FAILURE_THRESHOLD = 3
+GROQ_RETRY_AFTER = 30.0
+
+# Pool de connexions partagé par toutes les conversations d'un worker
+POOL_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # httpx[http2] non installé : HTTP/1.1 keep-alive uniquement
+    HTTP2_AVAILABLE = False
 
 MAX_TOKENS = 800
 TEMPERATURE = 0.7
 
-_UNAVAILABLE_REPLY = (
+UNAVAILABLE_REPLY = (
     "Je suis AÏDA, votre conseillère d'orientation. "
     "Le service est temporairement indisponible. "
     "Réessaie dans quelques instants !"
 )
 
+# Ajouté quand le stream est coupé et qu'aucun fallback ne peut le reprendre
+INTERRUPTED_NOTE = " … (réponse interrompue, réessaie dans quelques instants)"
+
+
+def is_degraded_reply(reply: str) -> bool:
+    """Vrai si la réponse est un message d'indisponibilité ou une réponse tronquée."""
+    return UNAVAILABLE_REPLY in reply or reply.endswith(INTERRUPTED_NOTE)
+
+
+async def _first_chunk(source: AsyncGenerator[str, None]) -> str:
+    """Attend le premier chunk d'un stream (un stream vide est un échec)."""
+    try:
+        return await source.__anext__()
+    except StopAsyncIteration:
+        raise RuntimeError("réponse vide") from None
+
 
 class GroqProvider:
     """Provider LLM : Groq (principal) + Ollama (fallback)."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        hedge_deadline: Optional[float] = None,
+        quota: Optional[QuotaScheduler] = None,
+        health_interval: Optional[float] = None,
+    ) -> None:
         from app.core.config import settings
+        self._hedge_deadline = (
+            settings.CHAT_HEDGE_TTFT_SECONDS if hedge_deadline is None else hedge_deadline
+        )
         self._groq_api_key = (settings.GROQ_API_KEY or "").strip()
         self._groq_enabled = bool(self._groq_api_key)
-        self._ollama_available: Optional[bool] = None
+        self._quota = quota or QuotaScheduler()
+        interval = settings.LLM_HEALTH_INTERVAL_SECONDS if health_interval is None else health_interval
+        self._health = HealthMonitor(interval)
+        # Groq n'est pas sondé (quota) : seules les vraies requêtes le mesurent
+        self._groq_health = self._health.register(
+            "groq", failure_threshold=GROQ_FAILURE_THRESHOLD, retry_after=GROQ_RETRY_AFTER,
+        )
+        self._ollama_health = self._health.register(
+            "ollama", probe=self._check_ollama, failure_threshold=1, retry_after=interval,
+        )
+        self._groq_client: Optional[httpx.AsyncClient] = None
+        self._ollama_client: Optional[httpx.AsyncClient] = None
 
         provider_info = f"Groq ({GROQ_MODEL})" if self._groq_enabled else f"Ollama ({OLLAMA_MODEL})"
         logger.info("GroqProvider initialisé — provider principal: %s", provider_info)
 
+    # ------------------------------------------------------------------
+    # Clients HTTP persistants
+    # ------------------------------------------------------------------
+
+    def _groq_http(self) -> httpx.AsyncClient:
+        """Client Groq partagé : évite un handshake TCP + TLS par message."""
+        if self._groq_client is None or self._groq_client.is_closed:
+            self._groq_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=POOL_LIMITS,
+                timeout=httpx.Timeout(GROQ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                headers={
+                    "Authorization": f"Bearer {self._groq_api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+        return self._groq_client
+
+    def _ollama_http(self) -> httpx.AsyncClient:
+        """Client Ollama partagé (HTTP/1.1 keep-alive, serveur local)."""
+        if self._ollama_client is None or self._ollama_client.is_closed:
+            self._ollama_client = httpx.AsyncClient(
+                limits=POOL_LIMITS,
+                timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=CONNECT_TIMEOUT),
+            )
+        return self._ollama_client
+
+    def start_health_checks(self) -> None:
+        """Lance la sonde de fond des backends (appelé au démarrage de l'application)."""
+        self._health.start()
+
+    def health(self) -> dict:
+        """Disponibilité et latence de chaque backend (endpoint admin)."""
+        return self._health.snapshot()
+
+    async def aclose(self) -> None:
+        """Arrête la sonde et ferme les clients HTTP (shutdown de l'application)."""
+        await self._health.stop()
+        for client in (self._groq_client, self._ollama_client):
+            if client is not None and not client.is_closed:
+                await client.aclose()
+        self._groq_client = None
+        self._ollama_client = None
+
     # ------------------------------------------------------------------
     # API publique — non-streaming
     # ------------------------------------------------------------------
 
-    async def complete(self, messages: list[dict]) -> Optional[str]:
-        """Génère une réponse complète (non-streaming)."""
-        if self._groq_enabled:
+    async def complete(self, messages: list[dict], mode: str = "complete") -> Optional[str]:
+        """
+        Génère une réponse complète (non-streaming).
+        `mode` étiquette l'appel dans les métriques (ex. "summary" pour les résumés).
+        """
+        trace = LLMCallTrace(mode, messages)
+        reply = None
+        if await self._use_groq(messages, trace):
             reply = await self._call_groq(messages)
             if reply:
-                return reply
+                trace.provider = "groq"
+            else:
+                trace.fallback = FALLBACK_GROQ_ERROR
 
-        return await self._call_ollama(messages)
+        if not reply:
+            reply = await self._call_ollama(messages)
+            if reply:
+                trace.provider = "ollama"
+
+        trace.record(reply or "")
+        return reply
 
     # ------------------------------------------------------------------
     # API publique — streaming
@@ -66,46 +197,191 @@ class GroqProvider:
         """
         Génère la réponse en streaming.
         Yield des chunks de texte au fur et à mesure.
+
+        Si Groq échoue en cours de route, Ollama reçoit le début de réponse
+        déjà envoyé (message assistant final) et le poursuit : l'élève ne voit
+        ni doublon ni redémarrage.
         """
-        if self._groq_enabled:
-            async for chunk in self._stream_groq(messages):
+        trace = LLMCallTrace("stream", messages)
+        parts: list[str] = []
+        try:
+            async with aclosing(self._stream_with_failover(messages, trace)) as chunks:
+                async for chunk in chunks:
+                    if not parts:
+                        trace.first_token()
+                    parts.append(chunk)
+                    yield chunk
+        finally:
+            trace.record("".join(parts))
+
+    async def _stream_with_failover(
+        self, messages: list[dict], trace: LLMCallTrace
+    ) -> AsyncGenerator[str, None]:
+        started = await self._start_stream(messages, trace)
+        if started is None:
+            yield UNAVAILABLE_REPLY
+            return
+
+        winner, source, first = started
+        sent = [first]
+        try:
+            yield first
+            async for chunk in source:
+                sent.append(chunk)
                 yield chunk
             return
+        except Exception as exc:
+            logger.warning("%s streaming erreur après %d chunks: %s", winner, len(sent), exc)
+            self._record_stream_failure(winner, exc)
+        finally:
+            await source.aclose()
+
+        if winner == "groq":
+            # Ollama poursuit la réponse entamée
+            trace.fallback = FALLBACK_MID_STREAM
+            continued = False
+            try:
+                async for chunk in self._stream_ollama(
+                    messages + [{"role": "assistant", "content": "".join(sent)}]
+                ):
+                    continued = True
+                    yield chunk
+                if continued:
+                    return
+            except Exception as exc:
+                logger.warning("Ollama streaming erreur: %s", exc)
+
+        # Réponse commencée : on la clôt proprement plutôt que de la répéter
+        yield INTERRUPTED_NOTE
+
+    async def _start_stream(
+        self, messages: list[dict], trace: LLMCallTrace
+    ) -> Optional[tuple[str, AsyncGenerator[str, None], str]]:
+        """
+        Démarre le stream et attend son premier chunk, avec requête de couverture.
+
+        Groq part seul ; si son premier token n'est pas arrivé après
+        `hedge_deadline` secondes (ou s'il échoue avant), Ollama est lancé en
+        parallèle. Le premier provider à produire un token gagne, l'autre est
+        annulé (sa connexion est fermée). Le provider retenu et la raison
+        d'un fallback sont notés dans `trace`.
+
+        Returns:
+            (nom du provider, stream, premier chunk), ou None si aucun n'a répondu.
+        """
+        sources: dict[str, AsyncGenerator[str, None]] = {}
+        pending: dict[asyncio.Future, str] = {}
+        launched: list[str] = []
+
+        started = time.monotonic()
 
-        # Fallback Ollama : pas de vrai streaming, on simule mot par mot
-        reply = await self._call_ollama(messages)
-        if reply:
-            words = reply.split(" ")
-            for i, word in enumerate(words):
-                yield word + ("" if i == len(words) - 1 else " ")
+        def launch(name: str, source: AsyncGenerator[str, None]) -> None:
+            launched.append(name)
+            sources[name] = source
+            pending[asyncio.ensure_future(_first_chunk(source))] = name
+
+        if await self._use_groq(messages, trace):
+            launch("groq", self._stream_groq(messages))
         else:
-            yield _UNAVAILABLE_REPLY
+            launch("ollama", self._stream_ollama(messages))
+
+        try:
+            while pending:
+                hedged = "ollama" in launched
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else self._hedge_deadline,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.warning(
+                        "Groq sans premier token après %.1fs — requête Ollama en parallèle",
+                        self._hedge_deadline,
+                    )
+                    trace.fallback = FALLBACK_HEDGE
+                    launch("ollama", self._stream_ollama(messages))
+                    continue
+
+                for task in done:
+                    name = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        if name == "groq":
+                            self._groq_health.record(True, time.monotonic() - started)
+                        trace.provider = name
+                        if name == "groq":
+                            trace.fallback = None
+                        return name, sources.pop(name), task.result()
+                    logger.warning("%s : échec avant le premier token: %s", name, error)
+                    self._record_stream_failure(name, error)
+                    sources.pop(name)
+                    if not hedged:
+                        trace.fallback = FALLBACK_GROQ_ERROR
+                        launch("ollama", self._stream_ollama(messages))
+
+            return None
+        finally:
+            # Perdant(s) : annulation de la requête en cours
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for name in pending.values():
+                await sources[name].aclose()
+
+    def _record_stream_failure(self, name: str, exc: BaseException) -> None:
+        """Échec d'un stream : Groq est mesuré ici (Ollama l'est dans _stream_ollama)."""
+        if name != "groq":
+            return
+        # Un 429 est une limite de quota (QuotaScheduler), pas une panne
+        if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+            return
+        self._groq_health.record(False)
+
+    async def _use_groq(self, messages: list[dict], trace: LLMCallTrace) -> bool:
+        """
+        Vrai si l'appel doit partir vers Groq : Groq configuré, non déclaré en
+        panne, et créneau obtenu dans les quotas (conversations en cours
+        prioritaires). Si Ollama est déclaré indisponible, Groq est tenté
+        malgré tout.
+        """
+        if not self._groq_enabled:
+            trace.fallback = FALLBACK_DISABLED
+            return False
+        ollama_available = self._ollama_health.available
+        if not self._groq_health.available and ollama_available:
+            trace.fallback = FALLBACK_GROQ_UNHEALTHY
+            return False
+        continuing = any(m.get("role") == "assistant" for m in messages)
+        if await self._quota.acquire(estimate_request_tokens(messages), continuing=continuing):
+            return True
+        if not ollama_available:
+            return True
+        trace.fallback = FALLBACK_QUOTA
+        return False
 
     # ------------------------------------------------------------------
     # Groq — non-streaming
     # ------------------------------------------------------------------
 
     async def _call_groq(self, messages: list[dict]) -> Optional[str]:
+        started = time.monotonic()
         try:
-            async with httpx.AsyncClient(timeout=GROQ_TIMEOUT) as client:
-                resp = await client.post(
-                    GROQ_API_URL,
-                    headers={
-                        "Authorization": f"Bearer {self._groq_api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": GROQ_MODEL,
-                        "messages": messages,
-                        "max_tokens": MAX_TOKENS,
-                        "temperature": TEMPERATURE,
-                    },
-                )
-                resp.raise_for_status()
+            resp = await self._groq_http().post(
+                GROQ_API_URL,
+                json={
+                    "model": GROQ_MODEL,
+                    "messages": messages,
+                    "max_tokens": MAX_TOKENS,
+                    "temperature": TEMPERATURE,
+                },
+            )
+            self._quota.observe(resp.status_code, resp.headers)
+            resp.raise_for_status()
 
             data = resp.json()
             reply = data["choices"][0]["message"]["content"].strip()
             logger.debug("Groq → %d caractères", len(reply))
+            self._groq_health.record(True, time.monotonic() - started)
             return reply
 
         except httpx.HTTPStatusError as exc:
@@ -113,9 +389,12 @@ class GroqProvider:
             logger.warning("Groq erreur %s — fallback Ollama: %s", code, exc.response.text[:200])
             if code == 401:
                 logger.error("GROQ_API_KEY invalide ou expirée")
+            if code != 429:
+                self._groq_health.record(False)
             return None
         except (httpx.TimeoutException, httpx.ConnectError):
             logger.warning("Groq timeout/connect error — fallback Ollama")
+            self._groq_health.record(False)
             return None
         except Exception as exc:
             logger.warning("Groq erreur inattendue — fallback Ollama: %s", exc)
@@ -126,107 +405,129 @@ class GroqProvider:
     # ------------------------------------------------------------------
 
     async def _stream_groq(self, messages: list[dict]) -> AsyncGenerator[str, None]:
-        """Stream la réponse Groq chunk par chunk."""
-        try:
-            async with httpx.AsyncClient(timeout=GROQ_TIMEOUT) as client:
-                async with client.stream(
-                    "POST",
-                    GROQ_API_URL,
-                    headers={
-                        "Authorization": f"Bearer {self._groq_api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": GROQ_MODEL,
-                        "messages": messages,
-                        "max_tokens": MAX_TOKENS,
-                        "temperature": TEMPERATURE,
-                        "stream": True,
-                    },
-                ) as resp:
-                    resp.raise_for_status()
-                    async for line in resp.aiter_lines():
-                        if not line.startswith("data: "):
-                            continue
-                        data_str = line[6:]
-                        if data_str.strip() == "[DONE]":
-                            return
-                        try:
-                            import json
-                            data = json.loads(data_str)
-                            delta = data["choices"][0].get("delta", {})
-                            content = delta.get("content")
-                            if content:
-                                yield content
-                        except Exception:
-                            continue
-
-        except Exception as exc:
-            logger.warning("Groq streaming erreur — fallback: %s", exc)
-            # Fallback non-streaming
-            reply = await self._call_ollama(messages)
-            if reply:
-                yield reply
-            else:
-                yield _UNAVAILABLE_REPLY
+        """Stream la réponse Groq chunk par chunk (lève une exception en cas d'échec)."""
+        async with self._groq_http().stream(
+            "POST",
+            GROQ_API_URL,
+            json={
+                "model": GROQ_MODEL,
+                "messages": messages,
+                "max_tokens": MAX_TOKENS,
+                "temperature": TEMPERATURE,
+                "stream": True,
+            },
+        ) as resp:
+            self._quota.observe(resp.status_code, resp.headers)
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data_str = line[6:]
+                if data_str.strip() == "[DONE]":
+                    # Lire jusqu'à la fin du corps : une réponse abandonnée
+                    # ferme la connexion au lieu de la rendre au pool
+                    continue
+                try:
+                    data = json.loads(data_str)
+                    delta = data["choices"][0].get("delta", {})
+                    content = delta.get("content")
+                    if content:
+                        yield content
+                except Exception:
+                    continue
 
     # ------------------------------------------------------------------
     # Ollama — fallback
     # ------------------------------------------------------------------
 
     async def _call_ollama(self, messages: list[dict]) -> Optional[str]:
-        if self._ollama_available is None:
-            self._ollama_available = await self._check_ollama()
-
-        if not self._ollama_available:
+        if not self._ollama_health.available:
             return None
 
+        started = time.monotonic()
         try:
-            async with httpx.AsyncClient(timeout=OLLAMA_TIMEOUT) as client:
-                resp = await client.post(
-                    f"{OLLAMA_BASE_URL}/api/chat",
-                    json={
-                        "model": OLLAMA_MODEL,
-                        "messages": messages,
-                        "stream": False,
-                        "options": {"num_predict": MAX_TOKENS, "temperature": TEMPERATURE},
-                    },
-                )
-                resp.raise_for_status()
+            resp = await self._ollama_http().post(
+                f"{OLLAMA_BASE_URL}/api/chat",
+                json={
+                    "model": OLLAMA_MODEL,
+                    "messages": messages,
+                    "stream": False,
+                    "options": {"num_predict": MAX_TOKENS, "temperature": TEMPERATURE},
+                },
+            )
+            resp.raise_for_status()
 
             reply = resp.json().get("message", {}).get("content", "").strip()
             if not reply:
                 logger.warning("Ollama réponse vide")
                 return None
             logger.debug("Ollama → %d caractères", len(reply))
+            self._ollama_health.record(True, time.monotonic() - started)
             return reply
 
         except (httpx.ConnectError, httpx.TimeoutException):
             logger.warning("Ollama indisponible (%s)", OLLAMA_BASE_URL)
-            self._ollama_available = False
+            self._ollama_health.record(False)
             return None
         except Exception as exc:
             logger.warning("Ollama erreur: %s", exc)
             return None
 
-    async def _check_ollama(self) -> bool:
+    async def _stream_ollama(self, messages: list[dict]) -> AsyncGenerator[str, None]:
+        """
+        Stream natif Ollama (/api/chat, NDJSON : un objet JSON par ligne).
+        Ne yield rien si Ollama est indisponible ; lève une exception si le
+        stream casse en cours de route.
+        """
+        if not self._ollama_health.available:
+            return
+
+        started = time.monotonic()
+        first = True
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{OLLAMA_BASE_URL}/api/tags")
+            async with self._ollama_http().stream(
+                "POST",
+                f"{OLLAMA_BASE_URL}/api/chat",
+                json={
+                    "model": OLLAMA_MODEL,
+                    "messages": messages,
+                    "stream": True,
+                    "options": {"num_predict": MAX_TOKENS, "temperature": TEMPERATURE},
+                },
+            ) as resp:
                 resp.raise_for_status()
-                models = [m.get("name", "") for m in resp.json().get("models", [])]
-                found = any(
-                    OLLAMA_MODEL in name or name.startswith(OLLAMA_MODEL.split(":")[0])
-                    for name in models
-                )
-                if found:
-                    logger.info("Ollama disponible — modèle '%s' trouvé", OLLAMA_MODEL)
-                else:
-                    logger.warning("Ollama joignable mais modèle '%s' absent", OLLAMA_MODEL)
-                return True
+                async for line in resp.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise RuntimeError(f"Ollama: {data['error']}")
+                    content = data.get("message", {}).get("content")
+                    if content:
+                        if first:
+                            first = False
+                            self._ollama_health.record(True, time.monotonic() - started)
+                        yield content
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            logger.warning("Ollama indisponible (%s)", OLLAMA_BASE_URL)
+            self._ollama_health.record(False)
+
+    async def _check_ollama(self) -> bool:
+        """Sonde Ollama : serveur joignable et modèle installé."""
+        try:
+            resp = await self._ollama_http().get(f"{OLLAMA_BASE_URL}/api/tags", timeout=OLLAMA_CHECK_TIMEOUT)
+            resp.raise_for_status()
+            models = [m.get("name", "") for m in resp.json().get("models", [])]
+            found = any(
+                OLLAMA_MODEL in name or name.startswith(OLLAMA_MODEL.split(":")[0])
+                for name in models
+            )
+            if not found:
+                logger.warning("Ollama joignable mais modèle '%s' absent", OLLAMA_MODEL)
+            return found
         except (httpx.ConnectError, httpx.TimeoutException):
-            logger.info("Ollama non joignable sur %s", OLLAMA_BASE_URL)
+            logger.debug("Ollama non joignable sur %s", OLLAMA_BASE_URL)
             return False
         except Exception as exc:
-            logger.info("Erreur vérification Ollama: %s", exc)
+            logger.debug("Erreur vérification Ollama: %s", exc)
             return False
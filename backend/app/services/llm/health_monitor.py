@@ -0,0 +1,155 @@
+"""
+HealthMonitor — État de santé des backends LLM (Groq, Ollama).
+
+Remplace la vérification unique d'Ollama (un drapeau figé à False pour la
+vie du process après une seule ConnectError, et une sonde sur le chemin de
+la requête) par :
+- une tâche de fond qui sonde périodiquement les backends qui ont une sonde
+  (Ollama : GET /api/tags)
+- les résultats des vraies requêtes, enregistrés au passage (Groq n'est pas
+  sondé : chaque sonde consommerait son quota de requêtes)
+- pour chaque backend, une disponibilité glissante et une latence lissée
+
+Le routage lit cet état sans aucun appel réseau. Un backend déclaré
+indisponible redevient candidat dès qu'une sonde réussit, ou à l'essai
+après `retry_after` secondes (pas d'exclusion définitive).
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Résultats retenus pour la disponibilité glissante
+HEALTH_WINDOW = 20
+# Lissage exponentiel de la latence (poids de la dernière mesure)
+LATENCY_ALPHA = 0.3
+
+Probe = Callable[[], Awaitable[bool]]
+
+
+class BackendHealth:
+    """Disponibilité glissante et latence lissée d'un backend."""
+
+    def __init__(self, name: str, failure_threshold: int = 1, retry_after: float = 30.0) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._retry_after = retry_after
+        self._results: deque[bool] = deque(maxlen=HEALTH_WINDOW)
+        self._latency: Optional[float] = None
+        self._consecutive_failures = 0
+        self._last_failure_at = 0.0
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        """Enregistre le résultat d'une sonde ou d'une vraie requête."""
+        was_available = self.available
+        self._results.append(ok)
+        if ok:
+            self._consecutive_failures = 0
+            if latency is not None:
+                self._latency = latency if self._latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self._latency
+                )
+        else:
+            self._consecutive_failures += 1
+            self._last_failure_at = time.monotonic()
+
+        if self.available != was_available:
+            if self.available:
+                logger.info("Backend LLM %s de nouveau disponible", self.name)
+            else:
+                logger.warning(
+                    "Backend LLM %s indisponible (%d échecs consécutifs)",
+                    self.name, self._consecutive_failures,
+                )
+
+    @property
+    def available(self) -> bool:
+        """
+        Faux après `failure_threshold` échecs consécutifs, jusqu'à un succès ou
+        l'écoulement de `retry_after` secondes depuis le dernier échec.
+        Un backend jamais mesuré est présumé disponible.
+        """
+        if self._consecutive_failures < self._failure_threshold:
+            return True
+        return time.monotonic() - self._last_failure_at >= self._retry_after
+
+    @property
+    def availability(self) -> Optional[float]:
+        """Part des derniers résultats en succès (None sans mesure)."""
+        if not self._results:
+            return None
+        return sum(self._results) / len(self._results)
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Latence lissée des succès (secondes)."""
+        return self._latency
+
+    def snapshot(self) -> dict:
+        return {
+            "available": self.available,
+            "availability": self.availability,
+            "latency_ms": round(self._latency * 1000, 1) if self._latency is not None else None,
+            "consecutive_failures": self._consecutive_failures,
+            "samples": len(self._results),
+        }
+
+
+class HealthMonitor:
+    """Registre des backends et tâche de fond qui exécute leurs sondes."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._backends: dict[str, BackendHealth] = {}
+        self._probes: dict[str, Probe] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        probe: Optional[Probe] = None,
+        failure_threshold: int = 1,
+        retry_after: float = 30.0,
+    ) -> BackendHealth:
+        health = BackendHealth(name, failure_threshold=failure_threshold, retry_after=retry_after)
+        self._backends[name] = health
+        if probe is not None:
+            self._probes[name] = probe
+        return health
+
+    def __getitem__(self, name: str) -> BackendHealth:
+        return self._backends[name]
+
+    async def probe_all(self) -> None:
+        """Exécute une fois toutes les sondes."""
+        for name, probe in self._probes.items():
+            started = time.monotonic()
+            try:
+                ok = await probe()
+            except Exception as exc:
+                logger.debug("Sonde %s en erreur: %s", name, exc)
+                ok = False
+            self._backends[name].record(ok, time.monotonic() - started)
+
+    def start(self) -> None:
+        """Lance la tâche de sonde (idempotent)."""
+        if self._probes and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {name: health.snapshot() for name, health in self._backends.items()}
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self._interval)
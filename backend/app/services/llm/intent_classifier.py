@@ -0,0 +1,149 @@
+"""
+IntentClassifier — Pré-classification locale des messages hors-domaine.
+
+_GUARDRAILS demande au LLM de refuser la politique, la religion, les devoirs,
+etc. : chaque message hors-sujet coûtait donc un aller-retour Groq complet
+pour produire un refus. Ce composant :
+- entraîne au chargement un Bayes naïf multinomial sur le jeu étiqueté
+  d'intent_dataset (mots + n-grammes de caractères, robustes aux fautes
+  et aux variantes d'un même mot)
+- classe un message en quelques dizaines de microsecondes, sans réseau
+- ne court-circuite le LLM qu'au-delà d'un seuil de confiance, et jamais si
+  le message contient un terme d'orientation (métier, filière, école...) :
+  un refus à tort coûte plus cher qu'un appel LLM
+"""
+
+import logging
+import math
+import re
+from typing import Optional
+
+from app.services.llm.intent_dataset import INTENT_EXAMPLES, ORIENTATION
+from app.services.llm.kb_retriever import fold_accents, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Réponse identique à celle que _GUARDRAILS impose au LLM
+OFF_DOMAIN_REPLY = (
+    "Je suis spécialisée uniquement en orientation scolaire et professionnelle, "
+    "je ne peux pas t'aider sur ce sujet. 😊 Mais si tu as une question sur tes "
+    "études, tes choix de filière ou ton avenir professionnel, je suis là !"
+)
+
+# n-grammes de caractères pris à l'intérieur des mots (bornes marquées)
+NGRAM_SIZE = 4
+# Lissage additif des vraisemblances
+SMOOTHING = 0.3
+# En dessous, le message est trop court pour être jugé (« ok », « et toi ? »)
+MIN_WORDS = 2
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Un de ces termes (forme indexée : sans accent, au singulier) suffit à
+# laisser passer le message vers le LLM : vocabulaire de l'orientation,
+# de la scolarité (révisions, examens, notes), du test et salutations
+_PASS_THROUGH_TERMS = frozenset("""
+metier filiere etude etudier universite universitaire ecole formation bac
+licence master bts doctorat concours carriere salaire emploi debouche
+orientation diplome inscription inscrire bourse stage apprentissage riasec
+profil devenir travailler travail recrute recrutement profession
+professionnel specialite serie test resultat score conseil
+reviser revision examen stres stresser moyenne note cour lecon concentrer
+concentration memoriser procrastiner procrastination bepc redoubler redoublement
+trimestre
+bonjour bonsoir salut coucou hello merci
+""".split())
+
+
+def features(text: str) -> list[str]:
+    """Traits distincts du texte : mots indexés (voir kb_retriever.tokenize) et n-grammes."""
+    grams: list[str] = []
+    for word in _WORD_RE.findall(fold_accents(text)):
+        bounded = f"<{word}>"
+        grams.extend(f"#{bounded[i:i + NGRAM_SIZE]}" for i in range(len(bounded) - NGRAM_SIZE + 1))
+    return list(dict.fromkeys(tokenize(text) + grams))
+
+
+class IntentClassifier:
+    """Bayes naïf multinomial sur mots + n-grammes de caractères."""
+
+    def __init__(
+        self,
+        examples: Optional[dict[str, list[str]]] = None,
+        threshold: Optional[float] = None,
+    ) -> None:
+        if threshold is None:
+            from app.core.config import settings
+            threshold = settings.CHAT_OFF_DOMAIN_THRESHOLD
+        self._threshold = threshold
+        self._train(examples or INTENT_EXAMPLES)
+
+    def _train(self, examples: dict[str, list[str]]) -> None:
+        total = sum(len(texts) for texts in examples.values())
+        counts: dict[str, dict[str, int]] = {}
+        vocabulary: set[str] = set()
+        for label, texts in examples.items():
+            label_counts = counts.setdefault(label, {})
+            for text in texts:
+                for feature in features(text):
+                    label_counts[feature] = label_counts.get(feature, 0) + 1
+                    vocabulary.add(feature)
+
+        self._labels = list(examples)
+        self._log_priors = {label: math.log(len(examples[label]) / total) for label in self._labels}
+        self._log_likelihoods: dict[str, dict[str, float]] = {}
+        self._log_unseen: dict[str, float] = {}
+        for label in self._labels:
+            denominator = sum(counts[label].values()) + SMOOTHING * len(vocabulary)
+            self._log_likelihoods[label] = {
+                feature: math.log((count + SMOOTHING) / denominator)
+                for feature, count in counts[label].items()
+            }
+            self._log_unseen[label] = math.log(SMOOTHING / denominator)
+        self._vocabulary = vocabulary
+        logger.info(
+            "Classifieur d'intention entraîné : %d exemples, %d intentions, %d traits",
+            total, len(self._labels), len(vocabulary),
+        )
+
+    def predict(self, message: str) -> tuple[str, float]:
+        """
+        Retourne (intention hors-domaine la plus probable, confiance entre 0 et 1).
+
+        La confiance est la probabilité que le message ne relève pas de
+        l'orientation. Les scores sont divisés par la racine du nombre de
+        traits : les n-grammes d'un même mot ne sont pas indépendants, et le
+        Bayes naïf brut donnerait une confiance de ~1 à presque tout message.
+        """
+        known = [f for f in features(message) if f in self._vocabulary]
+        if not known:
+            return ORIENTATION, 0.0
+        scale = 1 / math.sqrt(len(known))
+        scores = {
+            label: scale * (self._log_priors[label] + sum(
+                self._log_likelihoods[label].get(f, self._log_unseen[label]) for f in known
+            ))
+            for label in self._labels
+        }
+        top = max(scores.values())
+        weights = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(weights.values())
+        off_domain = {label: w for label, w in weights.items() if label != ORIENTATION}
+        if not off_domain:
+            return ORIENTATION, 0.0
+        best = max(off_domain, key=lambda label: off_domain[label])
+        return best, 1 - weights.get(ORIENTATION, 0.0) / total
+
+    def off_domain_intent(self, message: str) -> Optional[str]:
+        """
+        Intention hors-domaine du message si elle est assez sûre pour répondre
+        sans LLM, sinon None (le message suit le chemin normal).
+        """
+        words = tokenize(message)
+        if len(words) < MIN_WORDS or _PASS_THROUGH_TERMS.intersection(words):
+            return None
+        label, confidence = self.predict(message)
+        if confidence < self._threshold:
+            return None
+        logger.info("Message hors-domaine (%s, confiance %.2f) — réponse sans LLM", label, confidence)
+        return label
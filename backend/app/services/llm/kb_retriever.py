@@ -0,0 +1,243 @@
+"""
+KBRetriever — Recherche BM25 locale dans la base de connaissances AÏDA.
+
+Au lieu d'injecter toute la KB (écoles, métiers, salaires) dans chaque prompt,
+on indexe les entrées de la table knowledge_base et on ne retient que les
+extraits les plus pertinents pour la question de l'élève.
+
+Gère :
+- La normalisation du français (minuscules, accents repliés, mots vides retirés)
+- Un index inversé BM25 reconstruit à chaque nouvelle version de la KB, en
+  ne retokenisant que les entrées nouvelles ou modifiées ; la reconstruction
+  tourne hors de la boucle d'événements pendant que l'index précédent reste servi
+- La recherche des top-k entrées pour une question
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+import unicodedata
+from typing import Optional
+
+from app.repositories.knowledge_base_repository import knowledge_base_repository
+
+logger = logging.getLogger(__name__)
+
+# Paramètres BM25 standards (Robertson / Lucene)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Nombre d'extraits injectés dans le prompt
+TOP_K = 6
+# Durée de vie de l'index (aligné sur le cache KB du repository)
+INDEX_TTL = 3600
+
+# Pondération du titre : une école ou un métier cité par son nom doit sortir en tête
+TITLE_BOOST = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset("""
+a au aux avec ce ces cet cette dans de des du elle elles en est et eux il ils je
+la le les leur leurs lui ma mais me mes moi mon ne nos notre nous on ou par pas
+pour qu que qui sa se ses son sur ta te tes toi ton tu un une vos votre vous y
+d l j m n s t c sont suis es etre avoir ai as ont fait faire
+quel quelle quels quelles quoi comment pourquoi
+plus moins tres bien aussi comme donc alors si peut peux veux voudrais
+""".split())
+
+
+def fold_accents(text: str) -> str:
+    """Supprime les accents (é -> e, ç -> c) après mise en minuscules."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Découpe un texte français en termes d'index.
+
+    Accents repliés, mots vides retirés, pluriel simple ramené au singulier
+    (écoles -> ecole, métiers -> metier, travaux -> travau).
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(fold_accents(text)):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token[-1] in "sx":
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def entry_terms(entry: dict) -> dict[str, int]:
+    """Fréquence des termes d'une entrée (titre pondéré par TITLE_BOOST)."""
+    terms = tokenize(f"{entry.get('category', '')} {entry.get('content', '')}")
+    terms.extend(tokenize(entry.get("title", "")) * TITLE_BOOST)
+    counts: dict[str, int] = {}
+    for term in terms:
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+def _entry_key(entry: dict) -> tuple[str, str, str]:
+    return entry.get("category", ""), entry.get("title", ""), entry.get("content", "")
+
+
+class BM25Index:
+    """Index inversé BM25 sur des entrées {category, title, content}."""
+
+    def __init__(
+        self,
+        entries: list[dict],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+        term_counts: Optional[list[dict[str, int]]] = None,
+    ) -> None:
+        """`term_counts` : fréquences déjà calculées (entry_terms), dans l'ordre des entrées."""
+        self._entries = entries
+        self._k1 = k1
+        self._b = b
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._doc_lengths: list[int] = []
+
+        if term_counts is None:
+            term_counts = [entry_terms(entry) for entry in entries]
+        for doc_id, counts in enumerate(term_counts):
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+            self._doc_lengths.append(sum(counts.values()))
+
+        n_docs = len(entries)
+        self._avg_length = (sum(self._doc_lengths) / n_docs) if n_docs else 0.0
+        self._idf = {
+            term: math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> list[tuple[dict, float]]:
+        """Retourne les k entrées les plus pertinentes avec leur score (décroissant)."""
+        if not self._entries:
+            return []
+
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for doc_id, tf in postings:
+                norm = self._k1 * (1 - self._b + self._b * self._doc_lengths[doc_id] / self._avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self._k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self._entries[doc_id], score) for doc_id, score in ranked[:k] if score > min_score]
+
+
+def format_snippets(entries: list[dict]) -> str:
+    """Formate des entrées KB comme la KB complète (regroupées par catégorie)."""
+    lines: list[str] = []
+    current_category: Optional[str] = None
+    for entry in sorted(entries, key=lambda e: e.get("category", "")):
+        category = entry.get("category", "")
+        if category != current_category:
+            current_category = category
+            lines.append(f"\n**{category.upper()} :**\n")
+        lines.append(f"- {entry.get('title', '')} : {entry.get('content', '')}")
+    return "\n".join(lines)
+
+
+class KBRetriever:
+    """
+    Index BM25 de la KB, reconstruit quand la version de la KB change ou à
+    expiration. Les fréquences de termes sont gardées par entrée : une
+    reconstruction ne retokenise que les entrées nouvelles ou modifiées.
+    """
+
+    def __init__(self, kb_repository, top_k: int = TOP_K, ttl: float = INDEX_TTL) -> None:
+        self._kb_repository = kb_repository
+        self._top_k = top_k
+        self._ttl = ttl
+        self._index: Optional[BM25Index] = None
+        self._version: Optional[int] = None
+        self._built_at = 0.0
+        self._term_counts: dict[tuple[str, str, str], dict[str, int]] = {}
+        self._refresh: Optional[asyncio.Task] = None
+
+    def rebuild(self) -> int:
+        """Recharge les entrées depuis le repository et reconstruit l'index."""
+        version = self._kb_repository.current_version()
+        entries = self._kb_repository.get_entries()
+
+        term_counts: dict[tuple[str, str, str], dict[str, int]] = {}
+        for entry in entries:
+            key = _entry_key(entry)
+            if key not in term_counts:
+                cached = self._term_counts.get(key)
+                term_counts[key] = cached if cached is not None else entry_terms(entry)
+        retokenized = sum(1 for key in term_counts if key not in self._term_counts)
+        self._term_counts = term_counts
+
+        self._index = BM25Index(entries, term_counts=[term_counts[_entry_key(e)] for e in entries])
+        self._version = version
+        self._built_at = time.monotonic()
+        logger.info(
+            "Index KB reconstruit : %d entrées, %d retokenisées (v%s)", len(entries), retokenized, version
+        )
+        return len(entries)
+
+    def _is_stale(self) -> bool:
+        return (
+            self._index is None
+            or self._kb_repository.current_version() != self._version
+            or time.monotonic() - self._built_at >= self._ttl
+        )
+
+    def request_refresh(self) -> bool:
+        """
+        Lance une reconstruction en tâche de fond (une seule à la fois).
+        False hors boucle d'événements : l'appelant reconstruit lui-même.
+        """
+        if self._refresh is not None and not self._refresh.done():
+            return True
+        try:
+            self._refresh = asyncio.get_running_loop().create_task(self._rebuild_in_thread())
+        except RuntimeError:
+            return False
+        return True
+
+    async def _rebuild_in_thread(self) -> None:
+        try:
+            # Lectures Supabase/Redis et tokenisation synchrones : hors de la boucle d'événements
+            await asyncio.to_thread(self.rebuild)
+        except Exception as exc:
+            logger.warning("Reconstruction de l'index KB impossible: %s", exc)
+
+    def start(self) -> None:
+        """Construit l'index en tâche de fond au démarrage de l'application."""
+        self.request_refresh()
+
+    def _current_index(self) -> Optional[BM25Index]:
+        """Index courant ; s'il est périmé, le précédent reste servi pendant la reconstruction."""
+        if self._is_stale() and not self.request_refresh():
+            self.rebuild()  # Hors boucle d'événements (script, test)
+        return self._index
+
+    def retrieve(self, query: str, k: Optional[int] = None) -> Optional[list[dict]]:
+        """
+        Retourne les entrées KB les plus pertinentes pour la question, ou None
+        tant que le premier index n'est pas construit.
+        """
+        index = self._current_index()
+        if index is None:
+            return None
+        return [entry for entry, _ in index.search(query, k or self._top_k)]
+
+
+# Singleton partagé
+kb_retriever = KBRetriever(knowledge_base_repository)
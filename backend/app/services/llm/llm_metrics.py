@@ -0,0 +1,144 @@
+"""
+Instrumentation des appels LLM d'AÏDA.
+
+Chaque appel (streaming ou non) enregistre dans le registre de métriques :
+- le provider qui a répondu et la raison d'un éventuel fallback
+- le TTFT, la durée totale et le débit de sortie (tokens/s)
+- les tokens d'entrée et de sortie estimés
+
+`llm_summary()` agrège ces séries avec le cache de réponses et les quotas Groq
+pour l'endpoint admin : dimensionnement d'Ollama, dépendance à Groq.
+"""
+
+import logging
+import time
+from typing import Optional
+
+from app.core.metrics import metrics
+from app.services.llm.answer_cache import HIT_RATE_METRIC
+from app.services.llm.quota_scheduler import QUOTA_METRIC
+from app.services.llm.token_budget import estimate_tokens
+from app.services.llm.transcript_sink import TRANSCRIPTS_METRIC
+
+logger = logging.getLogger(__name__)
+
+REQUESTS_METRIC = "aida_llm_requests"
+TTFT_METRIC = "aida_llm_ttft_seconds"
+DURATION_METRIC = "aida_llm_duration_seconds"
+OUTPUT_RATE_METRIC = "aida_llm_output_tokens_per_second"
+INPUT_TOKENS_METRIC = "aida_llm_input_tokens"
+OUTPUT_TOKENS_METRIC = "aida_llm_output_tokens"
+
+CHAT_TURNS_METRIC = "aida_chat_turns"
+CHAT_DISCONNECTS_METRIC = "aida_chat_client_disconnects"
+PROMPT_TOKENS_METRIC = "aida_chat_prompt_tokens"
+# Replis de l'historique dans le résumé courant (étiquette "outcome")
+SUMMARY_FOLDS_METRIC = "aida_chat_summary_folds"
+
+# Raisons de fallback (étiquette "fallback" de REQUESTS_METRIC)
+FALLBACK_DISABLED = "groq_disabled"  # pas de GROQ_API_KEY : Ollama seul
+FALLBACK_QUOTA = "quota"  # quota Groq atteint, routage direct vers Ollama
+FALLBACK_GROQ_UNHEALTHY = "groq_unhealthy"  # Groq en panne récente, routage direct vers Ollama
+FALLBACK_HEDGE = "hedge"  # Groq trop lent : Ollama a répondu le premier
+FALLBACK_GROQ_ERROR = "groq_error"  # Groq en échec avant le premier token
+FALLBACK_MID_STREAM = "mid_stream"  # Groq coupé en cours de réponse
+NO_FALLBACK = "none"
+
+
+class LLMCallTrace:
+    """Mesures d'un appel LLM, complétées par le provider puis enregistrées."""
+
+    def __init__(self, mode: str, messages: list[dict]) -> None:
+        self.mode = mode
+        self.provider: Optional[str] = None
+        self.fallback: Optional[str] = None
+        self.input_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+        self._started = time.monotonic()
+        self._first_token_at: Optional[float] = None
+
+    def first_token(self) -> None:
+        if self._first_token_at is None:
+            self._first_token_at = time.monotonic()
+
+    def record(self, reply: str) -> None:
+        """Enregistre l'appel terminé (réponse vide si aucun provider n'a répondu)."""
+        duration = time.monotonic() - self._started
+        provider = self.provider or "none"
+        metrics.incr(REQUESTS_METRIC, mode=self.mode, provider=provider, fallback=self.fallback or NO_FALLBACK)
+        if self.provider is None:
+            return
+
+        output_tokens = estimate_tokens(reply)
+        metrics.observe(DURATION_METRIC, duration, provider=provider)
+        metrics.observe(INPUT_TOKENS_METRIC, self.input_tokens, provider=provider)
+        metrics.observe(OUTPUT_TOKENS_METRIC, output_tokens, provider=provider)
+
+        generation = duration
+        if self._first_token_at is not None:
+            ttft = self._first_token_at - self._started
+            metrics.observe(TTFT_METRIC, ttft, provider=provider)
+            generation = duration - ttft
+        if output_tokens and generation > 0:
+            metrics.observe(OUTPUT_RATE_METRIC, output_tokens / generation, provider=provider)
+
+        logger.debug(
+            "LLM %s via %s (fallback=%s) — %d tokens entrée, %d tokens sortie en %.2fs",
+            self.mode, provider, self.fallback or NO_FALLBACK, self.input_tokens, output_tokens, duration,
+        )
+
+
+def llm_summary() -> dict:
+    """Agrégat des métriques LLM de ce worker depuis le démarrage."""
+    total = metrics.count(REQUESTS_METRIC)
+    providers = {}
+    for provider in metrics.label_values(REQUESTS_METRIC, "provider"):
+        requests = metrics.count(REQUESTS_METRIC, provider=provider)
+        providers[provider] = {
+            "requests": requests,
+            "share": requests / total if total else 0.0,
+            "ttft_seconds": metrics.summary(TTFT_METRIC, provider=provider),
+            "duration_seconds": metrics.summary(DURATION_METRIC, provider=provider),
+            "output_tokens_per_second": metrics.summary(OUTPUT_RATE_METRIC, provider=provider),
+            "input_tokens": metrics.summary(INPUT_TOKENS_METRIC, provider=provider),
+            "output_tokens": metrics.summary(OUTPUT_TOKENS_METRIC, provider=provider),
+        }
+
+    fallbacks = {
+        reason: metrics.count(REQUESTS_METRIC, fallback=reason)
+        for reason in metrics.label_values(REQUESTS_METRIC, "fallback")
+        if reason != NO_FALLBACK
+    }
+    cache_lookups = metrics.count(HIT_RATE_METRIC)
+    return {
+        "requests": total,
+        "providers": providers,
+        "fallbacks": fallbacks,
+        "fallback_rate": sum(fallbacks.values()) / total if total else 0.0,
+        "chat_turns": {
+            path: metrics.count(CHAT_TURNS_METRIC, path=path)
+            for path in metrics.label_values(CHAT_TURNS_METRIC, "path")
+        },
+        # Refus hors-domaine servis sans appel LLM, par intention détectée
+        "off_domain": {
+            intent: metrics.count(CHAT_TURNS_METRIC, path="off_domain", intent=intent)
+            for intent in metrics.label_values(CHAT_TURNS_METRIC, "intent")
+        },
+        "client_disconnects": metrics.count(CHAT_DISCONNECTS_METRIC),
+        "prompt_tokens": metrics.summary(PROMPT_TOKENS_METRIC),
+        "summary_folds": {
+            outcome: metrics.count(SUMMARY_FOLDS_METRIC, outcome=outcome)
+            for outcome in metrics.label_values(SUMMARY_FOLDS_METRIC, "outcome")
+        },
+        "transcripts": {
+            outcome: metrics.count(TRANSCRIPTS_METRIC, outcome=outcome)
+            for outcome in metrics.label_values(TRANSCRIPTS_METRIC, "outcome")
+        },
+        "answer_cache": {
+            "lookups": cache_lookups,
+            "hit_rate": metrics.ratio(HIT_RATE_METRIC, "result", "hit"),
+        },
+        "groq_quota": {
+            "granted": metrics.count(QUOTA_METRIC, outcome="granted"),
+            "overflow": metrics.count(QUOTA_METRIC, outcome="overflow"),
+        },
+    }
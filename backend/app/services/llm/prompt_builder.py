@@ -4,13 +4,23 @@ PromptBuilder — Construction des prompts système pour AÏDA.
 Assemble le prompt système à partir :
 - du persona et des règles de base
 - des garde-fous éducatifs
-- de la base de connaissances (chargée depuis le repository)
+- des extraits pertinents de la base de connaissances (recherche BM25),
+  ou de la KB complète si aucune question n'est fournie
 - du contexte d'orientation de l'élève (optionnel)
+- du résumé des échanges plus anciens de la conversation (optionnel)
+
+Le préfixe statique (persona + garde-fous, et la KB complète) est compilé une
+fois par version de KB et gardé en mémoire : seuls les extraits KB et le bloc
+propre à l'élève sont formatés à chaque requête.
 """
 
 import logging
+import time
 from typing import Optional
 
+from app.services.llm.intent_classifier import OFF_DOMAIN_REPLY
+from app.services.llm.kb_retriever import format_snippets
+
 logger = logging.getLogger(__name__)
 
 _PERSONA = """\
@@ -33,7 +43,7 @@ dédiée aux lycéens et étudiants au Togo et en Afrique de l'Ouest.
 - Termine toujours sur une note encourageante
 """
 
-_GUARDRAILS = """\
+_GUARDRAILS = f"""\
 
 **RESTRICTION ABSOLUE — Domaine éducatif uniquement :**
 Tu ne réponds QU'AUX questions liées à l'éducation et l'orientation.
@@ -48,9 +58,23 @@ Sujets INTERDITS (refuse poliment et redirige) :
 - Programmation/code (sauf pour expliquer la filière informatique)
 - Toute question sans rapport avec l'éducation ou l'orientation
 
-Si hors-sujet, réponds : "Je suis spécialisée uniquement en orientation scolaire \
-et professionnelle, je ne peux pas t'aider sur ce sujet. 😊 Mais si tu as une \
-question sur tes études, tes choix de filière ou ton avenir professionnel, je suis là !"
+Si hors-sujet, réponds : "{OFF_DOMAIN_REPLY}"
+"""
+
+# Durée max d'un préfixe compilé (la KB statique de secours ne doit pas rester figée)
+COMPILED_PREFIX_TTL = 3600
+
+_RETRIEVED_KB_TEMPLATE = """\
+
+**EXTRAITS DE LA BASE DE DONNÉES (sélectionnés pour cette question) :**
+{snippets}
+"""
+
+_NO_SNIPPET_KB = """\
+
+**BASE DE DONNÉES :** aucun extrait ne correspond à cette question. \
+Si l'élève demande une école, un métier ou un salaire précis, dis-lui que tu \
+n'as pas cette information et propose-lui de reformuler.
 """
 
 _CONTEXT_TEMPLATE = """\
@@ -62,32 +86,102 @@ Utilise ces informations pour personnaliser chaque réponse. \
 L'élève vient de recevoir ces résultats et a peut-être des questions ou des doutes.
 """
 
+_SUMMARY_TEMPLATE = """\
+
+**Résumé des échanges précédents avec l'élève :**
+{summary}
+"""
+
+
+# Préfixe commun à tous les prompts, compilé une seule fois
+_STATIC_PREFIX = _PERSONA + _GUARDRAILS
+
 
 class PromptBuilder:
     """Construit le prompt système AÏDA."""
 
-    def __init__(self, kb_repository) -> None:
+    def __init__(self, kb_repository, retriever=None) -> None:
         self._kb_repository = kb_repository
-
-    def build(self, orientation_context: Optional[dict] = None) -> str:
+        self._retriever = retriever
+        self._full_prompt: Optional[str] = None
+        self._full_prompt_version: Optional[int] = None
+        self._full_prompt_built_at = 0.0
+
+    def build(
+        self,
+        orientation_context: Optional[dict] = None,
+        query: Optional[str] = None,
+        kb_entries: Optional[list[dict]] = None,
+        summary: Optional[str] = None,
+    ) -> str:
         """
         Construit le prompt système complet.
 
         Args:
             orientation_context: Profil RIASEC de l'élève (optionnel).
+            query: Question de l'élève ; si fournie (et un retriever configuré),
+                seuls les extraits KB pertinents sont injectés.
+            kb_entries: Extraits KB déjà sélectionnés (prioritaire sur query).
+            summary: Résumé des échanges repliés de la conversation (optionnel).
 
         Returns:
             Prompt système complet à passer comme premier message.
         """
-        kb_content = self._kb_repository.get_content()
-        prompt = _PERSONA + _GUARDRAILS + "\n" + kb_content
+        if kb_entries is None and query:
+            kb_entries = self.retrieve(query, orientation_context)
+
+        if kb_entries is None:
+            prompt = self._compiled_full_prompt()
+        elif kb_entries:
+            prompt = _STATIC_PREFIX + _RETRIEVED_KB_TEMPLATE.format(snippets=format_snippets(kb_entries))
+        else:
+            prompt = _STATIC_PREFIX + _NO_SNIPPET_KB
 
         if orientation_context:
             context_block = self._format_context(orientation_context)
             prompt += _CONTEXT_TEMPLATE.format(context_block=context_block)
 
+        if summary:
+            prompt += _SUMMARY_TEMPLATE.format(summary=summary)
+
         return prompt
 
+    def retrieve(self, query: str, orientation_context: Optional[dict] = None) -> Optional[list[dict]]:
+        """
+        Extraits KB pertinents, par pertinence décroissante.
+        None si aucun retriever n'est configuré, si son index n'est pas encore
+        construit ou si la recherche échoue (le prompt inclut alors la KB complète).
+        """
+        if self._retriever is None:
+            return None
+
+        # Les carrières et secteurs recommandés orientent la recherche
+        # ("quelles écoles pour moi ?")
+        if orientation_context:
+            careers = [c.get("name", "") for c in (orientation_context.get("recommendations") or [])[:5]]
+            sectors = (orientation_context.get("recommended_sectors") or [])[:4]
+            query = " ".join([query, *careers, *sectors])
+
+        try:
+            return self._retriever.retrieve(query)
+        except Exception as exc:
+            logger.warning("Recherche KB impossible, KB complète injectée: %s", exc)
+            return None
+
+    def _compiled_full_prompt(self) -> str:
+        """Persona + garde-fous + KB complète, recompilé seulement si la KB change."""
+        version = self._kb_repository.current_version()
+        if (
+            self._full_prompt is None
+            or version != self._full_prompt_version
+            or time.monotonic() - self._full_prompt_built_at >= COMPILED_PREFIX_TTL
+        ):
+            self._full_prompt = _STATIC_PREFIX + "\n" + self._kb_repository.get_content()
+            self._full_prompt_version = version
+            self._full_prompt_built_at = time.monotonic()
+            logger.debug("Prompt système compilé (KB v%s)", version)
+        return self._full_prompt
+
     @staticmethod
     def _format_context(context: dict) -> str:
         lines: list[str] = []
@@ -0,0 +1,276 @@
+"""
+QuotaScheduler — Ordonnancement des appels Groq selon les quotas du free tier.
+
+Le free tier Groq limite llama-3.1-8b-instant en requêtes (par minute et par
+jour) et en tokens par minute. En classe, trente élèves qui écrivent en même
+temps déclenchaient des 429, traités comme des erreurs génériques avant la
+bascule vers Ollama.
+
+Ce composant :
+- tient des seaux à jetons (requêtes/minute, requêtes/jour, tokens/minute)
+  partagés entre workers via Redis (script Lua atomique, exécuté hors de la
+  boucle d'événements), en mémoire sinon ou pendant une panne Redis
+- applique les en-têtes Retry-After et x-ratelimit-* renvoyés par Groq
+- fait patienter brièvement les requêtes, en servant d'abord les
+  conversations en cours
+- signale le débordement : l'appel part alors directement vers Ollama
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+from typing import Mapping, Optional
+
+from app.core.cache import get_cache
+from app.core.metrics import metrics
+from app.services.llm.token_budget import MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Tokens de sortie comptés par requête (longueur moyenne d'une réponse AÏDA)
+EXPECTED_OUTPUT_TOKENS = 350
+
+# Attente maximale d'un créneau avant de router vers Ollama (secondes)
+MAX_WAIT_CONTINUING = 2.0
+MAX_WAIT_NEW = 0.5
+POLL_INTERVAL = 0.05
+
+# Blocage appliqué sur un 429 sans Retry-After exploitable
+DEFAULT_RETRY_AFTER = 10.0
+
+# Redis absent ou en panne : seaux en mémoire pendant ce délai avant de le retenter
+REDIS_RETRY_SECONDS = 30.0
+
+QUOTA_METRIC = "aida_groq_quota"
+
+_KEY_PREFIX = "aida:groq:quota:"
+_BLOCKED_KEY = f"{_KEY_PREFIX}blocked_until"
+
+# Durées Groq : "7.66s", "2m59.56s", "1h2m", "250ms"
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# KEYS[1] = fin du blocage Retry-After, KEYS[2..n] = seaux
+# ARGV[1] = maintenant, puis par seau : capacité, débit (jetons/s), coût
+# Retourne "0" si les coûts sont prélevés, sinon l'attente estimée (s)
+_TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local blocked = tonumber(redis.call('GET', KEYS[1]) or '0')
+if blocked > now then
+  return tostring(blocked - now)
+end
+local levels = {}
+local wait = 0
+for i = 2, #KEYS do
+  local j = 2 + (i - 2) * 3
+  local capacity, rate, cost = tonumber(ARGV[j]), tonumber(ARGV[j + 1]), tonumber(ARGV[j + 2])
+  local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+  local level = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  level = math.min(capacity, level + math.max(0, now - ts) * rate)
+  levels[i] = level
+  if level < cost then
+    wait = math.max(wait, (cost - level) / rate)
+  end
+end
+if wait > 0 then
+  return tostring(wait)
+end
+for i = 2, #KEYS do
+  local j = 2 + (i - 2) * 3
+  local capacity, rate, cost = tonumber(ARGV[j]), tonumber(ARGV[j + 1]), tonumber(ARGV[j + 2])
+  redis.call('HSET', KEYS[i], 'level', tostring(levels[i] - cost), 'ts', tostring(now))
+  redis.call('EXPIRE', KEYS[i], math.ceil(capacity / rate) + 60)
+end
+return '0'
+"""
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Convertit une durée Groq ("2m59.56s", "7.66s", "120") en secondes."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def estimate_request_tokens(messages: list[dict]) -> int:
+    """Tokens décomptés du quota pour un appel : entrée estimée + sortie moyenne."""
+    return (
+        sum(estimate_tokens(m.get("content", "")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+        + EXPECTED_OUTPUT_TOKENS
+    )
+
+
+class QuotaScheduler:
+    """Seaux à jetons Groq (requêtes/min, requêtes/jour, tokens/min) partagés via Redis."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        requests_per_day: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ) -> None:
+        from app.core.config import settings
+        rpm = requests_per_minute or settings.GROQ_REQUESTS_PER_MINUTE
+        rpd = requests_per_day or settings.GROQ_REQUESTS_PER_DAY
+        tpm = tokens_per_minute or settings.GROQ_TOKENS_PER_MINUTE
+        # (nom, capacité, débit de remplissage en jetons/s)
+        self._buckets: list[tuple[str, float, float]] = [
+            ("rpm", rpm, rpm / 60),
+            ("rpd", rpd, rpd / 86400),
+            ("tpm", tpm, tpm / 60),
+        ]
+        # Fallback sans Redis : état local au worker
+        self._levels: dict[str, tuple[float, float]] = {}
+        self._blocked_until = 0.0
+        self._redis_retry_at = 0.0
+        # Conversations en cours en attente sur ce worker (prioritaires)
+        self._priority_waiters = 0
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    async def acquire(self, tokens: int, continuing: bool = False) -> bool:
+        """
+        Réserve une requête et `tokens` tokens du quota Groq.
+
+        Attend au plus MAX_WAIT_CONTINUING (conversation en cours) ou
+        MAX_WAIT_NEW (nouvelle conversation). Tant qu'une conversation en
+        cours attend, les nouvelles lui laissent la place.
+
+        Returns:
+            True si l'appel peut partir vers Groq, False s'il doit être routé
+            vers le fallback.
+        """
+        priority = "continuing" if continuing else "new"
+        deadline = time.monotonic() + (MAX_WAIT_CONTINUING if continuing else MAX_WAIT_NEW)
+        if continuing:
+            self._priority_waiters += 1
+        try:
+            while True:
+                if continuing or not self._priority_waiters:
+                    wait = await self._take(tokens)
+                    if wait <= 0:
+                        metrics.incr(QUOTA_METRIC, outcome="granted", priority=priority)
+                        return True
+                else:
+                    wait = POLL_INTERVAL
+                if time.monotonic() + wait > deadline:
+                    metrics.incr(QUOTA_METRIC, outcome="overflow", priority=priority)
+                    logger.info("Quota Groq atteint (créneau dans %.1fs) — routage vers Ollama", wait)
+                    return False
+                await asyncio.sleep(min(wait, POLL_INTERVAL))
+        finally:
+            if continuing:
+                self._priority_waiters -= 1
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """
+        Applique les limites annoncées par Groq dans une réponse.
+
+        Un 429 bloque les appels pendant Retry-After ; un quota restant à zéro
+        (x-ratelimit-remaining-*) les bloque jusqu'à sa remise à zéro.
+        """
+        block_for: Optional[float] = None
+        if status_code == 429:
+            block_for = (
+                parse_duration(headers.get("retry-after"))
+                or parse_duration(headers.get("x-ratelimit-reset-tokens"))
+                or DEFAULT_RETRY_AFTER
+            )
+        else:
+            for kind in ("requests", "tokens"):
+                if headers.get(f"x-ratelimit-remaining-{kind}", "").strip() == "0":
+                    reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        block_for = max(block_for or 0.0, reset)
+        if block_for:
+            logger.warning("Limite Groq atteinte (HTTP %s) — pause de %.1fs", status_code, block_for)
+            self._block(block_for)
+
+    # ------------------------------------------------------------------
+    # Seaux (Redis partagé, mémoire en fallback)
+    # ------------------------------------------------------------------
+
+    def _costs(self, tokens: int) -> list[float]:
+        # Un coût supérieur à la capacité ne serait jamais servi
+        return [min(tokens if name == "tpm" else 1, capacity) for name, capacity, _ in self._buckets]
+
+    async def _take(self, tokens: int) -> float:
+        """Prélève les coûts si tous les seaux suffisent ; sinon retourne l'attente (s)."""
+        now = time.time()
+        costs = self._costs(tokens)
+        # Blocage observé par ce worker, avant même qu'il soit partagé
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        if time.monotonic() >= self._redis_retry_at:
+            try:
+                # Client Redis synchrone (connexion comprise) : hors de la boucle d'événements
+                wait = await asyncio.to_thread(self._take_shared, now, costs)
+            except Exception as exc:
+                logger.warning("Quota Groq Redis indisponible, fallback mémoire: %s", exc)
+                wait = None
+            if wait is not None:
+                return wait
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        return self._take_local(now, costs)
+
+    def _take_shared(self, now: float, costs: list[float]) -> Optional[float]:
+        """Script Lua sur les seaux Redis ; None sans Redis."""
+        redis = get_cache().redis
+        if redis is None:
+            return None
+        args: list = [now]
+        for (_, capacity, rate), cost in zip(self._buckets, costs):
+            args.extend((capacity, rate, cost))
+        keys = [_BLOCKED_KEY] + [f"{_KEY_PREFIX}{name}" for name, _, _ in self._buckets]
+        return float(redis.eval(_TAKE_SCRIPT, len(keys), *keys, *args))
+
+    def _take_local(self, now: float, costs: list[float]) -> float:
+        if self._blocked_until > now:
+            return self._blocked_until - now
+        levels = {}
+        wait = 0.0
+        for (name, capacity, rate), cost in zip(self._buckets, costs):
+            level, ts = self._levels.get(name, (capacity, now))
+            level = min(capacity, level + max(0.0, now - ts) * rate)
+            levels[name] = level
+            if level < cost:
+                wait = max(wait, (cost - level) / rate)
+        if wait > 0:
+            return wait
+        for (name, _, _), cost in zip(self._buckets, costs):
+            self._levels[name] = (levels[name] - cost, now)
+        return 0.0
+
+    def _block(self, seconds: float) -> None:
+        until = time.time() + seconds
+        self._blocked_until = max(self._blocked_until, until)
+        if time.monotonic() < self._redis_retry_at:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._share_block(until, seconds)  # Hors boucle d'événements (script)
+        else:
+            loop.run_in_executor(None, self._share_block, until, seconds)
+
+    def _share_block(self, until: float, seconds: float) -> None:
+        redis = get_cache().redis
+        if redis is None:
+            return
+        try:
+            redis.set(_BLOCKED_KEY, until, ex=math.ceil(seconds) + 1)
+        except Exception as exc:
+            logger.warning("Blocage quota Groq non partagé (Redis): %s", exc)
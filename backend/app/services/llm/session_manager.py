@@ -1,27 +1,271 @@
 """
 SessionManager — Gestion de l'historique des conversations AÏDA.
 
-Stocke les sessions en mémoire avec éviction LRU quand la limite est atteinte.
+Le stockage est délégué à un store interchangeable :
+- RedisSessionStore  : listes Redis partagées entre workers (TTL + longueur bornée)
+- MemorySessionStore : LRU local au process, borné en mémoire (fallback, tests)
+
+Chaque session a en plus un résumé courant : les échanges les plus anciens y
+sont repliés (voir fold) au lieu d'être simplement perdus à MAX_HISTORY.
+
+Par défaut, Redis est utilisé quand il est joignable : n'importe quel worker
+peut poursuivre n'importe quelle conversation sans que le client renvoie
+l'historique. Si Redis tombe, bascule transparente vers la mémoire.
 """
 
+import json
 import logging
+import sys
+from collections import OrderedDict, deque
 from typing import Optional
 
+from app.core.cache import get_cache
+
 logger = logging.getLogger(__name__)
 
-MAX_SESSIONS = 1000
 MAX_HISTORY = 10  # Messages conservés par session (5 échanges)
+SESSION_TTL = 24 * 3600  # Expiration d'une conversation inactive (secondes)
+
+_REDIS_KEY_PREFIX = "aida:session:"
+_REDIS_SUMMARY_SUFFIX = ":summary"
+
+# Surcoût approximatif (octets) d'un message (tuple + rôle) et d'une session
+# (deque + clé + entrée de l'OrderedDict), en plus du texte lui-même
+_MESSAGE_OVERHEAD = 72
+_SESSION_OVERHEAD = 760
+
+
+def _clean_history(messages: list[dict]) -> list[dict]:
+    return [
+        {"role": m["role"], "content": m["content"]}
+        for m in messages
+        if m.get("role") in ("user", "assistant") and m.get("content")
+    ][-MAX_HISTORY:]
+
+
+def _message_bytes(turn: tuple[str, str]) -> int:
+    return sys.getsizeof(turn[1]) + _MESSAGE_OVERHEAD
+
+
+class MemorySessionStore:
+    """
+    Sessions en mémoire du process : LRU O(1) borné par un budget mémoire.
+
+    Chaque session est un tampon circulaire (deque à MAX_HISTORY messages) :
+    un ajout ne recopie pas l'historique et le message le plus ancien sort
+    automatiquement. Le résumé courant est compté dans la taille de la
+    session. Toute lecture ou écriture remet la session en tête ; quand la
+    taille estimée dépasse le budget, les sessions les moins récemment
+    utilisées sont évincées.
+    """
+
+    def __init__(self, memory_budget_bytes: Optional[int] = None) -> None:
+        if memory_budget_bytes is None:
+            from app.core.config import settings
+            memory_budget_bytes = settings.CHAT_SESSION_MEMORY_MB * 1024 * 1024
+        self._budget = memory_budget_bytes
+        self._sessions: OrderedDict[str, deque[tuple[str, str]]] = OrderedDict()
+        self._summaries: dict[str, str] = {}
+        self._sizes: dict[str, int] = {}
+        self._total_bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Taille estimée de toutes les sessions (octets)."""
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> list[dict]:
+        turns = self._sessions.get(session_id)
+        if turns is None:
+            return []
+        self._sessions.move_to_end(session_id)
+        return [{"role": role, "content": content} for role, content in turns]
+
+    def extend(self, session_id: str, messages: list[dict]) -> None:
+        turns = self._sessions.get(session_id)
+        if turns is None:
+            turns = deque(maxlen=MAX_HISTORY)
+            self._sessions[session_id] = turns
+            self._sizes[session_id] = _SESSION_OVERHEAD
+            self._total_bytes += _SESSION_OVERHEAD
+        else:
+            self._sessions.move_to_end(session_id)
+
+        delta = 0
+        for message in messages:
+            if len(turns) == MAX_HISTORY:
+                delta -= _message_bytes(turns[0])
+            turn = (sys.intern(message["role"]), message["content"])
+            turns.append(turn)
+            delta += _message_bytes(turn)
+        self._sizes[session_id] += delta
+        self._total_bytes += delta
+
+        # Éviction LRU tant que le budget est dépassé (la session courante est conservée)
+        while self._total_bytes > self._budget and len(self._sessions) > 1:
+            oldest, _ = self._sessions.popitem(last=False)
+            self._summaries.pop(oldest, None)
+            self._total_bytes -= self._sizes.pop(oldest)
+            logger.debug("Session évincée (LRU): %s", oldest)
+
+    def get_summary(self, session_id: str) -> str:
+        return self._summaries.get(session_id, "")
+
+    def fold(self, session_id: str, folded: list[dict], summary: str) -> bool:
+        """
+        Retire les messages `folded` du début de l'historique et les remplace
+        par `summary`. Sans effet (False) si le début a changé entre-temps.
+        """
+        turns = self._sessions.get(session_id)
+        if turns is None or len(turns) < len(folded):
+            return False
+        head = [{"role": role, "content": content} for role, content in list(turns)[:len(folded)]]
+        if head != folded:
+            return False
+
+        delta = 0
+        for _ in folded:
+            delta -= _message_bytes(turns.popleft())
+        previous = self._summaries.get(session_id)
+        if previous:
+            delta -= sys.getsizeof(previous)
+        self._summaries[session_id] = summary
+        delta += sys.getsizeof(summary)
+        self._sizes[session_id] += delta
+        self._total_bytes += delta
+        return True
+
+    def delete(self, session_id: str) -> None:
+        self._summaries.pop(session_id, None)
+        if self._sessions.pop(session_id, None) is not None:
+            self._total_bytes -= self._sizes.pop(session_id)
+
+
+class RedisSessionStore:
+    """
+    Sessions dans des listes Redis (une clé par session).
+
+    Chaque ajout est une transaction MULTI/EXEC : RPUSH + LTRIM + EXPIRE.
+    Deux workers qui écrivent dans la même session ne perdent aucun message
+    et la liste reste bornée à MAX_HISTORY. Le résumé est une clé voisine
+    au même TTL, remplacée par fold en même temps que la tête de liste.
+    """
+
+    def __init__(self, fallback: Optional[MemorySessionStore] = None, ttl: int = SESSION_TTL) -> None:
+        self._fallback = fallback or MemorySessionStore()
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"{_REDIS_KEY_PREFIX}{session_id}"
+
+    @classmethod
+    def _summary_key(cls, session_id: str) -> str:
+        return cls._key(session_id) + _REDIS_SUMMARY_SUFFIX
+
+    def get(self, session_id: str) -> list[dict]:
+        redis = get_cache().redis
+        if redis is not None:
+            try:
+                return [json.loads(raw) for raw in redis.lrange(self._key(session_id), 0, -1)]
+            except Exception as exc:
+                logger.warning("Lecture de session Redis impossible, fallback mémoire: %s", exc)
+        return self._fallback.get(session_id)
+
+    def extend(self, session_id: str, messages: list[dict]) -> None:
+        if not messages:
+            return
+        redis = get_cache().redis
+        if redis is not None:
+            try:
+                key = self._key(session_id)
+                pipe = redis.pipeline(transaction=True)
+                pipe.rpush(key, *(json.dumps(m, ensure_ascii=False) for m in messages))
+                pipe.ltrim(key, -MAX_HISTORY, -1)
+                pipe.expire(key, self._ttl)
+                pipe.expire(self._summary_key(session_id), self._ttl)
+                pipe.execute()
+                return
+            except Exception as exc:
+                logger.warning("Écriture de session Redis impossible, fallback mémoire: %s", exc)
+        self._fallback.extend(session_id, messages)
+
+    def get_summary(self, session_id: str) -> str:
+        redis = get_cache().redis
+        if redis is not None:
+            try:
+                return redis.get(self._summary_key(session_id)) or ""
+            except Exception as exc:
+                logger.warning("Lecture de résumé Redis impossible, fallback mémoire: %s", exc)
+        return self._fallback.get_summary(session_id)
+
+    def fold(self, session_id: str, folded: list[dict], summary: str) -> bool:
+        """
+        WATCH/MULTI : la tête de liste n'est retirée (et le résumé remplacé)
+        que si aucun worker ne l'a modifiée depuis la lecture.
+        """
+        redis = get_cache().redis
+        if redis is None:
+            return self._fallback.fold(session_id, folded, summary)
+
+        from redis.exceptions import WatchError
+
+        key = self._key(session_id)
+        pipe = redis.pipeline(transaction=True)
+        try:
+            pipe.watch(key)
+            head = [json.loads(raw) for raw in pipe.lrange(key, 0, len(folded) - 1)]
+            if head != folded:
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.ltrim(key, len(folded), -1)
+            pipe.set(self._summary_key(session_id), summary, ex=self._ttl)
+            pipe.execute()
+            return True
+        except WatchError:
+            return False
+        except Exception as exc:
+            logger.warning("Repli de session Redis impossible: %s", exc)
+            return False
+        finally:
+            pipe.reset()
+
+    def delete(self, session_id: str) -> None:
+        redis = get_cache().redis
+        if redis is not None:
+            try:
+                redis.delete(self._key(session_id), self._summary_key(session_id))
+            except Exception as exc:
+                logger.warning("Suppression de session Redis impossible: %s", exc)
+        self._fallback.delete(session_id)
 
 
 class SessionManager:
-    """Gère les sessions de conversation en mémoire."""
+    """Gère l'historique des conversations via un store interchangeable."""
 
-    def __init__(self) -> None:
-        self._sessions: dict[str, list[dict]] = {}
+    def __init__(self, store=None) -> None:
+        self._store = store if store is not None else RedisSessionStore()
 
     def get_history(self, session_id: str) -> list[dict]:
         """Retourne l'historique d'une session (liste vide si inconnue)."""
-        return list(self._sessions.get(session_id, []))
+        return self._store.get(session_id)
+
+    def get_summary(self, session_id: str) -> str:
+        """Résumé des échanges repliés de la session (chaîne vide si aucun)."""
+        return self._store.get_summary(session_id)
+
+    def fold(self, session_id: str, folded: list[dict], summary: str) -> bool:
+        """
+        Remplace les premiers messages de l'historique par un résumé.
+
+        Retourne False sans rien modifier si l'historique ne commence plus
+        par `folded` (autre repli ou troncature concurrente).
+        """
+        return self._store.fold(session_id, folded, summary)
 
     def seed_from_client(
         self,
@@ -30,18 +274,16 @@ class SessionManager:
     ) -> list[dict]:
         """
         Reconstruit le contexte depuis l'historique client si la session
-        est inconnue du serveur (après redémarrage).
+        est inconnue du serveur (expirée, ou Redis indisponible au dernier
+        échange). L'historique restauré est persisté dans le store.
         """
-        if session_id in self._sessions:
-            return self.get_history(session_id)
-
-        history = [
-            {"role": m["role"], "content": m["content"]}
-            for m in client_history
-            if m.get("role") in ("user", "assistant") and m.get("content")
-        ][-MAX_HISTORY:]
+        history = self._store.get(session_id)
+        if history:
+            return history
 
+        history = _clean_history(client_history)
         if history:
+            self._store.extend(session_id, history)
             logger.info(
                 "Session %s restaurée depuis l'historique client (%d messages)",
                 session_id, len(history),
@@ -50,19 +292,12 @@ class SessionManager:
         return history
 
     def append(self, session_id: str, user_message: str, assistant_reply: str) -> None:
-        """Ajoute un échange à l'historique de la session."""
-        history = list(self._sessions.get(session_id, []))
-        history.append({"role": "user", "content": user_message})
-        history.append({"role": "assistant", "content": assistant_reply})
-
-        # Éviction LRU si limite atteinte
-        if len(self._sessions) >= MAX_SESSIONS and session_id not in self._sessions:
-            oldest = next(iter(self._sessions))
-            del self._sessions[oldest]
-            logger.debug("Session évincée (LRU): %s", oldest)
-
-        self._sessions[session_id] = history
+        """Ajoute un échange à l'historique de la session (atomique)."""
+        self._store.extend(session_id, [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": assistant_reply},
+        ])
 
     def clear(self, session_id: str) -> None:
         """Efface l'historique d'une session."""
-        self._sessions.pop(session_id, None)
+        self._store.delete(session_id)
@@ -0,0 +1,147 @@
+"""
+TokenBudgetManager — Répartition du budget de tokens d'entrée d'un appel AÏDA.
+
+Un appel envoie : prompt système (persona, garde-fous, profil), extraits KB,
+historique et message de l'élève. Sans contrôle, un long message (2 000
+caractères) plus un long historique ralentissent llama-3.1-8b-instant et
+consomment le quota Groq. Ce composant :
+- estime les tokens de chaque partie (heuristique caractères/token, sans tokenizer)
+- tronque le message s'il dépasse sa part maximale
+- partage le reste entre extraits KB (par rang de pertinence) et historique
+  (du plus récent au plus ancien, messages trop longs abrégés)
+- journalise l'allocation retenue pour chaque requête
+"""
+
+import logging
+import math
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# ~3,5 caractères par token pour du français avec le tokenizer Llama 3
+CHARS_PER_TOKEN = 3.5
+# Surcoût par message du format chat (rôle, séparateurs)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Un ancien message plus long est abrégé à cette taille
+MAX_TURN_TOKENS = 300
+# Part max du budget pour le message de l'élève
+MAX_MESSAGE_SHARE = 0.4
+# Part du budget restant réservée en priorité aux extraits KB
+KB_SHARE = 0.5
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation du nombre de tokens d'un texte."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Tronque un texte à ~max_tokens, sur une frontière de mot."""
+    max_chars = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text[: max(max_chars - 1, 0)]
+    if " " in cut:
+        cut = cut[: cut.rfind(" ")]
+    return cut + "…"
+
+
+def _entry_tokens(entry: dict) -> int:
+    return estimate_tokens(f"- {entry.get('title', '')} : {entry.get('content', '')}") + 1
+
+
+class TokenBudgetManager:
+    """Ajuste message, historique et extraits KB à un budget de tokens d'entrée."""
+
+    def __init__(self, budget: Optional[int] = None, kb_share: float = KB_SHARE) -> None:
+        if budget is None:
+            from app.core.config import settings
+            budget = settings.CHAT_INPUT_TOKEN_BUDGET
+        self._budget = budget
+        self._kb_share = kb_share
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    def fit(
+        self,
+        base_prompt: str,
+        message: str,
+        history: list[dict],
+        kb_entries: Optional[list[dict]],
+    ) -> dict:
+        """
+        Retourne {"message", "history", "kb_entries", "allocation"} ajustés au budget.
+
+        Args:
+            base_prompt: Prompt système sans extraits KB (persona, garde-fous, profil).
+            message: Message de l'élève.
+            history: Historique, du plus ancien au plus récent.
+            kb_entries: Extraits KB par pertinence décroissante (None = KB complète
+                déjà incluse dans base_prompt, non ajustable).
+        """
+        system_tokens = estimate_tokens(base_prompt) + MESSAGE_OVERHEAD_TOKENS
+
+        message_cap = int(self._budget * MAX_MESSAGE_SHARE)
+        if estimate_tokens(message) > message_cap:
+            message = truncate_to_tokens(message, message_cap)
+        message_tokens = estimate_tokens(message) + MESSAGE_OVERHEAD_TOKENS
+
+        remaining = max(self._budget - system_tokens - message_tokens, 0)
+
+        # 1. Extraits KB prioritaires, par rang, dans leur part du budget
+        candidates = kb_entries or []
+        costs = [_entry_tokens(e) for e in candidates]
+        kept = [False] * len(candidates)
+        kb_tokens = 0
+        kb_cap = int(remaining * self._kb_share)
+        for i, cost in enumerate(costs):
+            if kb_tokens + cost <= kb_cap:
+                kept[i] = True
+                kb_tokens += cost
+
+        # 2. Historique, du plus récent au plus ancien, sans trou
+        fitted_history: list[dict] = []
+        history_tokens = 0
+        for turn in reversed(history):
+            content = turn["content"]
+            if estimate_tokens(content) > MAX_TURN_TOKENS:
+                content = truncate_to_tokens(content, MAX_TURN_TOKENS)
+            cost = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+            if kb_tokens + history_tokens + cost > remaining:
+                break
+            fitted_history.append({"role": turn["role"], "content": content})
+            history_tokens += cost
+        fitted_history.reverse()
+
+        # 3. Reliquat : extraits KB restants
+        for i, cost in enumerate(costs):
+            if not kept[i] and kb_tokens + history_tokens + cost <= remaining:
+                kept[i] = True
+                kb_tokens += cost
+
+        fitted_entries = [e for e, keep in zip(candidates, kept) if keep] if kb_entries is not None else None
+        allocation = {
+            "budget": self._budget,
+            "system": system_tokens,
+            "message": message_tokens,
+            "kb": kb_tokens,
+            "kb_entries": f"{len(fitted_entries or [])}/{len(candidates)}",
+            "history": history_tokens,
+            "history_messages": f"{len(fitted_history)}/{len(history)}",
+            "total": system_tokens + message_tokens + kb_tokens + history_tokens,
+        }
+        logger.info(
+            "Budget tokens : système=%d KB=%d (%s extraits) historique=%d (%s messages) "
+            "message=%d — total %d/%d",
+            allocation["system"], allocation["kb"], allocation["kb_entries"],
+            allocation["history"], allocation["history_messages"],
+            allocation["message"], allocation["total"], self._budget,
+        )
+        return {
+            "message": message,
+            "history": fitted_history,
+            "kb_entries": fitted_entries,
+            "allocation": allocation,
+        }
@@ -0,0 +1,125 @@
+"""
+TranscriptSink — Persistance asynchrone des échanges AÏDA pour l'analyse.
+
+Les conversations ne vivaient qu'en mémoire (ou dans Redis, 24 h) : les
+conseillers ne pouvaient pas analyser les thèmes des questions. Écrire
+chaque tour dans Supabase ajouterait un aller-retour réseau à chaque
+réponse. Ce composant :
+- met chaque tour dans un tampon en mémoire, sans I/O (appel O(1))
+- écrit par lots dans la table chat_transcripts, dès qu'un lot est plein
+  ou au plus tard toutes les `flush_interval` secondes
+- borne le tampon : au-delà de `max_buffered`, les nouveaux tours sont
+  perdus et comptés (Supabase lent ou indisponible ne fait pas grossir
+  le process)
+- vide le tampon à l'arrêt de l'application
+"""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPTS_TABLE = "chat_transcripts"
+# Tours transcrits, par issue (étiquette "outcome") : written, dropped (tampon
+# plein), failed (écriture Supabase en échec)
+TRANSCRIPTS_METRIC = "aida_chat_transcripts"
+
+
+def _insert_rows(rows: list[dict]) -> None:
+    from app.db.supabase_client import get_admin_supabase_client
+    get_admin_supabase_client().insert(TRANSCRIPTS_TABLE, rows)
+
+
+class TranscriptSink:
+    """Tampon borné de tours de conversation, écrit par lots en tâche de fond."""
+
+    def __init__(
+        self,
+        writer: Optional[Callable[[list[dict]], None]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_buffered: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        from app.core.config import settings
+        self._writer = writer or _insert_rows
+        self._batch_size = batch_size or settings.CHAT_TRANSCRIPT_BATCH_SIZE
+        self._flush_interval = flush_interval or settings.CHAT_TRANSCRIPT_FLUSH_SECONDS
+        self._max_buffered = max_buffered or settings.CHAT_TRANSCRIPT_MAX_BUFFERED
+        self._enabled = settings.CHAT_TRANSCRIPTS_ENABLED if enabled is None else enabled
+        self._buffer: deque[dict] = deque()
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def record(
+        self,
+        session_id: str,
+        user_message: str,
+        assistant_reply: str,
+        path: str,
+        user_id: Optional[str] = None,
+        intent: Optional[str] = None,
+    ) -> None:
+        """Ajoute un tour au tampon (jamais bloquant, jamais d'exception)."""
+        if not self._enabled:
+            return
+        if len(self._buffer) >= self._max_buffered:
+            metrics.incr(TRANSCRIPTS_METRIC, outcome="dropped")
+            return
+        self._buffer.append({
+            "session_id": session_id,
+            "user_id": user_id,
+            "user_message": user_message,
+            "assistant_reply": assistant_reply,
+            "path": path,
+            "intent": intent,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        if len(self._buffer) >= self._batch_size:
+            self._wake.set()
+
+    async def flush(self) -> None:
+        """Écrit tout le tampon, lot par lot (les lignes en échec sont perdues et comptées)."""
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self._batch_size, len(self._buffer)))]
+            try:
+                # Client Supabase synchrone : hors de la boucle d'événements
+                await asyncio.to_thread(self._writer, batch)
+            except Exception as exc:
+                metrics.incr(TRANSCRIPTS_METRIC, len(batch), outcome="failed")
+                logger.warning("Écriture de %d transcriptions impossible: %s", len(batch), exc)
+            else:
+                metrics.incr(TRANSCRIPTS_METRIC, len(batch), outcome="written")
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Lance la tâche d'écriture (idempotent)."""
+        if self._enabled and (self._task is None or self._task.done()):
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Arrête la tâche après un dernier lot : aucun tour en tampon n'est perdu."""
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
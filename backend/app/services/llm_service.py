@@ -5,17 +5,42 @@ Orchestre :
 - SessionManager  : historique des conversations
 - PromptBuilder   : construction des prompts système
 - SafetyFilter    : détection d'injections et contenu hors-domaine
+- IntentClassifier : refus local des messages clairement hors-domaine
 - GroqProvider    : appels Groq (principal) + Ollama (fallback)
+- AnswerCache     : réponses en cache pour les premières questions fréquentes
+- TokenBudgetManager : répartition du budget de tokens d'entrée
+- conversation_summary : repli des anciens échanges dans un résumé courant,
+  produit en tâche de fond après la réponse
+- TranscriptSink  : transcription des échanges, écrite par lots dans Supabase
+
+Chaque tour de conversation est compté (rejeté, hors-domaine, servi depuis
+le cache, LLM) avec la taille du prompt envoyé ; les mesures des appels LLM
+eux-mêmes sont prises par GroqProvider (voir llm_metrics).
 """
 
+import asyncio
 import uuid
 import logging
+from contextlib import aclosing
 from typing import AsyncGenerator, Optional
 
+from app.core.metrics import metrics
 from app.services.llm.session_manager import SessionManager
+from app.services.llm.conversation_summary import (
+    build_summary_messages,
+    clean_summary,
+    should_fold,
+    turns_to_fold,
+)
 from app.services.llm.prompt_builder import PromptBuilder
 from app.services.llm.safety_filter import SafetyFilter
-from app.services.llm.groq_provider import GroqProvider
+from app.services.llm.answer_cache import AnswerCache
+from app.services.llm.groq_provider import GroqProvider, UNAVAILABLE_REPLY, is_degraded_reply
+from app.services.llm.intent_classifier import OFF_DOMAIN_REPLY, IntentClassifier
+from app.services.llm.kb_retriever import kb_retriever
+from app.services.llm.llm_metrics import CHAT_TURNS_METRIC, PROMPT_TOKENS_METRIC, SUMMARY_FOLDS_METRIC
+from app.services.llm.token_budget import TokenBudgetManager
+from app.services.llm.transcript_sink import TranscriptSink
 from app.repositories.knowledge_base_repository import knowledge_base_repository
 
 logger = logging.getLogger(__name__)
@@ -28,9 +53,15 @@ class LLMService:
 
     def __init__(self) -> None:
         self._sessions = SessionManager()
-        self._prompt_builder = PromptBuilder(knowledge_base_repository)
+        self._prompt_builder = PromptBuilder(knowledge_base_repository, kb_retriever)
         self._safety = SafetyFilter()
+        self._intents = IntentClassifier()
         self._provider = GroqProvider()
+        self._answer_cache = AnswerCache(knowledge_base_repository)
+        self._token_budget = TokenBudgetManager()
+        self._transcripts = TranscriptSink()
+        # Replis en cours, par session (un seul à la fois par conversation)
+        self._folds: dict[str, asyncio.Task] = {}
 
     async def chat(
         self,
@@ -38,35 +69,50 @@ class LLMService:
         session_id: str,
         orientation_context: Optional[dict] = None,
         client_history: Optional[list[dict]] = None,
+        user_id: Optional[str] = None,
     ) -> dict:
         """Envoie un message et retourne la réponse complète."""
         message = self._safety.sanitize(message)
 
         if self._safety.is_injection_attempt(message):
-            return {"reply": self._safety.get_rejection_message(), "session_id": session_id}
+            metrics.incr(CHAT_TURNS_METRIC, path="rejected")
+            rejection = self._safety.get_rejection_message()
+            self._transcripts.record(session_id, message, rejection, "rejected", user_id)
+            return {"reply": rejection, "session_id": session_id}
+
+        intent = self._intents.off_domain_intent(message)
+        if intent:
+            metrics.incr(CHAT_TURNS_METRIC, path="off_domain", intent=intent)
+            self._transcripts.record(session_id, message, OFF_DOMAIN_REPLY, "off_domain", user_id, intent)
+            return {"reply": OFF_DOMAIN_REPLY, "session_id": session_id}
 
         history = self._sessions.get_history(session_id)
         if not history and client_history:
             history = self._sessions.seed_from_client(session_id, client_history)
 
-        system_prompt = self._prompt_builder.build(orientation_context)
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(history[-MAX_HISTORY:])
-        messages.append({"role": "user", "content": message})
+        cache_key = self._answer_cache_key(message, history, orientation_context)
+        if cache_key:
+            cached = self._answer_cache.get(cache_key)
+            if cached:
+                metrics.incr(CHAT_TURNS_METRIC, path="cache")
+                self._sessions.append(session_id, message, cached)
+                self._transcripts.record(session_id, message, cached, "cache", user_id)
+                return {"reply": cached, "session_id": session_id}
+
+        metrics.incr(CHAT_TURNS_METRIC, path="llm")
+        summary = self._sessions.get_summary(session_id) if history else ""
+        messages = self._build_messages(message, history, orientation_context, summary)
 
         reply = await self._provider.complete(messages)
 
         if reply is None:
-            return {
-                "reply": (
-                    "Je suis AÏDA, votre conseillère d'orientation. "
-                    "Le service est temporairement indisponible. "
-                    "Réessaie dans quelques instants !"
-                ),
-                "session_id": session_id,
-            }
+            return {"reply": UNAVAILABLE_REPLY, "session_id": session_id}
 
+        if cache_key:
+            self._answer_cache.set(cache_key, reply)
         self._sessions.append(session_id, message, reply)
+        self._transcripts.record(session_id, message, reply, "llm", user_id)
+        self._schedule_fold(session_id)
         return {"reply": reply, "session_id": session_id}
 
     async def chat_stream(
@@ -75,12 +121,25 @@ class LLMService:
         session_id: str,
         orientation_context: Optional[dict] = None,
         client_history: Optional[list[dict]] = None,
+        user_id: Optional[str] = None,
     ) -> AsyncGenerator[dict, None]:
         """Envoie un message et stream la réponse chunk par chunk."""
         message = self._safety.sanitize(message)
 
         if self._safety.is_injection_attempt(message):
-            yield {"chunk": self._safety.get_rejection_message()}
+            metrics.incr(CHAT_TURNS_METRIC, path="rejected")
+            rejection = self._safety.get_rejection_message()
+            self._transcripts.record(session_id, message, rejection, "rejected", user_id)
+            yield {"chunk": rejection}
+            yield {"done": True}
+            return
+
+        intent = self._intents.off_domain_intent(message)
+        if intent:
+            # Refus connu d'avance : pas d'appel LLM
+            metrics.incr(CHAT_TURNS_METRIC, path="off_domain", intent=intent)
+            self._transcripts.record(session_id, message, OFF_DOMAIN_REPLY, "off_domain", user_id, intent)
+            yield {"chunk": OFF_DOMAIN_REPLY}
             yield {"done": True}
             return
 
@@ -88,29 +147,156 @@ class LLMService:
         if not history and client_history:
             history = self._sessions.seed_from_client(session_id, client_history)
 
-        system_prompt = self._prompt_builder.build(orientation_context)
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(history[-MAX_HISTORY:])
-        messages.append({"role": "user", "content": message})
+        cache_key = self._answer_cache_key(message, history, orientation_context)
+        if cache_key:
+            cached = self._answer_cache.get(cache_key)
+            if cached:
+                # Réponse déjà connue : envoyée d'un bloc, sans appel LLM
+                metrics.incr(CHAT_TURNS_METRIC, path="cache")
+                self._sessions.append(session_id, message, cached)
+                self._transcripts.record(session_id, message, cached, "cache", user_id)
+                yield {"chunk": cached}
+                yield {"done": True}
+                return
+
+        metrics.incr(CHAT_TURNS_METRIC, path="llm")
+        summary = self._sessions.get_summary(session_id) if history else ""
+        messages = self._build_messages(message, history, orientation_context, summary)
 
         full_reply_parts: list[str] = []
 
-        async for chunk in self._provider.stream(messages):
-            full_reply_parts.append(chunk)
-            yield {"chunk": chunk}
+        # aclosing : si le client s'en va, la requête amont est fermée tout de suite
+        async with aclosing(self._provider.stream(messages)) as chunks:
+            async for chunk in chunks:
+                full_reply_parts.append(chunk)
+                yield {"chunk": chunk}
 
         full_reply = "".join(full_reply_parts)
         if full_reply:
+            if cache_key and not is_degraded_reply(full_reply):
+                self._answer_cache.set(cache_key, full_reply)
             self._sessions.append(session_id, message, full_reply)
+            self._transcripts.record(session_id, message, full_reply, "llm", user_id)
+            self._schedule_fold(session_id)
 
         yield {"done": True}
 
+    def _build_messages(
+        self,
+        message: str,
+        history: list[dict],
+        orientation_context: Optional[dict],
+        summary: str = "",
+    ) -> list[dict]:
+        """
+        Assemble prompt système, historique et message dans le budget de tokens.
+        Le résumé des échanges repliés fait partie du prompt système.
+        """
+        history = history[-MAX_HISTORY:]
+        kb_entries = self._prompt_builder.retrieve(
+            self._retrieval_query(message, history), orientation_context
+        )
+        plan = self._token_budget.fit(
+            base_prompt=self._prompt_builder.build(
+                orientation_context, kb_entries=[] if kb_entries is not None else None, summary=summary
+            ),
+            message=message,
+            history=history,
+            kb_entries=kb_entries,
+        )
+        system_prompt = self._prompt_builder.build(
+            orientation_context, kb_entries=plan["kb_entries"], summary=summary
+        )
+        metrics.observe(PROMPT_TOKENS_METRIC, plan["allocation"]["total"])
+
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(plan["history"])
+        messages.append({"role": "user", "content": plan["message"]})
+        return messages
+
+    def _schedule_fold(self, session_id: str) -> None:
+        """Lance le repli de l'historique en tâche de fond si la session est assez longue."""
+        if session_id in self._folds:
+            return
+        task = asyncio.create_task(self._fold_history(session_id))
+        self._folds[session_id] = task
+        task.add_done_callback(lambda _: self._folds.pop(session_id, None))
+
+    async def _fold_history(self, session_id: str) -> None:
+        """
+        Replie les anciens échanges dans le résumé de la session.
+
+        Appelé après la réponse : l'élève n'attend jamais le résumé. En cas
+        d'échec LLM l'historique reste intact (nouvel essai au tour suivant) ;
+        si un autre worker a modifié le début de l'historique entre-temps,
+        le repli est abandonné plutôt que de perdre des messages.
+        """
+        try:
+            history = self._sessions.get_history(session_id)
+            if not should_fold(history):
+                return
+            folded = turns_to_fold(history)
+            previous = self._sessions.get_summary(session_id)
+            reply = await self._provider.complete(build_summary_messages(previous, folded), mode="summary")
+            summary = clean_summary(reply)
+            if summary is None:
+                metrics.incr(SUMMARY_FOLDS_METRIC, outcome="failed")
+                return
+            folded_ok = self._sessions.fold(session_id, folded, summary)
+            metrics.incr(SUMMARY_FOLDS_METRIC, outcome="folded" if folded_ok else "conflict")
+        except Exception as exc:
+            metrics.incr(SUMMARY_FOLDS_METRIC, outcome="failed")
+            logger.warning("Résumé de la session %s impossible: %s", session_id, exc)
+
+    def _answer_cache_key(
+        self,
+        message: str,
+        history: list[dict],
+        orientation_context: Optional[dict],
+    ) -> Optional[str]:
+        """Seule une première question (sans historique) est servie depuis le cache."""
+        if history:
+            return None
+        return self._answer_cache.key_for(message, orientation_context)
+
+    @staticmethod
+    def _retrieval_query(message: str, history: list[dict]) -> str:
+        """Question courante + précédente (pour les relances du type « et à Kara ? »)."""
+        previous = next((m["content"] for m in reversed(history) if m["role"] == "user"), "")
+        return f"{message} {previous}".strip()
+
     def clear_session(self, session_id: str) -> None:
         self._sessions.clear(session_id)
 
     def get_history(self, session_id: str) -> list[dict]:
         return self._sessions.get_history(session_id)
 
+    def start(self) -> None:
+        """
+        Lance la sonde de santé des backends LLM, l'écriture des
+        transcriptions et la construction de l'index KB (démarrage de
+        l'application).
+        """
+        self._provider.start_health_checks()
+        self._transcripts.start()
+        kb_retriever.start()
+
+    def health(self) -> dict:
+        return self._provider.health()
+
+    async def aclose(self) -> None:
+        """
+        Annule les résumés en cours, écrit les dernières transcriptions,
+        arrête la sonde et libère les connexions HTTP du provider (shutdown
+        de l'application).
+        """
+        folds = list(self._folds.values())
+        for task in folds:
+            task.cancel()
+        await asyncio.gather(*folds, return_exceptions=True)
+        await self._transcripts.stop()
+        await self._provider.aclose()
+
     @staticmethod
     def new_session_id() -> str:
         return str(uuid.uuid4())
@@ -4,7 +4,7 @@ Moteur de calcul pour les tests d'orientation.
 Gere:
 - Calcul des scores RIASEC (en francais)
 - Calcul des scores de personnalite (MBTI)
-- Generation d'interpretation structuree
+- Generation d'interpretation structuree (memoisee par code de profil et tranche de score)
 - Calcul du score de correspondance carrieres
 """
 
@@ -148,6 +148,49 @@ MBTI_FR = {
 }
 
 
+# Conseils specifiques par profil dominant
+SPECIFIC_ADVICE = {
+    "Réaliste": "Privilégiez les formations pratiques (BTS, DUT, alternance). "
+               "Les filières Génie Civil, Mécanique et Agroalimentaire recrutent bien au Togo.",
+    "Investigateur": "Visez les études longues (Licence, Master, Doctorat). "
+                    "L'Informatique, la Data Science et les Sciences biologiques sont en forte croissance en Afrique de l'Ouest.",
+    "Artistique": "Construisez un portfolio solide dès maintenant. "
+                 "Le Design, le Marketing digital et l'UX ouvrent de nouvelles carrières au Togo et en Afrique.",
+    "Social": "Recherchez des stages en milieu hospitalier, éducatif ou associatif pour confirmer votre vocation. "
+             "Les filières Santé Communautaire et Sciences de l'Éducation offrent de nombreux débouchés.",
+    "Entrepreneur": "Rejoignez des programmes d'incubation (Woelab, CUBE) et formez-vous en gestion. "
+                   "Le Droit des Affaires et le Management sont des atouts pour créer ou diriger une entreprise.",
+    "Conventionnel": "Visez les certifications reconnues (comptabilité SYSCOHADA, fiscalité). "
+                    "La Comptabilité, l'Audit et l'Administration Publique offrent une forte employabilité au Togo.",
+}
+
+# Cache des interpretations RIASEC : (traits dominants ordonnes, tranche de score) -> interpretation.
+# Le texte ne depend des scores qu'a travers la clarte du profil (seuils 60/80) et le
+# nombre de secteurs retenus par trait : la cle capture exactement ces deux elements.
+_INTERPRETATION_CACHE: dict[tuple, dict] = {}
+
+
+def _clarity_tier(top_score: float) -> int:
+    """Tranche de clarte du profil utilisee par les conseils (seuils 60 et 80)."""
+    if top_score >= 80:
+        return 2
+    if top_score >= 60:
+        return 1
+    return 0
+
+
+def _sector_counts(dominant_traits: list[str], scores: dict) -> tuple[int, ...]:
+    """Nombre de secteurs retenus pour chacun des 3 traits dominants."""
+    weights = [scores.get(t, 0) for t in dominant_traits[:3]]
+    total_weight = sum(weights) or 1
+    return tuple(max(1, round((w / total_weight) * 5)) for w in weights)
+
+
+def _copy_interpretation(interpretation: dict) -> dict:
+    """Copie une interpretation du cache (les listes ne doivent pas etre partagees)."""
+    return {k: list(v) if isinstance(v, list) else v for k, v in interpretation.items()}
+
+
 class OrientationEngine:
     async def calculate_result(self, test_type: TestType, responses: dict, test_data: dict = None) -> TestResult:
         """
@@ -233,7 +276,22 @@ class OrientationEngine:
         )
 
     def _generate_riasec_interpretation(self, scores: dict, dominant_traits: list[str]) -> dict:
-        """Genere une interpretation structuree du profil RIASEC."""
+        """
+        Genere une interpretation structuree du profil RIASEC.
+
+        Memoisee par (code de profil, tranche de score) : seul le premier
+        profil d'une tranche construit le texte, les suivants le copient.
+        """
+        top_score = scores.get(dominant_traits[0], 0) if dominant_traits else 0
+        key = (tuple(dominant_traits), _clarity_tier(top_score), _sector_counts(dominant_traits, scores))
+        cached = _INTERPRETATION_CACHE.get(key)
+        if cached is None:
+            cached = self._build_riasec_interpretation(scores, dominant_traits)
+            _INTERPRETATION_CACHE[key] = cached
+        return _copy_interpretation(cached)
+
+    def _build_riasec_interpretation(self, scores: dict, dominant_traits: list[str]) -> dict:
+        """Construit l'interpretation RIASEC (sans cache)."""
         if not dominant_traits:
             return {
                 "profile_summary": "Aucun profil dominant dégagé. Prenez le temps de répondre à chaque question.",
@@ -324,23 +382,8 @@ class OrientationEngine:
                 "Explorez plusieurs pistes avant de vous décider."
             )
 
-        # Conseils specifiques par profil dominant
-        specific_advice = {
-            "Réaliste": "Privilégiez les formations pratiques (BTS, DUT, alternance). "
-                       "Les filières Génie Civil, Mécanique et Agroalimentaire recrutent bien au Togo.",
-            "Investigateur": "Visez les études longues (Licence, Master, Doctorat). "
-                            "L'Informatique, la Data Science et les Sciences biologiques sont en forte croissance en Afrique de l'Ouest.",
-            "Artistique": "Construisez un portfolio solide dès maintenant. "
-                         "Le Design, le Marketing digital et l'UX ouvrent de nouvelles carrières au Togo et en Afrique.",
-            "Social": "Recherchez des stages en milieu hospitalier, éducatif ou associatif pour confirmer votre vocation. "
-                     "Les filières Santé Communautaire et Sciences de l'Éducation offrent de nombreux débouchés.",
-            "Entrepreneur": "Rejoignez des programmes d'incubation (Woelab, CUBE) et formez-vous en gestion. "
-                           "Le Droit des Affaires et le Management sont des atouts pour créer ou diriger une entreprise.",
-            "Conventionnel": "Visez les certifications reconnues (comptabilité SYSCOHADA, fiscalité). "
-                            "La Comptabilité, l'Audit et l'Administration Publique offrent une forte employabilité au Togo.",
-        }
-        if primary in specific_advice:
-            advice_parts.append(specific_advice[primary])
+        if primary in SPECIFIC_ADVICE:
+            advice_parts.append(SPECIFIC_ADVICE[primary])
 
         return " ".join(advice_parts)
 
@@ -0,0 +1,270 @@
+"""
+Table de recommandations pré-calculée par code de profil RIASEC.
+
+Il n'existe que 120 codes RIASEC ordonnés à 3 lettres : plutôt que de
+recalculer à chaque soumission les chevauchements carrière/profil et les
+scores de correspondance, on matérialise le classement des carrières par
+(code de profil, tranche de scores).
+
+Gère :
+- Le chargement du catalogue des carrières actives (une requête)
+- Un index inversé trait -> carrières pour construire une entrée de table
+- La lecture O(1) d'une entrée déjà matérialisée
+- L'invalidation incrémentale quand un admin modifie les related_traits d'une carrière
+- La synchronisation entre workers via un numéro de version partagé (Redis)
+"""
+
+import logging
+import time
+from typing import Optional
+
+from app.core.cache import get_cache
+from app.schemas.orientation import CareerSummary
+from app.services.career_summary import build_career_summary, normalize_career_trait
+from app.services.orientation_engine import orientation_engine, RIASEC_FR, CODE_TO_FR
+
+logger = logging.getLogger(__name__)
+
+# Largeur d'une tranche de score (en points de pourcentage)
+SCORE_BUCKET_STEP = 5.0
+# Nombre de carrières classées conservées par entrée (avant diversification)
+CANDIDATE_POOL = 25
+# Nombre max d'entrées matérialisées (120 codes x tranches observées)
+MAX_ENTRIES = 5000
+# Délai entre deux vérifications de la version partagée
+VERSION_CHECK_INTERVAL = 30
+# Délai avant une nouvelle tentative de chargement après un échec
+LOAD_RETRY_SECONDS = 60
+
+_VERSION_CACHE_KEY = "orientation:reco_table:version"
+_VERSION_TTL = 7 * 24 * 3600
+
+
+def profile_code(dominant_traits: list[str]) -> Optional[str]:
+    """
+    Retourne le code RIASEC ordonné (ex: "IAS") des traits dominants,
+    ou None si un trait n'appartient pas au modèle RIASEC.
+    """
+    codes: list[str] = []
+    for trait in dominant_traits:
+        data = RIASEC_FR.get(normalize_career_trait(trait))
+        if data is None:
+            return None
+        codes.append(str(data["code"]))
+    return "".join(codes) or None
+
+
+def score_bucket(dominant_traits: list[str], scores: Optional[dict]) -> tuple:
+    """Tranche de scores des traits dominants (tuple vide si pas de scores)."""
+    if not scores:
+        return ()
+    return tuple(int(round(scores.get(t, 0) / SCORE_BUCKET_STEP)) for t in dominant_traits)
+
+
+class RecommendationTable:
+    """
+    Classement matérialisé des carrières par (code de profil, tranche de scores).
+
+    Les entrées sont remplies à la première lecture d'une clé puis servies
+    telles quelles ; seules celles dont le code contient un trait touché par
+    une modification admin sont recalculées.
+    """
+
+    def __init__(self) -> None:
+        self._careers: dict[str, dict] = {}
+        self._career_traits: dict[str, frozenset[str]] = {}
+        self._by_trait: dict[str, set[str]] = {}
+        self._entries: dict[tuple[str, tuple], list[CareerSummary]] = {}
+        self._loaded = False
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._load_failed_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, repo) -> bool:
+        """
+        Charge le catalogue si nécessaire et recharge si un autre worker a
+        publié une nouvelle version. Retourne False si la table est indisponible.
+        """
+        now = time.monotonic()
+        if self._loaded:
+            if now - self._version_checked_at >= VERSION_CHECK_INTERVAL:
+                self._version_checked_at = now
+                shared = self._read_shared_version()
+                if shared is not None and shared != self._version:
+                    logger.info("Table de recommandations périmée (v%s -> v%s), rechargement", self._version, shared)
+                    return await self._load(repo, shared)
+            return True
+
+        if self._load_failed_at and now - self._load_failed_at < LOAD_RETRY_SECONDS:
+            return False
+        return await self._load(repo, self._read_shared_version())
+
+    async def _load(self, repo, version: Optional[int]) -> bool:
+        try:
+            careers = await repo.get_all_careers()
+        except Exception as e:
+            logger.warning("Chargement de la table de recommandations impossible : %s", e)
+            self._load_failed_at = time.monotonic()
+            return False
+
+        self._careers.clear()
+        self._career_traits.clear()
+        self._by_trait.clear()
+        self._entries.clear()
+        for career in careers:
+            self._index_career(career)
+
+        self._loaded = True
+        self._version = version
+        self._version_checked_at = time.monotonic()
+        self._load_failed_at = 0.0
+        logger.info("Table de recommandations chargée : %d carrières", len(self._careers))
+        return True
+
+    def _index_career(self, career: dict) -> None:
+        career_id = str(career["id"])
+        traits = frozenset(normalize_career_trait(t) for t in (career.get("related_traits") or []))
+        self._careers[career_id] = career
+        self._career_traits[career_id] = traits
+        for trait in traits:
+            self._by_trait.setdefault(trait, set()).add(career_id)
+
+    def _unindex_career(self, career_id: str) -> frozenset[str]:
+        traits = self._career_traits.pop(career_id, frozenset())
+        self._careers.pop(career_id, None)
+        for trait in traits:
+            ids = self._by_trait.get(trait)
+            if ids is not None:
+                ids.discard(career_id)
+                if not ids:
+                    del self._by_trait[trait]
+        return traits
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def lookup(self, dominant_traits: list[str], scores: Optional[dict] = None) -> Optional[list[CareerSummary]]:
+        """
+        Retourne le classement (trié par match_score décroissant) pour ce profil,
+        ou None si la table n'est pas chargée ou si le profil n'est pas RIASEC.
+        """
+        if not self._loaded:
+            return None
+        code = profile_code(dominant_traits)
+        if code is None:
+            return None
+
+        traits = [CODE_TO_FR[c] for c in code]
+        key = (code, score_bucket(traits, scores))
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._build_entry(traits, key[1])
+            if len(self._entries) >= MAX_ENTRIES:
+                self._entries.clear()
+            self._entries[key] = entry
+        return entry
+
+    def _build_entry(self, traits: list[str], bucket: tuple) -> list[CareerSummary]:
+        """Calcule le classement d'une clé à partir de l'index inversé."""
+        bucket_scores = {t: min(b * SCORE_BUCKET_STEP, 100.0) for t, b in zip(traits, bucket)}
+        candidate_ids: set[str] = set()
+        for trait in traits:
+            candidate_ids |= self._by_trait.get(trait, set())
+
+        scored: list[tuple[float, str, str]] = []
+        for career_id in candidate_ids:
+            career = self._careers[career_id]
+            match_score = orientation_engine.calculate_match_score(
+                career_traits=career.get("related_traits") or [],
+                user_dominant_traits=traits,
+                user_scores=bucket_scores,
+            )
+            scored.append((match_score, career["name"], career_id))
+
+        # Seules les CANDIDATE_POOL meilleures carrieres sont materialisees
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        ranked: list[CareerSummary] = []
+        for match_score, _, career_id in scored[:CANDIDATE_POOL]:
+            career = self._careers[career_id]
+            career_traits = career.get("related_traits") or []
+            matching = [t for t in (normalize_career_trait(ct) for ct in career_traits) if t in traits]
+            ranked.append(build_career_summary(career, match_score, matching))
+        return ranked
+
+    # ------------------------------------------------------------------
+    # Mises à jour incrémentales (endpoints admin)
+    # ------------------------------------------------------------------
+
+    def upsert_career(self, career: dict) -> None:
+        """Réindexe une carrière créée/modifiée et invalide les entrées concernées."""
+        if not self._loaded:
+            self._publish_version()
+            return
+        career_id = str(career["id"])
+        old_traits = self._unindex_career(career_id)
+        new_traits: frozenset[str] = frozenset()
+        if career.get("is_active", True):
+            self._index_career(career)
+            new_traits = self._career_traits[career_id]
+        self._invalidate_traits(old_traits | new_traits)
+        self._version = self._publish_version()
+
+    def remove_career(self, career_id) -> None:
+        """Retire une carrière supprimée et invalide les entrées concernées."""
+        if not self._loaded:
+            self._publish_version()
+            return
+        traits = self._unindex_career(str(career_id))
+        self._invalidate_traits(traits)
+        self._version = self._publish_version()
+
+    def _invalidate_traits(self, traits: frozenset[str]) -> None:
+        codes = {str(RIASEC_FR[t]["code"]) for t in traits if t in RIASEC_FR}
+        stale = [key for key in self._entries if codes.intersection(key[0])]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            logger.info("Table de recommandations : %d entrées invalidées (%s)", len(stale), "".join(sorted(codes)))
+
+    def clear(self) -> None:
+        """Oublie le catalogue (rechargé à la prochaine lecture)."""
+        self._careers.clear()
+        self._career_traits.clear()
+        self._by_trait.clear()
+        self._entries.clear()
+        self._loaded = False
+        self._version = None
+
+    # ------------------------------------------------------------------
+    # Version partagée entre workers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read_shared_version() -> Optional[int]:
+        try:
+            value = get_cache().get(_VERSION_CACHE_KEY)
+            return int(value) if value is not None else None
+        except Exception:
+            return None
+
+    def _publish_version(self) -> Optional[int]:
+        # INCR atomique : deux workers qui publient en meme temps obtiennent deux versions distinctes
+        try:
+            version = get_cache().incr(_VERSION_CACHE_KEY, ttl=_VERSION_TTL)
+        except Exception as e:
+            logger.warning("Publication de la version de la table de recommandations impossible : %s", e)
+            return None
+        return version
+
+
+# Singleton partagé
+recommendation_table = RecommendationTable()
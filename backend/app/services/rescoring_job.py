@@ -0,0 +1,231 @@
+"""
+Job de re-scoring en lot des resultats de tests historiques.
+
+Quand le scoring ou le catalogue carrieres evolue, les lignes test_results
+(scores, traits dominants, recommandations) deviennent perimees. Ce job :
+- parcourt user_test_sessions (completees) par pages triees par id (keyset)
+- recalcule chaque session avec OrientationEngine + CareerMatcherService
+- ecrit les resultats en lot (une requete d'upsert + une d'insert par page)
+- sauvegarde un point de reprise apres chaque page (reprise apres arret)
+- rapporte le debit (sessions/s) et supporte un mode dry-run sans ecriture
+
+Utilise par scripts/rescore_test_results.py (CLI) et par l'endpoint admin
+POST /admin/tests/rescore.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.core.cache import get_cache
+from app.core.exceptions import NotFoundError
+from app.repositories.orientation_repository import serialize_recommendations
+from app.services.orientation_engine import orientation_engine
+from app.services.career_matcher import career_matcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+_CHECKPOINT_TTL = 7 * 24 * 3600
+_SCORING_ERROR_TRAIT = "Erreur de calcul"
+
+
+# ---------------------------------------------------------------------------
+# Points de reprise
+# ---------------------------------------------------------------------------
+
+
+class FileCheckpoint:
+    """Point de reprise stocke dans un fichier JSON (CLI)."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+
+    def load(self) -> Optional[dict]:
+        try:
+            return json.loads(self._path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except Exception as exc:
+            logger.warning("Point de reprise illisible (%s): %s", self._path, exc)
+            return None
+
+    def save(self, state: dict) -> None:
+        tmp = self._path.with_suffix(self._path.suffix + ".tmp")
+        tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        tmp.replace(self._path)
+
+    def clear(self) -> None:
+        self._path.unlink(missing_ok=True)
+
+
+class CacheCheckpoint:
+    """Point de reprise stocke dans le cache Redis (endpoint admin, partage entre workers)."""
+
+    def __init__(self, key: str) -> None:
+        self._key = key
+
+    def load(self) -> Optional[dict]:
+        return get_cache().get(self._key)
+
+    def save(self, state: dict) -> None:
+        get_cache().set(self._key, state, ttl=_CHECKPOINT_TTL)
+
+    def clear(self) -> None:
+        get_cache().delete(self._key)
+
+
+# ---------------------------------------------------------------------------
+# Job
+# ---------------------------------------------------------------------------
+
+
+def _new_state(dry_run: bool) -> dict[str, Any]:
+    return {
+        "last_session_id": None,
+        "processed": 0,
+        "written": 0,
+        "skipped": 0,
+        "failed": 0,
+        "dry_run": dry_run,
+        "status": "running",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "sessions_per_second": 0.0,
+    }
+
+
+class RescoringJob:
+    """Recalcule les test_results de toutes les sessions completees."""
+
+    def __init__(
+        self,
+        repo,
+        checkpoint=None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dry_run: bool = False,
+        on_progress: Optional[Callable[[dict], None]] = None,
+        matcher=None,
+    ) -> None:
+        self._repo = repo
+        self._matcher = matcher or career_matcher
+        self._checkpoint = checkpoint
+        self._batch_size = batch_size
+        self._dry_run = dry_run
+        self._on_progress = on_progress
+        self._tests: dict[str, Optional[dict]] = {}
+
+    async def run(self, resume: bool = True, max_sessions: Optional[int] = None) -> dict[str, Any]:
+        """
+        Execute le job jusqu'a la fin (ou max_sessions) et retourne l'etat final.
+
+        En dry-run, le point de reprise n'est ni lu ni ecrit : une simulation
+        ne doit pas faire sauter des sessions a la vraie execution.
+        """
+        state = None
+        if resume and self._checkpoint and not self._dry_run:
+            state = self._checkpoint.load()
+            if state and state.get("status") == "completed":
+                state = None
+        if state:
+            logger.info(
+                "Reprise du re-scoring apres la session %s (%d deja traitees)",
+                state["last_session_id"], state["processed"],
+            )
+            state["status"] = "running"
+        else:
+            state = _new_state(self._dry_run)
+
+        run_started = time.monotonic()
+        run_processed = 0
+
+        while max_sessions is None or run_processed < max_sessions:
+            limit = self._batch_size
+            if max_sessions is not None:
+                limit = min(limit, max_sessions - run_processed)
+
+            sessions = await self._repo.fetch_completed_sessions_after(state["last_session_id"], limit)
+            if not sessions:
+                state["status"] = "completed"
+                break
+
+            rows = await self._rescore_batch(sessions, state)
+            if not self._dry_run:
+                state["written"] += await self._repo.bulk_write_test_results(rows)
+
+            run_processed += len(sessions)
+            elapsed = time.monotonic() - run_started
+            state["processed"] += len(sessions)
+            state["last_session_id"] = sessions[-1]["id"]
+            state["sessions_per_second"] = round(run_processed / elapsed, 1) if elapsed > 0 else 0.0
+            state["updated_at"] = datetime.now(timezone.utc).isoformat()
+            self._report(state)
+        else:
+            state["status"] = "paused"
+
+        state["updated_at"] = datetime.now(timezone.utc).isoformat()
+        self._report(state)
+        logger.info(
+            "Re-scoring %s : %d sessions, %d ecrites, %d ignorees, %d en erreur (%.1f sessions/s)%s",
+            state["status"], state["processed"], state["written"], state["skipped"],
+            state["failed"], state["sessions_per_second"], " [dry-run]" if self._dry_run else "",
+        )
+        return state
+
+    async def _rescore_batch(self, sessions: list[dict], state: dict) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        calculated_at = datetime.now(timezone.utc).isoformat()
+
+        for session in sessions:
+            responses = session.get("responses") or {}
+            test = await self._get_test(session["test_id"])
+            if not responses or test is None:
+                state["skipped"] += 1
+                continue
+
+            try:
+                result = await orientation_engine.calculate_result(
+                    test_type=test["type"],
+                    responses=responses,
+                    test_data=test,
+                )
+                if result.dominant_traits == [_SCORING_ERROR_TRAIT]:
+                    raise ValueError("calcul des scores en erreur")
+                await self._matcher.enrich_result(result, self._repo, with_programs=False)
+            except Exception as exc:
+                logger.warning("Re-scoring de la session %s impossible: %s", session["id"], exc)
+                state["failed"] += 1
+                continue
+
+            rows.append({
+                "session_id": session["id"],
+                "user_id": session["user_id"],
+                "test_id": session["test_id"],
+                "scores": result.scores,
+                "dominant_traits": result.dominant_traits,
+                "recommendations": serialize_recommendations(result.recommendations),
+                "calculated_at": calculated_at,
+            })
+        return rows
+
+    async def _get_test(self, test_id: str) -> Optional[dict]:
+        """Test et questions (categories), charges une fois par test pour tout le job."""
+        if test_id not in self._tests:
+            try:
+                self._tests[test_id] = await self._repo.get_test_by_id(test_id)
+            except NotFoundError:
+                logger.warning("Test %s introuvable, sessions ignorees", test_id)
+                self._tests[test_id] = None
+        return self._tests[test_id]
+
+    def _report(self, state: dict) -> None:
+        if self._checkpoint and not self._dry_run:
+            try:
+                self._checkpoint.save(state)
+            except Exception as exc:
+                logger.warning("Sauvegarde du point de reprise impossible: %s", exc)
+        if self._on_progress:
+            self._on_progress(dict(state))
@@ -0,0 +1,133 @@
+"""
+Deduplication des soumissions de tests d'orientation.
+
+Sur les reseaux mobiles instables, les eleves renvoient souvent les memes
+reponses : chaque nouvel essai relancait le scoring, le matching et ecrivait
+une session + un resultat en double. Ce module :
+- derive une cle d'idempotence (en-tete Idempotency-Key du client, ou
+  utilisateur + test + hash des reponses)
+- reserve la cle pendant le calcul (SET NX) pour absorber les essais simultanes
+- conserve le resultat calcule pendant une fenetre de rejeu
+
+L'etat vit dans le cache Redis, partage entre les workers uvicorn.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Optional
+from uuid import UUID
+
+from app.core.cache import get_cache
+from app.core.exceptions import SubmissionInProgressError, ValidationError
+from app.core.logging import get_logger
+from app.schemas.orientation import TestResult
+
+logger = get_logger("services.submission_dedup")
+
+# Fenetre pendant laquelle une soumission identique rejoue le resultat stocke
+DEDUP_WINDOW_SECONDS = 600
+# Duree max de la reservation pendant le calcul (libere si le worker meurt)
+PENDING_TTL_SECONDS = 30
+# Attente max d'un essai concurrent avant de repondre 409
+WAIT_TIMEOUT_SECONDS = 10.0
+_POLL_INTERVAL_SECONDS = 0.2
+
+_KEY_PREFIX = "orientation:submit"
+_PENDING = "pending"
+
+
+def _responses_hash(responses: dict[str, str]) -> str:
+    canonical = json.dumps(responses, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SubmissionDeduplicator:
+    """Rejoue le resultat d'une soumission deja traitee dans la fenetre."""
+
+    def __init__(
+        self,
+        window: int = DEDUP_WINDOW_SECONDS,
+        pending_ttl: int = PENDING_TTL_SECONDS,
+        wait_timeout: float = WAIT_TIMEOUT_SECONDS,
+    ) -> None:
+        self._window = window
+        self._pending_ttl = pending_ttl
+        self._wait_timeout = wait_timeout
+
+    @staticmethod
+    def key_for(
+        user_id: Optional[UUID],
+        test_id: UUID,
+        responses: dict[str, str],
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[str, str]:
+        """
+        Retourne (cle de cache, empreinte des reponses).
+
+        La cle est toujours cloisonnee par utilisateur et par test : une cle
+        d'idempotence client ne peut pas rejouer le resultat d'un autre eleve.
+        """
+        fingerprint = _responses_hash(responses)
+        scope = str(user_id) if user_id is not None else "anon"
+        if idempotency_key:
+            suffix = "k:" + hashlib.sha256(idempotency_key.encode("utf-8")).hexdigest()
+        else:
+            suffix = "h:" + fingerprint
+        return f"{_KEY_PREFIX}:{scope}:{test_id}:{suffix}", fingerprint
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[TestResult]:
+        """
+        Retourne le resultat stocke si la soumission a deja ete traitee,
+        sinon reserve la cle et retourne None (l'appelant doit calculer puis
+        appeler complete() ou abort()).
+
+        Raises:
+            SubmissionInProgressError: essai concurrent toujours en cours
+            ValidationError: cle d'idempotence reutilisee avec d'autres reponses
+        """
+        deadline = time.monotonic() + self._wait_timeout
+
+        while True:
+            # Client Redis synchrone : hors de la boucle d'evenements
+            reserved, entry = await asyncio.to_thread(self._reserve, key)
+            if reserved:
+                return None
+
+            if isinstance(entry, dict):
+                if entry.get("fingerprint") != fingerprint:
+                    raise ValidationError(
+                        message="Cle d'idempotence deja utilisee avec d'autres reponses",
+                        errors=[{"field": "Idempotency-Key", "message": "reponses differentes"}],
+                    )
+                logger.info("Soumission dupliquee, resultat rejoue", extra={"dedup_key": key})
+                return TestResult.model_validate(entry["result"])
+
+            # Reservation en cours (ou expiree entre add et get) : on patiente
+            if time.monotonic() >= deadline:
+                raise SubmissionInProgressError()
+            await asyncio.sleep(_POLL_INTERVAL_SECONDS)
+
+    def _reserve(self, key: str) -> tuple[bool, Any]:
+        """Pose la reservation (SET NX), sinon retourne l'entree existante."""
+        cache = get_cache()
+        if cache.add(key, _PENDING, ttl=self._pending_ttl):
+            return True, None
+        return False, cache.get(key)
+
+    def complete(self, key: str, fingerprint: str, result: TestResult) -> None:
+        """Stocke le resultat pour la fenetre de rejeu."""
+        get_cache().set(
+            key,
+            {"fingerprint": fingerprint, "result": result.model_dump(mode="json")},
+            ttl=self._window,
+        )
+
+    def abort(self, key: str) -> None:
+        """Libere la reservation apres un echec (un nouvel essai recalculera)."""
+        get_cache().delete(key)
+
+
+# Singleton partage
+submission_dedup = SubmissionDeduplicator()
@@ -0,0 +1,126 @@
+"""
+Mesure de la recherche KB : taille des prompts et time-to-first-token.
+
+Compare, pour un jeu de questions d'élèves :
+- "KB complète" : toute la base de connaissances injectée (comportement historique)
+- "extraits BM25" : seuls les top-k extraits pertinents
+
+Les tokens sont estimés à ~4 caractères par token. Le TTFT est mesuré contre
+le serveur LLM factice avec un coût de prefill proportionnel au prompt.
+
+Usage:
+    cd backend
+    python -m scripts.bench_kb_retrieval --prefill-ms 120 --ttft-ms 80
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "stub-key")
+
+from app.repositories.knowledge_base_repository import _static_entries
+from app.services.llm import groq_provider
+from app.services.llm.quota_scheduler import QuotaScheduler
+from app.services.llm.kb_retriever import KBRetriever, format_snippets
+from app.services.llm.prompt_builder import PromptBuilder
+from scripts.llm_stub_server import LLMStubServer
+from scripts.seed_knowledge_base import KNOWLEDGE_BASE_ENTRIES
+
+QUESTIONS = [
+    "Combien gagne un infirmier au Togo ?",
+    "Quelles écoles pour devenir développeur à Lomé ?",
+    "Quels sont les frais de scolarité à l'Université de Kara ?",
+    "Je veux faire de la cybersécurité, où étudier ?",
+    "C'est quoi le salaire d'un ingénieur civil ?",
+    "Quelles entreprises recrutent à Lomé ?",
+    "Bonjour AÏDA !",
+    "Je ne sais pas quoi faire après le bac",
+]
+
+
+class _EntriesRepository:
+    """Repository KB en mémoire (entrées du seed + KB statique)."""
+
+    def __init__(self, entries: list[dict]) -> None:
+        self._entries = entries
+
+    def current_version(self) -> int:
+        return 1
+
+    def get_entries(self) -> list[dict]:
+        return self._entries
+
+    def get_content(self, category=None) -> str:
+        return format_snippets(self._entries)
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4
+
+
+async def _ttft(provider, system_prompt: str, question: str) -> float:
+    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": question}]
+    started = time.perf_counter()
+    first = None
+    async for _ in provider.stream(messages):
+        if first is None:
+            first = time.perf_counter() - started
+    return (first or 0.0) * 1000
+
+
+async def _run(args: argparse.Namespace) -> None:
+    repo = _EntriesRepository(KNOWLEDGE_BASE_ENTRIES + _static_entries())
+    full = PromptBuilder(repo)
+    retrieval = PromptBuilder(repo, KBRetriever(repo))
+
+    stub = await LLMStubServer(ttft_ms=args.ttft_ms, prefill_ms=args.prefill_ms).start()
+    groq_provider.GROQ_API_URL = f"{stub.base_url}/openai/v1/chat/completions"
+    # Quotas du free tier hors sujet contre le stub : on ne veut mesurer que Groq
+    provider = groq_provider.GroqProvider(
+        quota=QuotaScheduler(requests_per_minute=10**6, requests_per_day=10**9, tokens_per_minute=10**9)
+    )
+
+    rows = []
+    try:
+        for question in QUESTIONS:
+            full_prompt = full.build(query=None)
+            rag_prompt = retrieval.build(query=question)
+            rows.append((
+                question,
+                _tokens(full_prompt), _tokens(rag_prompt),
+                await _ttft(provider, full_prompt, question),
+                await _ttft(provider, rag_prompt, question),
+            ))
+    finally:
+        await provider.aclose()
+        await stub.stop()
+
+    print(f"{'Question':<60} {'tokens KB':>10} {'tokens BM25':>12} {'TTFT KB':>9} {'TTFT BM25':>10}")
+    for question, full_tokens, rag_tokens, full_ttft, rag_ttft in rows:
+        print(f"{question[:60]:<60} {full_tokens:>10} {rag_tokens:>12} {full_ttft:>7.0f}ms {rag_ttft:>8.0f}ms")
+
+    full_median = statistics.median(r[1] for r in rows)
+    rag_median = statistics.median(r[2] for r in rows)
+    print(
+        f"\nTokens de prompt médians : {full_median:.0f} -> {rag_median:.0f} "
+        f"(-{100 * (1 - rag_median / full_median):.0f}%) | "
+        f"TTFT médian : {statistics.median(r[3] for r in rows):.0f}ms -> "
+        f"{statistics.median(r[4] for r in rows):.0f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prompt KB complète vs extraits BM25")
+    parser.add_argument("--ttft-ms", type=float, default=80.0)
+    parser.add_argument("--prefill-ms", type=float, default=120.0,
+                        help="Coût simulé par tranche de 1 000 tokens d'entrée")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Mesure du time-to-first-token (TTFT) de GroqProvider contre un serveur factice.
+
+Compare deux modes sur la même séquence de messages :
+- "nouvelle connexion" : client HTTP fermé après chaque message
+  (comportement historique : un AsyncClient par appel)
+- "pool partagé"       : client persistant (keep-alive)
+
+Le coût du handshake TCP + TLS vers api.groq.com est simulé côté serveur
+(--handshake-ms, payé une fois par nouvelle connexion).
+
+Usage:
+    cd backend
+    python -m scripts.bench_llm_ttft --messages 30 --handshake-ms 250 --ttft-ms 150
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "stub-key")
+
+from app.services.llm import groq_provider
+from app.services.llm.quota_scheduler import QuotaScheduler
+from scripts.llm_stub_server import LLMStubServer
+
+_MESSAGES = [
+    {"role": "system", "content": "Tu es AÏDA, conseillère d'orientation."},
+    {"role": "user", "content": "Quels métiers pour un profil RIA ?"},
+]
+
+
+async def _ttft(provider: groq_provider.GroqProvider) -> float:
+    started = time.perf_counter()
+    first = None
+    async for _ in provider.stream(_MESSAGES):
+        if first is None:
+            first = time.perf_counter() - started
+    return (first or 0.0) * 1000
+
+
+async def _measure(provider: groq_provider.GroqProvider, messages: int, fresh: bool) -> list[float]:
+    samples = []
+    for _ in range(messages):
+        samples.append(await _ttft(provider))
+        if fresh:
+            await provider.aclose()
+    await provider.aclose()
+    return samples
+
+
+def _summary(label: str, samples: list[float], connections: int) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{label:<20} TTFT médian {statistics.median(ordered):7.1f} ms | "
+        f"p95 {p95:7.1f} ms | {connections} connexion(s)"
+    )
+
+
+async def _run(args: argparse.Namespace) -> None:
+    stub = await LLMStubServer(
+        handshake_ms=args.handshake_ms, ttft_ms=args.ttft_ms, token_ms=args.token_ms,
+    ).start()
+    groq_provider.GROQ_API_URL = f"{stub.base_url}/openai/v1/chat/completions"
+    # Quotas du free tier hors sujet contre le stub : on ne veut mesurer que Groq
+    provider = groq_provider.GroqProvider(
+        quota=QuotaScheduler(requests_per_minute=10**6, requests_per_day=10**9, tokens_per_minute=10**9)
+    )
+
+    try:
+        for label, fresh in (("nouvelle connexion", True), ("pool partagé", False)):
+            stub.connections = 0
+            samples = await _measure(provider, args.messages, fresh)
+            print(_summary(label, samples, stub.connections))
+    finally:
+        await stub.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TTFT GroqProvider : nouvelle connexion vs pool partagé")
+    parser.add_argument("--messages", type=int, default=30)
+    parser.add_argument("--handshake-ms", type=float, default=250.0,
+                        help="Coût simulé d'une nouvelle connexion TCP + TLS")
+    parser.add_argument("--ttft-ms", type=float, default=150.0)
+    parser.add_argument("--token-ms", type=float, default=5.0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
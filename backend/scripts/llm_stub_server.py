@@ -0,0 +1,255 @@
+"""
+Serveur LLM factice (Groq / OpenAI-compatible + Ollama) pour les mesures locales.
+
+Simule sans réseau externe :
+- POST /openai/v1/chat/completions  (Groq, JSON ou SSE si "stream": true)
+- POST /api/chat                     (Ollama, JSON ou NDJSON si "stream": true)
+- GET  /api/tags                     (Ollama, liste des modèles)
+
+Latences configurables :
+- handshake_ms : coût payé une seule fois par nouvelle connexion TCP
+  (simule le handshake TCP + TLS vers api.groq.com depuis notre région)
+- ttft_ms      : délai avant le premier token
+- prefill_ms   : délai supplémentaire par tranche de 1 000 tokens d'entrée
+  (le TTFT d'un vrai modèle croît avec la taille du prompt)
+- token_ms     : délai entre deux tokens
+
+Pannes simulées :
+- groq_fail_after coupe la connexion des streams Groq après N tokens
+  (bascule Groq -> Ollama en cours de réponse)
+- error_rate : part des requêtes de génération (Groq et Ollama) rejetées
+  avec le statut error_status (503 par défaut, 429 pour un quota épuisé)
+
+Usage autonome:
+    cd backend
+    python -m scripts.llm_stub_server --port 8765 --handshake-ms 250 --ttft-ms 150
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+_WORDS = (
+    "Avec ton profil Investigateur et Réaliste, les métiers de l'ingénierie "
+    "et des sciences appliquées te correspondent bien. Pense aux filières "
+    "scientifiques au lycée puis aux écoles d'ingénieurs."
+).split(" ")
+
+
+class LLMStubServer:
+    """Serveur HTTP/1.1 minimal (keep-alive) imitant Groq et Ollama."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        handshake_ms: float = 0.0,
+        ttft_ms: float = 0.0,
+        token_ms: float = 0.0,
+        tokens: int = 40,
+        prefill_ms: float = 0.0,
+        groq_fail_after: Optional[int] = None,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.handshake_ms = handshake_ms
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.tokens = tokens
+        self.prefill_ms = prefill_ms
+        self.groq_fail_after = groq_fail_after
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        # Streams envoyés jusqu'au bout (un client qui coupe n'en fait pas partie)
+        self.streams_completed = 0
+        # Dernier corps JSON reçu par chemin (vérifications dans les tests)
+        self.last_payloads: dict[str, dict] = {}
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "LLMStubServer":
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Connexions encore en attente (requête annulée côté client, stream bloqué)
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            if self.handshake_ms:
+                await asyncio.sleep(self.handshake_ms / 1000)
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = b""
+                if int(headers.get("content-length", 0)):
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                self.requests += 1
+                await self._dispatch(method, path, body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Arrêt du serveur : fin normale (asyncio 3.11 journalise sinon la tâche annulée)
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        payload = json.loads(body) if body else {}
+        self.last_payloads[path] = payload
+        first_token_delay = self._first_token_delay(payload)
+        if method == "GET" and path == "/api/tags":
+            await self._send_json(writer, {"models": [{"name": "llama3.1:8b"}]})
+        elif method == "POST" and self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            await self._send_json(writer, {"error": "panne simulée"}, status=self.error_status)
+        elif method == "POST" and path.endswith("/chat/completions"):
+            if payload.get("stream"):
+                await self._send_stream(writer, "text/event-stream", self._openai_events(first_token_delay))
+            else:
+                await asyncio.sleep(first_token_delay)
+                text = " ".join(_WORDS[: self.tokens])
+                await self._send_json(writer, {"choices": [{"message": {"role": "assistant", "content": text}}]})
+        elif method == "POST" and path == "/api/chat":
+            if payload.get("stream"):
+                await self._send_stream(writer, "application/x-ndjson", self._ollama_events(first_token_delay))
+            else:
+                await asyncio.sleep(first_token_delay)
+                text = " ".join(_WORDS[: self.tokens])
+                await self._send_json(writer, {"message": {"role": "assistant", "content": text}, "done": True})
+        else:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+
+    def _first_token_delay(self, payload: dict) -> float:
+        """TTFT simulé (secondes) : fixe + proportionnel aux tokens d'entrée (~4 car./token)."""
+        input_chars = sum(len(m.get("content", "")) for m in payload.get("messages", []))
+        return (self.ttft_ms + self.prefill_ms * input_chars / 4 / 1000) / 1000
+
+    async def _send_json(self, writer: asyncio.StreamWriter, data: dict, status: int = 200) -> None:
+        raw = json.dumps(data).encode("utf-8")
+        reason = "OK" if status == 200 else "Error"
+        retry_after = "Retry-After: 1\r\n" if status == 429 else ""
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n{retry_after}"
+            f"Content-Length: {len(raw)}\r\n\r\n".encode("latin-1")
+            + raw
+        )
+        await writer.drain()
+
+    async def _send_stream(self, writer: asyncio.StreamWriter, content_type: str, events) -> None:
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+            "Transfer-Encoding: chunked\r\n\r\n".encode("latin-1")
+        )
+        async for event in events:
+            data = event.encode("utf-8")
+            writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        self.streams_completed += 1
+
+    def _tokens(self) -> list[str]:
+        words = _WORDS[: self.tokens]
+        return [w + ("" if i == len(words) - 1 else " ") for i, w in enumerate(words)]
+
+    async def _openai_events(self, first_token_delay: float):
+        await asyncio.sleep(first_token_delay)
+        for i, token in enumerate(self._tokens()):
+            if self.groq_fail_after is not None and i >= self.groq_fail_after:
+                raise ConnectionAbortedError("panne Groq simulée")
+            if i and self.token_ms:
+                await asyncio.sleep(self.token_ms / 1000)
+            chunk = {"choices": [{"delta": {"content": token}}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    async def _ollama_events(self, first_token_delay: float):
+        await asyncio.sleep(first_token_delay)
+        for i, token in enumerate(self._tokens()):
+            if i and self.token_ms:
+                await asyncio.sleep(self.token_ms / 1000)
+            yield json.dumps({"message": {"role": "assistant", "content": token}, "done": False}) + "\n"
+        yield json.dumps({"message": {"role": "assistant", "content": ""}, "done": True}) + "\n"
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = await LLMStubServer(
+        host=args.host, port=args.port, handshake_ms=args.handshake_ms,
+        ttft_ms=args.ttft_ms, token_ms=args.token_ms, tokens=args.tokens,
+        prefill_ms=args.prefill_ms, groq_fail_after=args.groq_fail_after,
+        error_rate=args.error_rate, error_status=args.error_status,
+    ).start()
+    print(f"Stub LLM en écoute sur {server.base_url} (Ctrl+C pour arrêter)")
+    started = time.monotonic()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        print(f"{server.requests} requêtes, {server.connections} connexions en {time.monotonic() - started:.0f}s")
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serveur LLM factice (Groq + Ollama)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--handshake-ms", type=float, default=0.0)
+    parser.add_argument("--ttft-ms", type=float, default=0.0)
+    parser.add_argument("--token-ms", type=float, default=0.0)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--prefill-ms", type=float, default=0.0,
+                        help="Délai par tranche de 1 000 tokens d'entrée")
+    parser.add_argument("--groq-fail-after", type=int, default=None,
+                        help="Coupe les streams Groq après N tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Part des requêtes de génération rejetées (0-1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
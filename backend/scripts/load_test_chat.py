@@ -0,0 +1,414 @@
+"""
+Test de charge du chat AÏDA sans consommer le quota Groq.
+
+Le harnais est autonome :
+- deux serveurs LLM factices (scripts.llm_stub_server) : l'un joue Groq
+  (SSE compatible OpenAI), l'autre Ollama (NDJSON), avec latence, débit
+  de tokens et taux de pannes configurables
+- l'API lancée dans un process uvicorn séparé, pointée vers ces serveurs
+  (GROQ_API_URL, OLLAMA_BASE_URL) ; les élèves virtuels s'authentifient
+  avec des JWT signés par un secret local (SUPABASE_JWT_SECRET)
+- N élèves virtuels qui enchaînent des conversations sur /chat/message
+  et /chat/message/stream pendant la durée demandée
+
+Rapport : débit, TTFT et durée (p50/p95/p99) par endpoint, taux d'erreurs
+par type, requêtes servies par Groq et Ollama, mémoire (RSS) du process API
+au fil du test. Les autres variables d'environnement (REDIS_URL, quotas
+GROQ_*, CHAT_MAX_CONCURRENT_*) sont transmises telles quelles à l'API.
+
+Usage:
+    cd backend
+    python -m scripts.load_test_chat --students 50 --duration 60 --ttft-ms 300 --token-ms 20
+    python -m scripts.load_test_chat --students 100 --groq-error-rate 0.2 --json rapport.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.services.llm.groq_provider import is_degraded_reply
+from scripts.llm_stub_server import LLMStubServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAT_URL = "/api/v1/chat/message"
+STARTUP_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 120.0
+
+QUESTIONS = [
+    "Bonjour AÏDA !",
+    "Quels métiers pour un profil Investigateur et Réaliste ?",
+    "Combien gagne un infirmier au Togo ?",
+    "Quelles écoles pour devenir développeur à Lomé ?",
+    "Je ne sais pas quoi faire après le bac, tu peux m'aider ?",
+    "C'est quoi la différence entre BTS et licence ?",
+    "Est-ce que la cybersécurité recrute au Togo ?",
+    "Merci, et pour l'agronomie ?",
+]
+
+
+# ---------------------------------------------------------------------------
+# Mesures
+# ---------------------------------------------------------------------------
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """RSS du process et de ses enfants (workers uvicorn), via /proc (Linux uniquement)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except (OSError, StopIteration, ValueError):
+        return None
+    return rss_kb / 1024 + sum(rss_mb(child) or 0.0 for child in children)
+
+
+class Recorder:
+    """Résultats des requêtes et échantillons mémoire du test."""
+
+    def __init__(self) -> None:
+        self.results: list[dict] = []
+        self.memory: list[tuple[float, Optional[float], int]] = []
+        self.in_flight = 0
+        self.started = time.monotonic()
+
+    def add(self, kind: str, outcome: str, total: float, ttft: Optional[float] = None, chunks: int = 0) -> None:
+        self.results.append({
+            "kind": kind, "outcome": outcome, "total": total, "ttft": ttft, "chunks": chunks,
+            "at": time.monotonic() - self.started,
+        })
+
+    def report(self, stubs: dict[str, LLMStubServer]) -> dict:
+        elapsed = time.monotonic() - self.started
+        endpoints = {}
+        for kind in ("json", "stream"):
+            rows = [r for r in self.results if r["kind"] == kind]
+            if not rows:
+                continue
+            ok = [r for r in rows if r["outcome"] == "ok"]
+            ttfts = [r["ttft"] for r in ok if r["ttft"] is not None]
+            totals = [r["total"] for r in ok]
+            endpoints[kind] = {
+                "requests": len(rows),
+                "ok": len(ok),
+                "error_rate": 1 - len(ok) / len(rows),
+                "outcomes": dict(Counter(r["outcome"] for r in rows)),
+                "ttft_ms": {q: _ms(percentile(ttfts, p)) for q, p in (("p50", .5), ("p95", .95), ("p99", .99))},
+                "total_ms": {q: _ms(percentile(totals, p)) for q, p in (("p50", .5), ("p95", .95), ("p99", .99))},
+                "chunks_per_second": sum(r["chunks"] for r in ok) / elapsed if elapsed else 0.0,
+            }
+        samples = [m for _, m, _ in self.memory if m is not None]
+        return {
+            "duration_seconds": round(elapsed, 1),
+            "requests": len(self.results),
+            "throughput_rps": len(self.results) / elapsed if elapsed else 0.0,
+            "endpoints": endpoints,
+            "upstream": {
+                name: {"requests": stub.requests, "injected_errors": stub.errors}
+                for name, stub in stubs.items()
+            },
+            "memory_mb": {
+                "start": samples[0] if samples else None,
+                "peak": max(samples) if samples else None,
+                "end": samples[-1] if samples else None,
+                "timeline": [
+                    {"t": round(t, 1), "rss_mb": m, "in_flight": n} for t, m, n in self.memory
+                ],
+            },
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Élèves virtuels
+# ---------------------------------------------------------------------------
+
+
+def student_token(secret: str) -> str:
+    """JWT Supabase minimal, validé localement par l'API (SUPABASE_JWT_SECRET)."""
+    from jose import jwt
+
+    claims = {
+        "sub": str(uuid.uuid4()),
+        "aud": "authenticated",
+        "role": "authenticated",
+        "exp": int(time.time()) + 24 * 3600,
+    }
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+async def _send_json(client: httpx.AsyncClient, body: dict, recorder: Recorder) -> Optional[str]:
+    started = time.monotonic()
+    resp = await client.post(CHAT_URL, json=body)
+    elapsed = time.monotonic() - started
+    if resp.status_code != 200:
+        recorder.add("json", f"http_{resp.status_code}", elapsed)
+        return None
+    data = resp.json()
+    recorder.add("json", "degraded" if is_degraded_reply(data["reply"]) else "ok", elapsed)
+    return data["session_id"]
+
+
+async def _send_stream(client: httpx.AsyncClient, body: dict, recorder: Recorder) -> Optional[str]:
+    started = time.monotonic()
+    ttft = None
+    parts: list[str] = []
+    session_id = None
+    async with client.stream("POST", f"{CHAT_URL}/stream", json=body) as resp:
+        if resp.status_code != 200:
+            await resp.aread()
+            recorder.add("stream", f"http_{resp.status_code}", time.monotonic() - started)
+            return None
+        async for line in resp.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[6:])
+            if "error" in event:
+                recorder.add("stream", "stream_error", time.monotonic() - started, ttft, len(parts))
+                return None
+            if event.get("done"):
+                session_id = event.get("session_id")
+                break
+            if ttft is None:
+                ttft = time.monotonic() - started
+            parts.append(event.get("chunk", ""))
+    outcome = "degraded" if is_degraded_reply("".join(parts)) else "ok"
+    if session_id is None:
+        outcome = "truncated"
+    recorder.add("stream", outcome, time.monotonic() - started, ttft, len(parts))
+    return session_id
+
+
+async def student(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    recorder: Recorder,
+    deadline: float,
+    rng: random.Random,
+) -> None:
+    """Conversations successives de `--turns` messages jusqu'à la fin du test."""
+    # Arrivées étalées : toute la classe ne se connecte pas dans la même milliseconde
+    await asyncio.sleep(rng.uniform(0, args.ramp_up))
+    while time.monotonic() < deadline:
+        session_id = None
+        for _ in range(args.turns):
+            if time.monotonic() >= deadline:
+                return
+            body = {"message": rng.choice(QUESTIONS)}
+            if session_id:
+                body["session_id"] = session_id
+            streamed = rng.random() < args.stream_ratio
+            recorder.in_flight += 1
+            try:
+                if streamed:
+                    session_id = await _send_stream(client, body, recorder) or session_id
+                else:
+                    session_id = await _send_json(client, body, recorder) or session_id
+            except httpx.HTTPError as exc:
+                recorder.add("stream" if streamed else "json", type(exc).__name__, REQUEST_TIMEOUT)
+            finally:
+                recorder.in_flight -= 1
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000)
+
+
+async def sample_memory(pid: int, recorder: Recorder, interval: float) -> None:
+    while True:
+        recorder.memory.append((time.monotonic() - recorder.started, rss_mb(pid), recorder.in_flight))
+        await asyncio.sleep(interval)
+
+
+# ---------------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(base_url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"L'API s'est arrêtée au démarrage (code {process.returncode})")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"L'API ne répond pas après {STARTUP_TIMEOUT:.0f}s")
+
+
+def start_api(port: int, groq: LLMStubServer, ollama: LLMStubServer, secret: str, workers: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GROQ_API_KEY": "stub-key",
+        "GROQ_API_URL": f"{groq.base_url}/openai/v1/chat/completions",
+        "OLLAMA_BASE_URL": ollama.base_url,
+        "SUPABASE_JWT_SECRET": secret,
+        # Pas de Supabase en local : les transcriptions fausseraient les mesures
+        "CHAT_TRANSCRIPTS_ENABLED": "false",
+    }
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    groq = await LLMStubServer(
+        tokens=args.tokens, prefill_ms=args.prefill_ms, handshake_ms=args.handshake_ms,
+        ttft_ms=args.ttft_ms, token_ms=args.token_ms, groq_fail_after=args.groq_fail_after,
+        error_rate=args.groq_error_rate, error_status=args.groq_error_status,
+    ).start()
+    ollama = await LLMStubServer(
+        tokens=args.tokens, prefill_ms=args.prefill_ms,
+        ttft_ms=args.ollama_ttft_ms, token_ms=args.ollama_token_ms,
+        error_rate=args.ollama_error_rate,
+    ).start()
+    secret = secrets.token_urlsafe(32)
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = start_api(port, groq, ollama, secret, args.workers)
+    sampler = None
+    try:
+        await _wait_ready(base_url, process)
+        print(f"API prête sur {base_url} — {args.students} élèves pendant {args.duration:.0f}s")
+
+        recorder = Recorder()
+        sampler = asyncio.create_task(sample_memory(process.pid, recorder, args.sample_interval))
+        deadline = time.monotonic() + args.duration
+        limits = httpx.Limits(max_connections=args.students, max_keepalive_connections=args.students)
+        clients = [
+            httpx.AsyncClient(
+                base_url=base_url,
+                timeout=REQUEST_TIMEOUT,
+                limits=limits,
+                headers={"Authorization": f"Bearer {student_token(secret)}"},
+            )
+            for _ in range(args.students)
+        ]
+        rng = random.Random(args.seed)
+        try:
+            await asyncio.gather(*(
+                student(client, args, recorder, deadline, random.Random(rng.random()))
+                for client in clients
+            ))
+        finally:
+            for client in clients:
+                await client.aclose()
+        return recorder.report({"groq": groq, "ollama": ollama})
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+            await asyncio.gather(sampler, return_exceptions=True)
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        await groq.stop()
+        await ollama.stop()
+
+
+def _triple(quantiles: dict) -> str:
+    return "/".join("-" if quantiles[q] is None else f"{quantiles[q]:.0f}" for q in ("p50", "p95", "p99"))
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"\n{report['requests']} requêtes en {report['duration_seconds']}s "
+        f"— {report['throughput_rps']:.1f} req/s"
+    )
+    for kind, stats in report["endpoints"].items():
+        # Pas de TTFT en JSON : la réponse arrive d'un bloc
+        ttft = f"TTFT p50/p95/p99 {_triple(stats['ttft_ms'])} ms | " if kind == "stream" else ""
+        print(
+            f"  {kind:<7} {stats['requests']:>6} req | erreurs {stats['error_rate']:6.1%} | "
+            f"{ttft}durée p50/p95/p99 {_triple(stats['total_ms'])} ms"
+        )
+        failures = {k: v for k, v in stats["outcomes"].items() if k != "ok"}
+        if failures:
+            print(f"          échecs : {failures}")
+    upstream = report["upstream"]
+    print(
+        "  amont   Groq {groq[requests]} requêtes ({groq[injected_errors]} pannes simulées) | "
+        "Ollama {ollama[requests]} requêtes ({ollama[injected_errors]} pannes simulées)".format(**upstream)
+    )
+    memory = report["memory_mb"]
+    if memory["peak"] is not None:
+        print(
+            f"  mémoire API {memory['start']:.0f} → {memory['end']:.0f} Mo "
+            f"(pic {memory['peak']:.0f} Mo, {len(memory['timeline'])} échantillons)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Test de charge du chat AÏDA contre des LLM factices")
+    parser.add_argument("--students", type=int, default=30, help="Élèves virtuels simultanés")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée du test (s)")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Étalement des arrivées (s)")
+    parser.add_argument("--turns", type=int, default=4, help="Messages par conversation")
+    parser.add_argument("--think-ms", type=float, default=2000.0, help="Pause moyenne entre deux messages")
+    parser.add_argument("--stream-ratio", type=float, default=0.8, help="Part des messages en streaming")
+    parser.add_argument("--workers", type=int, default=1, help="Workers uvicorn de l'API")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Période d'échantillonnage mémoire (s)")
+    parser.add_argument("--json", dest="json_path", help="Écrit le rapport complet dans ce fichier")
+    stubs = parser.add_argument_group("LLM factices")
+    stubs.add_argument("--tokens", type=int, default=40, help="Tokens par réponse")
+    stubs.add_argument("--prefill-ms", type=float, default=0.0, help="Délai par tranche de 1 000 tokens d'entrée")
+    stubs.add_argument("--handshake-ms", type=float, default=0.0, help="Coût d'une nouvelle connexion Groq")
+    stubs.add_argument("--ttft-ms", type=float, default=150.0, help="TTFT Groq")
+    stubs.add_argument("--token-ms", type=float, default=10.0, help="Délai entre tokens Groq")
+    stubs.add_argument("--groq-error-rate", type=float, default=0.0)
+    stubs.add_argument("--groq-error-status", type=int, default=503)
+    stubs.add_argument("--groq-fail-after", type=int, default=None, help="Coupe les streams Groq après N tokens")
+    stubs.add_argument("--ollama-ttft-ms", type=float, default=800.0)
+    stubs.add_argument("--ollama-token-ms", type=float, default=60.0)
+    stubs.add_argument("--ollama-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Rapport écrit dans {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Script de re-scoring en lot des resultats de tests historiques.
+
+Recalcule test_results (scores, traits dominants, recommandations) pour toutes
+les sessions completees, apres une evolution du scoring ou du catalogue carrieres.
+Reprend automatiquement la ou il s'est arrete (point de reprise JSON).
+
+Usage:
+    cd backend
+    python -m scripts.rescore_test_results --dry-run
+    python -m scripts.rescore_test_results --batch-size 500
+    python -m scripts.rescore_test_results --restart
+
+Prerequis:
+    - .env configure avec SUPABASE_URL et SUPABASE_SERVICE_ROLE_KEY
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.repositories.orientation_repository import get_orientation_repository
+from app.services.rescoring_job import DEFAULT_BATCH_SIZE, FileCheckpoint, RescoringJob
+
+
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parent / ".rescore_checkpoint.json"
+
+
+def _print_progress(state: dict) -> None:
+    print(
+        f"[{state['status']}] {state['processed']} sessions traitees | "
+        f"{state['written']} ecrites | {state['skipped']} ignorees | "
+        f"{state['failed']} en erreur | {state['sessions_per_second']} sessions/s | "
+        f"derniere session: {state['last_session_id']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-scoring des resultats de tests historiques")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Sessions par page (defaut: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Recalcule sans ecrire ni toucher au point de reprise")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore le point de reprise et repart du debut")
+    parser.add_argument("--max-sessions", type=int, default=None,
+                        help="Arrete apres N sessions (reprise possible ensuite)")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT,
+                        help="Fichier du point de reprise")
+    args = parser.parse_args()
+
+    job = RescoringJob(
+        repo=get_orientation_repository(),
+        checkpoint=FileCheckpoint(args.checkpoint),
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        on_progress=_print_progress,
+    )
+    state = asyncio.run(job.run(resume=not args.restart, max_sessions=args.max_sessions))
+
+    if state["status"] == "completed" and not args.dry_run:
+        print(f"Re-scoring termine. Point de reprise conserve dans {args.checkpoint}.")
+    elif state["status"] == "paused":
+        print("Re-scoring interrompu (--max-sessions). Relancez la commande pour reprendre.")
+
+
+if __name__ == "__main__":
+    main()
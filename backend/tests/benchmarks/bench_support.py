@@ -0,0 +1,195 @@
+"""
+Outillage des benchmarks du chemin critique d'orientation.
+
+- Donnees synthetiques : reponses par type de test, catalogues de carrieres
+- InMemoryOrientationRepo : repository en memoire (aucun appel Supabase)
+- Bench : mesure le meilleur temps par appel (min des repetitions) et le
+  compare a baselines.json
+
+Les timings absolus dependent de la machine : chaque mesure est divisee par
+le temps d'une boucle de calibration executee sur la machine courante, et
+baselines.json contient ces temps relatifs. Les benchmarks ne tournent que si
+RUN_BENCHMARKS=1 et se contentent d'afficher les mesures, sauf avec
+BENCH_ASSERT=1. Variables d'environnement :
+- BENCH_ASSERT=1 : echoue si une mesure depasse sa baseline x tolerance
+- BENCH_REGRESSION_FACTOR : tolerance par rapport a la baseline (defaut 1.5)
+- BENCH_UPDATE_BASELINES=1 : reecrit baselines.json avec les mesures courantes
+"""
+
+import json
+import os
+import random
+import time
+from pathlib import Path
+from uuid import uuid4
+
+BASELINES_PATH = Path(__file__).resolve().parent / "baselines.json"
+REGRESSION_FACTOR = float(os.environ.get("BENCH_REGRESSION_FACTOR", "1.5"))
+UPDATE_BASELINES = os.environ.get("BENCH_UPDATE_BASELINES") == "1"
+ASSERT_BASELINES = os.environ.get("BENCH_ASSERT") == "1"
+
+RIASEC_CODES = ["R", "I", "A", "S", "E", "C"]
+MBTI_PAIRS = ["E-I", "S-N", "T-F", "J-P"]
+GENERIC_CATEGORIES = ["Logique", "Linguistique", "Spatial", "Numerique", "Relationnel"]
+
+CATALOG_SIZES = [100, 1_000, 10_000]
+
+
+# =============================================================================
+# Donnees synthetiques
+# =============================================================================
+
+
+def synthetic_test(test_type: str, questions_per_category: int = 10, seed: int = 0) -> tuple[dict, dict]:
+    """Retourne (test_data, responses) pour un type de test."""
+    rng = random.Random(seed)
+    if test_type == "riasec":
+        categories = RIASEC_CODES
+    elif test_type == "personality":
+        categories = MBTI_PAIRS
+    else:
+        categories = GENERIC_CATEGORIES
+
+    questions = []
+    responses = {}
+    for category in categories:
+        for i in range(questions_per_category):
+            q_id = f"{category}_{i}"
+            questions.append({"id": q_id, "category": category})
+            responses[q_id] = str(rng.randint(1, 5))
+    return {"id": str(uuid4()), "type": test_type, "questions": questions}, responses
+
+
+def synthetic_catalog(size: int, seed: int = 0) -> list[dict]:
+    """Catalogue de carrieres avec 1 a 3 traits RIASEC (codes, FR ou EN)."""
+    rng = random.Random(seed)
+    labels = {
+        "R": ["R", "Réaliste", "Realistic"],
+        "I": ["I", "Investigateur", "Investigative"],
+        "A": ["A", "Artistique", "Artistic"],
+        "S": ["S", "Social", "Social"],
+        "E": ["E", "Entrepreneur", "Enterprising"],
+        "C": ["C", "Conventionnel", "Conventional"],
+    }
+    careers = []
+    for i in range(size):
+        codes = rng.sample(RIASEC_CODES, rng.randint(1, 3))
+        careers.append({
+            "id": str(uuid4()),
+            "name": f"Carriere {i:05d}",
+            "description": "Description synthetique",
+            "sector_name": f"Secteur {i % 12}",
+            "job_demand": rng.choice(["high", "medium", "low"]),
+            "salary_avg_fcfa": rng.randint(100_000, 1_500_000),
+            "required_skills": [f"competence {j}" for j in range(rng.randint(0, 8))],
+            "related_traits": [rng.choice(labels[c]) for c in codes],
+            "education_path": {"minimum_level": rng.choice(["BAC", "BAC+2", "BAC+3", "BAC+5"])},
+            "is_active": True,
+        })
+    return careers
+
+
+class InMemoryOrientationRepo:
+    """Repository d'orientation en memoire pour les benchmarks."""
+
+    def __init__(self, careers: list[dict]):
+        self.careers = careers
+
+    async def get_all_careers(self, sector=None, limit=None):
+        careers = [c for c in self.careers if not sector or c["sector_name"] == sector]
+        return careers[:limit] if limit else careers
+
+    async def get_careers_by_traits(self, traits: list[str], limit: int = 10):
+        from app.services.career_summary import normalize_career_trait
+
+        wanted = {normalize_career_trait(t) for t in traits}
+        matches = []
+        for c in self.careers:
+            if wanted.intersection(normalize_career_trait(t) for t in c["related_traits"]):
+                matches.append(c)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    async def get_matching_school_programs(self, sector_names: list[str], limit: int = 10):
+        return [{"program_id": str(i), "program_name": s} for i, s in enumerate(sector_names[:limit])]
+
+
+# =============================================================================
+# Mesure et comparaison aux baselines
+# =============================================================================
+
+
+def load_baselines() -> dict:
+    if BASELINES_PATH.exists():
+        return json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+    return {}
+
+
+measured: dict[str, float] = {}
+
+
+def _calibration_workload() -> None:
+    # Melange representatif du code mesure : dicts, tris, chaines
+    data = {f"k{i}": (i * 7919) % 1_000 for i in range(2_000)}
+    ranked = sorted(data.items(), key=lambda kv: kv[1], reverse=True)
+    "".join(k for k, _ in ranked[:200]).lower()
+
+
+_calibration_us: float | None = None
+
+
+def calibration_us() -> float:
+    """Temps (us) de la boucle de calibration sur la machine courante (min de 100)."""
+    global _calibration_us
+    if _calibration_us is None:
+        samples = []
+        for _ in range(100):
+            start = time.perf_counter()
+            _calibration_workload()
+            samples.append(time.perf_counter() - start)
+        _calibration_us = min(samples) * 1e6
+    return _calibration_us
+
+
+class Bench:
+    """
+    Mesure le meilleur temps par appel d'une fonction, en unites de calibration
+    (1.0 = duree de la boucle de calibration sur la meme machine).
+    """
+
+    def __init__(self, baselines: dict):
+        self._baselines = baselines
+
+    def _check(self, name: str, samples: list[float]) -> float:
+        # Le minimum des repetitions est le moins sensible au bruit (GC, autres process)
+        best_us = min(samples) * 1e6
+        relative = best_us / calibration_us()
+        measured[name] = float(f"{relative:.4g}")
+        baseline = self._baselines.get(name)
+        print(f"\n[bench] {name}: {best_us:.2f} us/appel, {relative:.4f} (baseline: {baseline})")
+        if ASSERT_BASELINES and baseline is not None and not UPDATE_BASELINES:
+            limit = baseline * REGRESSION_FACTOR
+            assert relative <= limit, (
+                f"Regression {name}: {relative:.4f} > {limit:.4f} "
+                f"(baseline {baseline} x {REGRESSION_FACTOR}, unites de calibration)"
+            )
+        return best_us
+
+    def run(self, name: str, fn, *, number: int = 100, repeat: int = 7) -> float:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) / number)
+        return self._check(name, samples)
+
+    async def run_async(self, name: str, coro_fn, *, number: int = 100, repeat: int = 7) -> float:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                await coro_fn()
+            samples.append((time.perf_counter() - start) / number)
+        return self._check(name, samples)
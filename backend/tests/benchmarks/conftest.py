@@ -0,0 +1,16 @@
+"""Fixtures des benchmarks (voir bench_support.py)."""
+
+import json
+
+import pytest
+
+from bench_support import BASELINES_PATH, UPDATE_BASELINES, Bench, load_baselines, measured
+
+
+@pytest.fixture(scope="session")
+def bench():
+    yield Bench(load_baselines())
+    if UPDATE_BASELINES and measured:
+        baselines = load_baselines()
+        baselines.update(measured)
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
@@ -0,0 +1,149 @@
+"""
+Benchmarks du chemin critique d'orientation.
+
+Lancer :
+    cd backend
+    RUN_BENCHMARKS=1 pytest tests/benchmarks -s                         # affiche les mesures
+    RUN_BENCHMARKS=1 BENCH_ASSERT=1 pytest tests/benchmarks             # echoue si regression
+    RUN_BENCHMARKS=1 BENCH_UPDATE_BASELINES=1 pytest tests/benchmarks   # nouvelle baseline
+
+Depuis la racine : make backend-bench (avec BENCH_ASSERT=1) ou
+make backend-bench-measure (mesures seules).
+
+Mesure calculate_result (par type de test), calculate_match_score,
+_diversify_by_tier, build_career_summary et enrich_result complet contre un
+repository en memoire, sur des catalogues de 100 / 1k / 10k carrieres.
+"""
+
+import os
+import random
+from uuid import uuid4
+
+import pytest
+
+from app.schemas.orientation import TestResult, TestType
+from app.services.career_matcher import CareerMatcherService, _diversify_by_tier
+from app.services.career_summary import build_career_summary
+from app.services.orientation_engine import OrientationEngine
+from app.services.recommendation_table import RecommendationTable
+
+from bench_support import CATALOG_SIZES, InMemoryOrientationRepo, synthetic_catalog, synthetic_test
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(os.environ.get("RUN_BENCHMARKS") != "1", reason="RUN_BENCHMARKS=1 requis"),
+]
+
+_SCORES = {
+    "Réaliste": 82.0, "Investigateur": 74.0, "Artistique": 40.0,
+    "Social": 36.0, "Entrepreneur": 58.0, "Conventionnel": 22.0,
+}
+_DOMINANT = ["Réaliste", "Investigateur", "Entrepreneur"]
+
+
+def _riasec_result() -> TestResult:
+    return TestResult(
+        test_id=uuid4(),
+        scores=dict(_SCORES),
+        dominant_traits=list(_DOMINANT),
+        interpretation={"recommended_sectors": ["Génie Civil & BTP", "Informatique & Cybersécurité"]},
+    )
+
+
+# =============================================================================
+# OrientationEngine
+# =============================================================================
+
+
+@pytest.mark.parametrize("test_type", [t.value for t in TestType])
+async def test_bench_calculate_result(bench, test_type):
+    engine = OrientationEngine()
+    test_data, responses = synthetic_test(test_type)
+
+    async def call():
+        await engine.calculate_result(TestType(test_type), responses, test_data)
+
+    await bench.run_async(f"calculate_result[{test_type}]", call, number=200)
+
+
+def test_bench_calculate_match_score(bench):
+    career_traits = ["Realistic", "I", "Artistique"]
+
+    def call():
+        OrientationEngine.calculate_match_score(career_traits, _DOMINANT, _SCORES)
+
+    bench.run("calculate_match_score", call, number=5_000)
+
+
+# =============================================================================
+# CareerMatcher — briques
+# =============================================================================
+
+
+def test_bench_build_career_summary(bench):
+    career = synthetic_catalog(1)[0]
+
+    def call():
+        build_career_summary(career, 75.0, ["Réaliste"])
+
+    bench.run("build_career_summary", call, number=2_000)
+
+
+@pytest.mark.parametrize("size", [25, 1_000])
+def test_bench_diversify_by_tier(bench, size):
+    rng = random.Random(0)
+    ranked = sorted(
+        (build_career_summary(c, round(rng.uniform(0, 100), 1), []) for c in synthetic_catalog(size)),
+        key=lambda r: r.match_score,
+        reverse=True,
+    )
+
+    def call():
+        _diversify_by_tier(ranked)
+
+    bench.run(f"_diversify_by_tier[{size}]", call, number=200 if size <= 25 else 20)
+
+
+# =============================================================================
+# enrich_result complet
+# =============================================================================
+
+
+@pytest.mark.parametrize("size", CATALOG_SIZES)
+async def test_bench_enrich_result_table(bench, size):
+    """Chemin nominal : table de recommandations chargee, entree materialisee."""
+    repo = InMemoryOrientationRepo(synthetic_catalog(size))
+    service = CareerMatcherService(RecommendationTable())
+    await service.enrich_result(_riasec_result(), repo)
+
+    async def call():
+        await service.enrich_result(_riasec_result(), repo)
+
+    await bench.run_async(f"enrich_result[table,{size}]", call, number=200)
+
+
+@pytest.mark.parametrize("size", CATALOG_SIZES)
+async def test_bench_enrich_result_cold_entry(bench, size):
+    """Premiere lecture d'un code de profil : construction de l'entree de table."""
+    repo = InMemoryOrientationRepo(synthetic_catalog(size))
+    table = RecommendationTable()
+    await table.ensure_loaded(repo)
+
+    def call():
+        table._entries.clear()
+        table.lookup(_DOMINANT, _SCORES)
+
+    bench.run(f"recommendation_table_build_entry[{size}]", call, number=5 if size >= 10_000 else 20)
+
+
+@pytest.mark.parametrize("size", CATALOG_SIZES)
+async def test_bench_enrich_result_query_fallback(bench, size):
+    """Chemin de repli : requete par traits + scoring a chaque appel."""
+    repo = InMemoryOrientationRepo(synthetic_catalog(size))
+    service = CareerMatcherService(RecommendationTable())
+    repo.get_all_careers = None  # table indisponible -> repli
+
+    async def call():
+        await service.enrich_result(_riasec_result(), repo)
+
+    await bench.run_async(f"enrich_result[query,{size}]", call, number=100)
@@ -26,6 +26,7 @@ from app.core.security import get_current_user_id, get_current_user_id_optional
 class FakeOrientationRepo:
     def __init__(self):
         self.saved = False
+        self.save_count = 0
 
     async def get_test_by_id(self, test_id: UUID):
         return {
@@ -58,6 +59,7 @@ class FakeOrientationRepo:
 
     async def complete_test_session(self, **kwargs):
         self.saved = True
+        self.save_count += 1
         return {"id": str(uuid4())}
 
 
@@ -0,0 +1,99 @@
+"""Tests du cache de réponses AÏDA (premières questions fréquentes)."""
+
+import pytest
+
+from app.core.cache import get_cache
+from app.core.metrics import metrics
+from app.services.llm.answer_cache import AnswerCache, normalize_question
+from app.services.llm.groq_provider import UNAVAILABLE_REPLY
+from app.services.llm.session_manager import MemorySessionStore, SessionManager
+from app.services.llm_service import LLMService
+
+
+class FakeKBRepository:
+    def __init__(self):
+        self.version = 1
+
+    def current_version(self):
+        return self.version
+
+
+class FakeProvider:
+    def __init__(self, reply="Les écoles d'informatique à Lomé sont IPNET et ESGIS."):
+        self.reply = reply
+        self.calls = 0
+
+    async def complete(self, messages):
+        self.calls += 1
+        return self.reply
+
+    async def stream(self, messages):
+        self.calls += 1
+        for word in self.reply.split(" "):
+            yield word + " "
+
+
+@pytest.fixture
+def service():
+    get_cache().delete_pattern("aida:answer:*")
+    metrics.reset()
+    kb = FakeKBRepository()
+    svc = LLMService()
+    svc._provider = FakeProvider()
+    svc._sessions = SessionManager(MemorySessionStore(memory_budget_bytes=1024 * 1024))
+    svc._answer_cache = AnswerCache(kb)
+    svc._build_messages = lambda message, history, context, summary="": [{"role": "user", "content": message}]
+    return svc, kb
+
+
+async def _stream(svc, message, session_id, context=None):
+    events = [e async for e in svc.chat_stream(message, session_id, context)]
+    return "".join(e.get("chunk", "") for e in events)
+
+
+def test_normalize_question_folds_case_accents_and_punctuation():
+    assert normalize_question("  Quelles ÉCOLES d'informatique à Lomé ?? ") == "quelles ecoles d informatique a lome"
+
+
+async def test_first_question_is_served_from_cache(service):
+    svc, _ = service
+
+    first = await _stream(svc, "Quelles écoles d'informatique à Lomé ?", "s1")
+    second = await _stream(svc, "quelles ecoles d'informatique a Lome", "s2")
+
+    assert svc._provider.calls == 1
+    assert second == first
+    assert AnswerCache.hit_rate() == 0.5
+    # La réponse servie depuis le cache entre dans l'historique de la session
+    assert len(svc.get_history("s2")) == 2
+
+
+async def test_follow_up_questions_bypass_cache(service):
+    svc, _ = service
+    await svc.chat("Combien gagne un comptable ?", "s1")
+
+    await svc.chat("Combien gagne un comptable ?", "s1")
+
+    assert svc._provider.calls == 2
+
+
+async def test_cache_is_keyed_on_profile_and_kb_version(service):
+    svc, kb = service
+    question = "Combien gagne un comptable ?"
+
+    await svc.chat(question, "s1", {"profile_code": "RIA"})
+    await svc.chat(question, "s2", {"profile_code": "SEC"})
+    kb.version = 2
+    await svc.chat(question, "s3", {"profile_code": "RIA"})
+
+    assert svc._provider.calls == 3
+
+
+async def test_unavailable_reply_is_not_cached(service):
+    svc, _ = service
+    svc._provider.reply = UNAVAILABLE_REPLY
+
+    await _stream(svc, "Combien gagne un médecin ?", "s1")
+    await _stream(svc, "Combien gagne un médecin ?", "s2")
+
+    assert svc._provider.calls == 2
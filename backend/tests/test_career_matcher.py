@@ -2,8 +2,8 @@
 Tests unitaires pour CareerMatcherService (services/career_matcher.py).
 
 Couvre les branches non-triviales :
-- _normalize_career_trait : EN_TO_FR, CODE_TO_FR, _NO_ACCENT_TO_ACCENT, fallback
-- _extract_education_level : dict, JSON string, invalid string, autre type
+- normalize_career_trait (career_summary.py) : EN_TO_FR, CODE_TO_FR, _NO_ACCENT_TO_ACCENT, fallback
+- extract_education_level (career_summary.py) : dict, JSON string, invalid string, autre type
 - enrich_result : dominant_traits vide (early return)
 - _match_careers : exception repo, tri par match_score, diversification
 - _fetch_school_programs : secteurs vides, exception repo
@@ -28,73 +28,72 @@ if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
 from app.schemas.orientation import TestResult
-from app.services.career_matcher import (
-    CareerMatcherService,
-    _diversify_by_tier,
-    _extract_education_level,
-    _normalize_career_trait,
-    _build_career_summary,
+from app.services.career_matcher import CareerMatcherService, _diversify_by_tier
+from app.services.career_summary import (
+    build_career_summary,
+    extract_education_level,
+    normalize_career_trait,
 )
 
 
 # =============================================================================
-# _normalize_career_trait
+# normalize_career_trait
 # =============================================================================
 
 
 def test_normalize_trait_from_english():
     """'Realistic' (EN) doit etre mappe sur 'Réaliste' (FR accentue)."""
-    assert _normalize_career_trait("Realistic") == "Réaliste"
-    assert _normalize_career_trait("Investigative") == "Investigateur"
+    assert normalize_career_trait("Realistic") == "Réaliste"
+    assert normalize_career_trait("Investigative") == "Investigateur"
 
 
 def test_normalize_trait_from_code():
     """Les codes RIASEC (R, I, A, ...) sont mappes sur leur label FR."""
-    assert _normalize_career_trait("R") == "Réaliste"
-    assert _normalize_career_trait("I") == "Investigateur"
+    assert normalize_career_trait("R") == "Réaliste"
+    assert normalize_career_trait("I") == "Investigateur"
 
 
 def test_normalize_trait_from_unaccented():
     """'Realiste' sans accent est remappe sur 'Réaliste' accentue."""
-    assert _normalize_career_trait("Realiste") == "Réaliste"
+    assert normalize_career_trait("Realiste") == "Réaliste"
 
 
 def test_normalize_trait_fallback_returns_input():
     """Un trait inconnu est retourne tel quel."""
-    assert _normalize_career_trait("Mystique") == "Mystique"
+    assert normalize_career_trait("Mystique") == "Mystique"
 
 
 # =============================================================================
-# _extract_education_level
+# extract_education_level
 # =============================================================================
 
 
 def test_extract_education_from_dict():
-    assert _extract_education_level({"education_path": {"minimum_level": "LICENCE"}}) == "LICENCE"
+    assert extract_education_level({"education_path": {"minimum_level": "LICENCE"}}) == "LICENCE"
 
 
 def test_extract_education_from_dict_without_min():
     """dict sans minimum_level renvoie le defaut BAC."""
-    assert _extract_education_level({"education_path": {}}) == "BAC"
+    assert extract_education_level({"education_path": {}}) == "BAC"
 
 
 def test_extract_education_from_json_string():
-    assert _extract_education_level({"education_path": '{"minimum_level": "MASTER"}'}) == "MASTER"
+    assert extract_education_level({"education_path": '{"minimum_level": "MASTER"}'}) == "MASTER"
 
 
 def test_extract_education_from_invalid_json_string():
     """String non-JSON → fallback BAC."""
-    assert _extract_education_level({"education_path": "not a json"}) == "BAC"
+    assert extract_education_level({"education_path": "not a json"}) == "BAC"
 
 
 def test_extract_education_missing_key():
     """Pas de education_path du tout → BAC."""
-    assert _extract_education_level({}) == "BAC"
+    assert extract_education_level({}) == "BAC"
 
 
 def test_extract_education_other_type():
     """education_path de type inattendu (list) → BAC."""
-    assert _extract_education_level({"education_path": ["LICENCE"]}) == "BAC"
+    assert extract_education_level({"education_path": ["LICENCE"]}) == "BAC"
 
 
 # =============================================================================
@@ -285,16 +284,16 @@ async def test_enrich_result_full_path():
 
 
 # =============================================================================
-# _build_career_summary
+# build_career_summary
 # =============================================================================
 
 
-def test_build_career_summary_minimal():
-    """_build_career_summary construit un CareerSummary avec les defaults."""
+def testbuild_career_summary_minimal():
+    """build_career_summary construit un CareerSummary avec les defaults."""
     career_id = str(uuid4())
     c = {"id": career_id, "name": "Medecin", "sector_name": "Sante"}
 
-    summary = _build_career_summary(c, match_score=75.0, matching_traits=["Investigateur"])
+    summary = build_career_summary(c, match_score=75.0, matching_traits=["Investigateur"])
 
     assert str(summary.id) == career_id
     assert summary.name == "Medecin"
@@ -304,7 +303,7 @@ def test_build_career_summary_minimal():
     assert summary.required_skills == []
 
 
-def test_build_career_summary_truncates_skills():
+def testbuild_career_summary_truncates_skills():
     """required_skills est tronque a 5 elements."""
     c = {
         "id": str(uuid4()),
@@ -312,5 +311,5 @@ def test_build_career_summary_truncates_skills():
         "sector_name": "Tech",
         "required_skills": [f"skill{i}" for i in range(10)],
     }
-    summary = _build_career_summary(c, match_score=50.0, matching_traits=[])
+    summary = build_career_summary(c, match_score=50.0, matching_traits=[])
     assert len(summary.required_skills) == 5
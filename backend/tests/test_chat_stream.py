@@ -0,0 +1,100 @@
+"""Tests du relais SSE du chat : annulation amont à la déconnexion et heartbeats."""
+
+import asyncio
+
+import pytest
+
+from app.api.v1.endpoints import chat as chat_endpoint
+from app.api.v1.endpoints.chat import _relay_until_disconnect
+from app.services.llm import groq_provider, quota_scheduler
+from app.services.llm.groq_provider import GroqProvider
+from app.services.llm.quota_scheduler import QuotaScheduler
+from scripts.llm_stub_server import LLMStubServer
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(chat_endpoint, "DISCONNECT_POLL_SECONDS", 0.01)
+
+
+async def test_disconnect_cancels_source():
+    request = FakeRequest()
+    state = {"cancelled": False}
+
+    async def source():
+        try:
+            yield {"chunk": "Bonjour"}
+            await asyncio.sleep(10)
+            yield {"chunk": "jamais envoyé"}
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    relay = _relay_until_disconnect(request, source())
+    assert await relay.__anext__() == {"chunk": "Bonjour"}
+
+    request.disconnected = True
+    rest = await asyncio.wait_for(_drain(relay), timeout=1.0)
+    assert rest == []
+    assert state["cancelled"]
+
+
+async def test_heartbeat_while_upstream_is_silent(monkeypatch):
+    monkeypatch.setattr(chat_endpoint, "SSE_HEARTBEAT_SECONDS", 0.03)
+
+    async def source():
+        await asyncio.sleep(0.12)
+        yield {"chunk": "Bonjour"}
+        yield {"done": True}
+
+    events = await _drain(_relay_until_disconnect(FakeRequest(), source()))
+    assert None in events
+    assert events[-2:] == [{"chunk": "Bonjour"}, {"done": True}]
+
+
+async def test_source_error_is_propagated():
+    async def source():
+        yield {"chunk": "Bon"}
+        raise RuntimeError("boom")
+
+    relay = _relay_until_disconnect(FakeRequest(), source())
+    assert await relay.__anext__() == {"chunk": "Bon"}
+    with pytest.raises(RuntimeError):
+        await relay.__anext__()
+
+
+async def test_disconnect_closes_upstream_llm_stream(monkeypatch):
+    server = await LLMStubServer(tokens=12, token_ms=40).start()
+    monkeypatch.setattr(groq_provider, "GROQ_API_URL", f"{server.base_url}/openai/v1/chat/completions")
+    monkeypatch.setattr(quota_scheduler, "get_cache", lambda: type("C", (), {"redis": None})())
+    provider = GroqProvider(quota=QuotaScheduler(requests_per_minute=1000))
+    provider._groq_api_key = "stub-key"
+    provider._groq_enabled = True
+    request = FakeRequest()
+
+    async def chat_events():
+        async for chunk in provider.stream([{"role": "user", "content": "Bonjour"}]):
+            yield {"chunk": chunk}
+
+    relay = _relay_until_disconnect(request, chat_events())
+    assert (await relay.__anext__())["chunk"]
+    request.disconnected = True
+    await _drain(relay)
+
+    # Le stub aurait fini d'envoyer en ~0,5s si la connexion était restée ouverte
+    await asyncio.sleep(0.8)
+    assert server.streams_completed == 0
+    await provider.aclose()
+    await server.stop()
+
+
+async def _drain(relay) -> list:
+    return [event async for event in relay]
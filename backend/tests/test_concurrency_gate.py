@@ -0,0 +1,247 @@
+"""Tests du ConcurrencyGate (limite de conversations simultanées) et du 503 du chat."""
+
+import asyncio
+import threading
+from uuid import UUID
+
+import pytest
+
+from app.api.v1.endpoints import chat as chat_endpoint
+from app.core.exceptions import ServiceOverloadedError
+from app.core.metrics import metrics
+from app.core.security import get_current_user_id
+from app.main import app
+from app.services.llm import concurrency_gate as cg
+from app.services.llm.concurrency_gate import ConcurrencyGate
+
+
+class _Cache:
+    def __init__(self, redis):
+        self.redis = redis
+
+
+class BrokenRedis:
+    def __init__(self):
+        self.calls = 0
+
+    def eval(self, *args):
+        self.calls += 1
+        raise ConnectionError("redis down")
+
+    def zrem(self, *args):
+        raise ConnectionError("redis down")
+
+
+@pytest.fixture(autouse=True)
+def memory_only(monkeypatch):
+    monkeypatch.setattr(cg, "get_cache", lambda: _Cache(None))
+    metrics.reset()
+
+
+def _gate(limit: int = 1, waiters: int = 2, timeout: float = 0.5) -> ConcurrencyGate:
+    return ConcurrencyGate(max_per_worker=limit, max_global=10, max_waiters=waiters, queue_timeout=timeout)
+
+
+async def test_queued_request_gets_released_slot():
+    gate = _gate()
+    first = await gate.acquire()
+
+    waiting = asyncio.ensure_future(gate.acquire())
+    await asyncio.sleep(0.01)
+    assert gate.queue_depth == 1
+
+    gate.release(first)
+    second = await asyncio.wait_for(waiting, timeout=0.2)
+    assert gate.in_flight == 1 and gate.queue_depth == 0
+    gate.release(second)
+    assert gate.stats()["queue_wait_seconds"]["count"] == 1
+
+
+async def test_rejects_when_queue_is_full():
+    gate = _gate(waiters=0)
+    await gate.acquire()
+
+    with pytest.raises(ServiceOverloadedError) as exc_info:
+        await gate.acquire()
+    assert exc_info.value.status_code == 503
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+
+
+async def test_rejects_after_queue_timeout():
+    gate = _gate(timeout=0.05)
+    await gate.acquire()
+
+    with pytest.raises(ServiceOverloadedError):
+        await gate.acquire()
+    assert gate.queue_depth == 0
+    assert gate.stats()["rejected"] == 1
+
+
+async def test_queue_is_served_in_arrival_order():
+    gate = _gate(waiters=5)
+    lease = await gate.acquire()
+    order = []
+
+    async def client(name):
+        held = await gate.acquire()
+        order.append(name)
+        gate.release(held)
+
+    tasks = [asyncio.ensure_future(client(i)) for i in range(3)]
+    await asyncio.sleep(0.01)
+    gate.release(lease)
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2]
+
+
+async def test_release_is_idempotent():
+    gate = _gate(limit=2)
+    lease = await gate.acquire()
+    gate.release(lease)
+    gate.release(lease)
+    assert gate.in_flight == 0
+
+
+async def test_redis_failure_keeps_worker_limit(monkeypatch):
+    monkeypatch.setattr(cg, "get_cache", lambda: _Cache(BrokenRedis()))
+    gate = _gate(waiters=0)
+
+    lease = await gate.acquire()
+    with pytest.raises(ServiceOverloadedError):
+        await gate.acquire()
+    gate.release(lease)
+    assert gate.in_flight == 0
+
+
+async def test_global_lease_calls_run_off_the_event_loop(monkeypatch):
+    calls = []
+
+    class ThreadRecordingRedis:
+        def eval(self, *args):
+            calls.append(("eval", threading.current_thread()))
+            return 1
+
+        def zrem(self, *args):
+            calls.append(("zrem", threading.current_thread()))
+
+    monkeypatch.setattr(cg, "get_cache", lambda: _Cache(ThreadRecordingRedis()))
+    gate = _gate()
+
+    gate.release(await gate.acquire())
+    for _ in range(20):
+        if len(calls) == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    assert [name for name, _ in calls] == ["eval", "zrem"]
+    assert all(thread is not threading.main_thread() for _, thread in calls)
+
+
+async def test_redis_outage_backs_off_to_worker_limit(monkeypatch):
+    redis = BrokenRedis()
+    monkeypatch.setattr(cg, "get_cache", lambda: _Cache(redis))
+    gate = _gate(limit=5)
+
+    leases = [await gate.acquire() for _ in range(3)]
+    assert redis.calls == 1
+    for lease in leases:
+        gate.release(lease)
+    assert gate.in_flight == 0
+
+
+async def test_worker_limit_holds_while_global_lease_is_pending(monkeypatch):
+    class SlowRedis:
+        def eval(self, *args):
+            threading.Event().wait(0.05)
+            return 1
+
+        def zrem(self, *args):
+            pass
+
+    monkeypatch.setattr(cg, "get_cache", lambda: _Cache(SlowRedis()))
+    gate = _gate(limit=1, waiters=0)
+
+    results = await asyncio.gather(gate.acquire(), gate.acquire(), return_exceptions=True)
+
+    assert sum(isinstance(r, ServiceOverloadedError) for r in results) == 1
+    assert gate.in_flight == 1
+
+
+async def test_cancelled_acquire_gives_capacity_back(monkeypatch):
+    class BlockingRedis:
+        def __init__(self):
+            self.leases = set()
+            self.removed = []
+            self.unblock = threading.Event()
+
+        def eval(self, script, numkeys, key, now, expires_at, limit, lease, ttl):
+            self.unblock.wait(1)
+            if len(self.leases) >= limit:
+                return 0
+            self.leases.add(lease)
+            return 1
+
+        def zrem(self, key, lease):
+            self.leases.discard(lease)
+            self.removed.append(lease)
+
+    redis = BlockingRedis()
+    monkeypatch.setattr(cg, "get_cache", lambda: _Cache(redis))
+    gate = ConcurrencyGate(max_per_worker=1, max_global=1, max_waiters=0, queue_timeout=0.5)
+
+    pending = asyncio.create_task(gate.acquire())
+    await asyncio.sleep(0.01)
+    assert gate.in_flight == 1
+    pending.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    assert gate.in_flight == 0
+
+    # Le script Redis se termine après l'annulation : le bail posé est retiré
+    redis.unblock.set()
+    for _ in range(100):
+        if redis.removed:
+            break
+        await asyncio.sleep(0.01)
+    assert redis.leases == set()
+
+    gate.release(await gate.acquire())
+
+
+def test_stream_endpoint_returns_503_with_retry_after(client, monkeypatch):
+    gate = _gate(limit=0, waiters=0)
+    monkeypatch.setattr(chat_endpoint, "chat_gate", gate)
+
+    async def _user():
+        return UUID("11111111-1111-1111-1111-111111111111")
+
+    app.dependency_overrides[get_current_user_id] = _user
+    resp = client.post("/api/v1/chat/message/stream", json={"message": "Bonjour"})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert resp.json()["error"] == "service_overloaded"
+
+
+async def test_lease_released_when_client_leaves_before_first_chunk(monkeypatch):
+    from starlette.requests import Request
+
+    gate = _gate()
+    monkeypatch.setattr(chat_endpoint, "chat_gate", gate)
+    response = await chat_endpoint.send_message_stream(
+        chat_endpoint.ChatRequest(message="Bonjour"),
+        Request({"type": "http", "method": "POST", "path": "/", "headers": []}),
+        user_id=UUID("11111111-1111-1111-1111-111111111111"),
+    )
+    assert gate.in_flight == 1
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.sleep(0)  # Point de suspension, comme un vrai serveur ASGI
+
+    # Déconnexion immédiate : le corps de la réponse n'est jamais itéré
+    await response({"type": "http"}, receive, send)
+
+    assert gate.in_flight == 0
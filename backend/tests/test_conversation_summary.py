@@ -0,0 +1,113 @@
+"""Tests du résumé courant des conversations (repli en tâche de fond)."""
+
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.llm.conversation_summary import FOLD_THRESHOLD, KEEP_RECENT, build_summary_messages
+from app.services.llm.groq_provider import UNAVAILABLE_REPLY
+from app.services.llm.llm_metrics import SUMMARY_FOLDS_METRIC
+from app.services.llm.session_manager import MemorySessionStore, SessionManager
+from app.services.llm_service import LLMService
+
+_SUMMARY = "L'élève (profil Social) s'intéresse à la médecine et aux soins infirmiers."
+
+
+class FakeProvider:
+    """Répond immédiatement aux tours de chat ; les résumés attendent `release`."""
+
+    def __init__(self, summary: str = _SUMMARY):
+        self.summary = summary
+        self.release = asyncio.Event()
+        self.prompts: list[list[dict]] = []
+        self.summary_calls = 0
+
+    async def complete(self, messages, mode="complete"):
+        if mode == "summary":
+            self.summary_calls += 1
+            await self.release.wait()
+            return self.summary
+        self.prompts.append(messages)
+        return "Réponse LLM"
+
+    async def stream(self, messages):
+        self.prompts.append(messages)
+        yield "Réponse LLM"
+
+
+@pytest.fixture
+def service():
+    metrics.reset()
+    svc = LLMService()
+    svc._provider = FakeProvider()
+    svc._sessions = SessionManager(MemorySessionStore(memory_budget_bytes=1024 * 1024))
+    yield svc
+    metrics.reset()
+
+
+async def _fill(service, turns: int) -> None:
+    for i in range(turns):
+        await service.chat(f"Question {i} sur les études de santé", "s1")
+
+
+async def test_fold_runs_after_reply_without_blocking(service):
+    await _fill(service, FOLD_THRESHOLD // 2)
+
+    # La réponse est rendue alors que le résumé attend encore le LLM
+    assert service._provider.summary_calls == 0
+    await asyncio.sleep(0)
+    assert service._provider.summary_calls == 1
+    assert len(service.get_history("s1")) == FOLD_THRESHOLD
+
+    service._provider.release.set()
+    await asyncio.gather(*service._folds.values())
+
+    assert len(service.get_history("s1")) == KEEP_RECENT
+    assert service._sessions.get_summary("s1") == _SUMMARY
+    assert metrics.count(SUMMARY_FOLDS_METRIC, outcome="folded") == 1
+
+
+async def test_summary_reaches_next_prompt(service):
+    service._provider.release.set()
+    await _fill(service, FOLD_THRESHOLD // 2)
+    await asyncio.gather(*service._folds.values())
+
+    events = [e async for e in service.chat_stream("Et les écoles à Lomé ?", "s1")]
+
+    assert events[-1] == {"done": True}
+    system_prompt = service._provider.prompts[-1][0]["content"]
+    assert _SUMMARY in system_prompt
+    # Historique réduit aux KEEP_RECENT derniers messages + message courant
+    assert len(service._provider.prompts[-1]) == 1 + KEEP_RECENT + 1
+
+
+async def test_failed_summary_keeps_history(service):
+    service._provider.summary = UNAVAILABLE_REPLY
+    service._provider.release.set()
+    await _fill(service, FOLD_THRESHOLD // 2)
+    await asyncio.gather(*service._folds.values())
+
+    assert len(service.get_history("s1")) == FOLD_THRESHOLD
+    assert service._sessions.get_summary("s1") == ""
+    assert metrics.count(SUMMARY_FOLDS_METRIC, outcome="failed") == 1
+
+
+async def test_aclose_cancels_pending_folds(service):
+    await _fill(service, FOLD_THRESHOLD // 2)
+    await asyncio.sleep(0)
+    task = service._folds["s1"]
+
+    service._provider.aclose = lambda: asyncio.sleep(0)
+    await service.aclose()
+
+    assert task.cancelled()
+    assert len(service.get_history("s1")) == FOLD_THRESHOLD
+
+
+def test_summary_prompt_merges_previous_summary():
+    messages = build_summary_messages("Résumé initial.", [{"role": "user", "content": "Et la pharmacie ?"}])
+
+    assert messages[0]["role"] == "system"
+    assert "Résumé initial." in messages[1]["content"]
+    assert "Élève : Et la pharmacie ?" in messages[1]["content"]
@@ -0,0 +1,182 @@
+"""Tests de GroqProvider (pool, streaming, bascule, couverture) contre le serveur LLM factice."""
+
+import time
+
+import pytest
+
+from app.core.metrics import metrics
+
+from app.services.llm import groq_provider
+from app.services.llm import llm_metrics, quota_scheduler
+from app.services.llm.groq_provider import GroqProvider
+from app.services.llm.quota_scheduler import QuotaScheduler
+from scripts.llm_stub_server import LLMStubServer
+
+_MESSAGES = [{"role": "user", "content": "Bonjour"}]
+
+
+class _NoRedisCache:
+    redis = None
+
+
+@pytest.fixture
+async def stub(monkeypatch):
+    monkeypatch.setattr(quota_scheduler, "get_cache", lambda: _NoRedisCache())
+    server = await LLMStubServer(tokens=5).start()
+    monkeypatch.setattr(groq_provider, "GROQ_API_URL", f"{server.base_url}/openai/v1/chat/completions")
+    yield server
+    await server.stop()
+
+
+def _provider(hedge_deadline: float = 5.0, quota: QuotaScheduler = None) -> GroqProvider:
+    quota = quota or QuotaScheduler(requests_per_minute=1000, tokens_per_minute=1_000_000)
+    provider = GroqProvider(hedge_deadline=hedge_deadline, quota=quota)
+    provider._groq_api_key = "stub-key"
+    provider._groq_enabled = True
+    return provider
+
+
+async def test_stream_reuses_pooled_connection(stub):
+    provider = _provider()
+
+    replies = ["".join([c async for c in provider.stream(_MESSAGES)]) for _ in range(3)]
+    replies.append(await provider.complete(_MESSAGES))
+
+    assert all(r.startswith("Avec ton profil") for r in replies)
+    assert stub.requests == 4
+    assert stub.connections == 1
+    await provider.aclose()
+
+
+async def test_aclose_releases_clients_and_allows_reuse(stub):
+    provider = _provider()
+    await provider.complete(_MESSAGES)
+
+    await provider.aclose()
+    assert provider._groq_client is None
+
+    assert await provider.complete(_MESSAGES)
+    assert stub.connections == 2
+    await provider.aclose()
+
+
+@pytest.fixture
+def ollama_stub(stub, monkeypatch):
+    monkeypatch.setattr(groq_provider, "OLLAMA_BASE_URL", stub.base_url)
+    return stub
+
+
+async def test_ollama_streams_ndjson_chunks(ollama_stub):
+    provider = _provider()
+    provider._groq_enabled = False
+
+    chunks = [c async for c in provider.stream(_MESSAGES)]
+
+    assert len(chunks) == 5
+    assert "".join(chunks).startswith("Avec ton profil")
+    assert ollama_stub.last_payloads["/api/chat"]["stream"] is True
+    await provider.aclose()
+
+
+async def test_groq_failure_mid_stream_continues_on_ollama(ollama_stub):
+    ollama_stub.groq_fail_after = 2
+    provider = _provider()
+
+    chunks = [c async for c in provider.stream(_MESSAGES)]
+
+    # Les 2 tokens Groq déjà envoyés sont conservés, Ollama poursuit
+    assert chunks[:2] == ["Avec ", "ton "]
+    assert len(chunks) == 7
+    sent_to_ollama = ollama_stub.last_payloads["/api/chat"]["messages"]
+    assert sent_to_ollama[-1] == {"role": "assistant", "content": "Avec ton "}
+    await provider.aclose()
+
+
+async def test_stream_ends_with_note_when_no_fallback(stub):
+    stub.groq_fail_after = 2
+    provider = _provider()
+    provider._ollama_health.record(False)
+
+    reply = "".join([c async for c in provider.stream(_MESSAGES)])
+
+    assert reply == "Avec ton " + groq_provider.INTERRUPTED_NOTE
+    assert groq_provider.is_degraded_reply(reply)
+    await provider.aclose()
+
+
+@pytest.fixture
+async def ollama_server(monkeypatch):
+    server = await LLMStubServer(tokens=5).start()
+    monkeypatch.setattr(groq_provider, "OLLAMA_BASE_URL", server.base_url)
+    yield server
+    await server.stop()
+
+
+async def test_stalled_groq_is_hedged_by_ollama(stub, ollama_server):
+    stub.ttft_ms = 2000
+    metrics.reset()
+    provider = _provider(hedge_deadline=0.1)
+
+    started = time.monotonic()
+    reply = "".join([c async for c in provider.stream(_MESSAGES)])
+
+    assert reply.startswith("Avec ton profil")
+    assert time.monotonic() - started < 1.0
+    assert ollama_server.last_payloads["/api/chat"]["stream"] is True
+    assert metrics.count(llm_metrics.REQUESTS_METRIC, provider="ollama", fallback="hedge") == 1
+    await provider.aclose()
+
+
+async def test_groq_first_token_before_deadline_skips_hedge(stub, ollama_server):
+    provider = _provider(hedge_deadline=0.5)
+
+    reply = "".join([c async for c in provider.stream(_MESSAGES)])
+
+    assert reply.startswith("Avec ton profil")
+    assert ollama_server.requests == 0
+    await provider.aclose()
+
+
+async def test_hedge_race_cancels_slower_provider(stub, ollama_server):
+    stub.ttft_ms = 200
+    ollama_server.ttft_ms = 2000
+    metrics.reset()
+    provider = _provider(hedge_deadline=0.05)
+
+    started = time.monotonic()
+    reply = "".join([c async for c in provider.stream(_MESSAGES)])
+
+    assert reply.startswith("Avec ton profil")
+    assert time.monotonic() - started < 1.0
+    assert ollama_server.requests >= 1
+    assert metrics.count(llm_metrics.REQUESTS_METRIC, provider="groq", fallback="none") == 1
+    await provider.aclose()
+
+
+async def test_quota_overflow_routes_straight_to_ollama(stub, ollama_server):
+    metrics.reset()
+    provider = _provider(quota=QuotaScheduler(requests_per_minute=1))
+
+    first = "".join([c async for c in provider.stream(_MESSAGES)])
+    second = "".join([c async for c in provider.stream(_MESSAGES)])
+
+    assert first.startswith("Avec ton profil") and second.startswith("Avec ton profil")
+    assert stub.requests == 1
+    assert ollama_server.requests >= 1
+    assert metrics.count(llm_metrics.REQUESTS_METRIC, provider="ollama", fallback="quota") == 1
+    assert metrics.summary(llm_metrics.TTFT_METRIC, provider="groq")["count"] == 1
+    await provider.aclose()
+
+
+@pytest.mark.parametrize("status", [503, 429])
+async def test_groq_http_error_falls_back_to_ollama(stub, ollama_server, status):
+    stub.error_rate, stub.error_status = 1.0, status
+    metrics.reset()
+    provider = _provider()
+
+    reply = await provider.complete(_MESSAGES)
+
+    assert reply.startswith("Avec ton profil")
+    assert stub.errors == 1 and ollama_server.requests == 1
+    assert metrics.count(llm_metrics.REQUESTS_METRIC, provider="ollama", fallback="groq_error") == 1
+    await provider.aclose()
@@ -0,0 +1,142 @@
+"""Tests du HealthMonitor (disponibilité, sonde de fond) et du routage de GroqProvider."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.llm import groq_provider, llm_metrics, quota_scheduler
+from app.services.llm.groq_provider import GroqProvider
+from app.services.llm.health_monitor import BackendHealth, HealthMonitor
+from app.services.llm.quota_scheduler import QuotaScheduler
+from scripts.llm_stub_server import LLMStubServer
+
+_MESSAGES = [{"role": "user", "content": "Bonjour"}]
+
+
+class _NoRedisCache:
+    redis = None
+
+
+async def _until(condition, timeout: float = 2.0) -> bool:
+    """Attend qu'une condition devienne vraie (sondes de fond, machine lente)."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def test_backend_unavailable_after_threshold_until_success():
+    health = BackendHealth("groq", failure_threshold=3, retry_after=60)
+    assert health.available and health.availability is None
+
+    health.record(False)
+    health.record(False)
+    assert health.available
+    health.record(False)
+    assert not health.available
+
+    health.record(True, latency=0.2)
+    assert health.available
+    assert health.availability == 0.25
+    assert health.latency == pytest.approx(0.2)
+
+
+def test_backend_retried_after_delay():
+    health = BackendHealth("ollama", retry_after=0.05)
+    health.record(False)
+    assert not health.available
+
+    time.sleep(0.06)
+    assert health.available
+
+
+async def test_probe_loop_recovers_after_backend_restart(monkeypatch):
+    server = await LLMStubServer().start()
+    port = server.port
+    monkeypatch.setattr(groq_provider, "OLLAMA_BASE_URL", server.base_url)
+    provider = GroqProvider(health_interval=0.05)
+    provider.start_health_checks()
+    health = provider._ollama_health
+
+    assert await _until(lambda: health.latency is not None)
+    assert health.available
+
+    await server.stop()
+    assert await _until(lambda: not health.available)
+
+    # Redémarrage : la sonde le remet en service sans redémarrer l'API
+    server = await LLMStubServer(port=port).start()
+    assert await _until(lambda: provider.health()["ollama"]["consecutive_failures"] == 0)
+    assert health.available
+
+    await provider.aclose()
+    await server.stop()
+
+
+async def test_monitor_without_probe_does_not_start():
+    monitor = HealthMonitor(interval=0.01)
+    monitor.register("groq")
+    monitor.start()
+    assert monitor._task is None
+    await monitor.stop()
+
+
+@pytest.fixture
+async def servers(monkeypatch):
+    monkeypatch.setattr(quota_scheduler, "get_cache", lambda: _NoRedisCache())
+    groq = await LLMStubServer(tokens=5).start()
+    ollama = await LLMStubServer(tokens=5).start()
+    monkeypatch.setattr(groq_provider, "GROQ_API_URL", f"{groq.base_url}/openai/v1/chat/completions")
+    monkeypatch.setattr(groq_provider, "OLLAMA_BASE_URL", ollama.base_url)
+    yield groq, ollama
+    await groq.stop()
+    await ollama.stop()
+
+
+def _provider() -> GroqProvider:
+    provider = GroqProvider(
+        hedge_deadline=5.0,
+        quota=QuotaScheduler(requests_per_minute=1000, tokens_per_minute=1_000_000),
+    )
+    provider._groq_api_key = "stub-key"
+    provider._groq_enabled = True
+    return provider
+
+
+async def test_failing_groq_is_skipped_until_retry(servers):
+    groq, ollama = servers
+    groq.groq_fail_after = 0
+    metrics.reset()
+    provider = _provider()
+
+    for _ in range(groq_provider.GROQ_FAILURE_THRESHOLD + 1):
+        reply = "".join([c async for c in provider.stream(_MESSAGES)])
+        assert reply.startswith("Avec ton profil")
+
+    # Les appels suivants ne paient plus l'échec Groq
+    assert groq.requests == groq_provider.GROQ_FAILURE_THRESHOLD
+    assert metrics.count(
+        llm_metrics.REQUESTS_METRIC, provider="ollama", fallback=llm_metrics.FALLBACK_GROQ_UNHEALTHY,
+    ) == 1
+    await provider.aclose()
+
+
+async def test_groq_tried_despite_failures_when_ollama_down(servers):
+    groq, ollama = servers
+    groq.groq_fail_after = 0
+    provider = _provider()
+    for _ in range(groq_provider.GROQ_FAILURE_THRESHOLD):
+        provider._groq_health.record(False)
+    provider._ollama_health.record(False)
+
+    groq.groq_fail_after = None
+    reply = "".join([c async for c in provider.stream(_MESSAGES)])
+
+    assert reply.startswith("Avec ton profil")
+    assert groq.requests == 1 and ollama.requests == 0
+    assert provider._groq_health.available
+    await provider.aclose()
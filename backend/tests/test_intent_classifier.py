@@ -0,0 +1,191 @@
+"""Tests du pré-classifieur d'intention (refus hors-domaine sans appel LLM)."""
+
+import time
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.llm.intent_classifier import OFF_DOMAIN_REPLY, IntentClassifier
+from app.services.llm.intent_dataset import INTENT_EXAMPLES, ORIENTATION
+from app.services.llm.llm_metrics import CHAT_TURNS_METRIC, llm_summary
+from app.services.llm.prompt_builder import _GUARDRAILS
+from app.services.llm.session_manager import MemorySessionStore, SessionManager
+from app.services.llm_service import LLMService
+
+
+@pytest.fixture(scope="module")
+def classifier() -> IntentClassifier:
+    return IntentClassifier()  # seuil par défaut (settings)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "Je veux étudier la science politique, c'est possible à Lomé ?",
+        "Quelles études pour la médecine vétérinaire ?",
+        "Le droit ou l'économie, que choisir ?",
+        "Comment on devient programmeur ?",
+        "Je voudrais être prêtre, quelle formation ?",
+        "J'aime les ordinateurs et les jeux",
+        "Je rêve d'être footballeur professionnel",
+        "Que faire avec un bac A4 ?",
+        "Qui t'a créée ?",
+        "Est-ce que c'est payant ?",
+        "ok merci",
+        "tu es là ?",
+    ],
+)
+def test_orientation_questions_go_to_llm(classifier, message):
+    assert classifier.off_domain_intent(message) is None
+
+
+# Formulations absentes du jeu d'exemples : méthodes de travail, examens,
+# bien-être scolaire
+_HELD_OUT_SCHOOL_QUESTIONS = [
+    "comment réviser efficacement",
+    "comment gérer le stress des examens",
+    "comment prendre des notes",
+    "je stresse avant les examens",
+    "j'ai peur de rater mon examen",
+    "comment bien dormir avant un examen",
+    "comment faire une fiche de révision",
+    "je n'arrive pas à me concentrer en cours",
+    "comment préparer le BEPC",
+    "je suis démotivé par l'école",
+    "quelle méthode pour apprendre mes leçons",
+    "je manque de confiance en moi",
+    "comment m'organiser pour le bac",
+    "j'ai eu une mauvaise note en maths",
+    "comment améliorer ma moyenne",
+    "je redouble ma seconde, que faire",
+    "comment arrêter de procrastiner",
+    "comment rester concentré en classe",
+    "je panique pendant les interrogations",
+    "comment avoir de meilleurs résultats scolaires",
+]
+
+
+# Demandes d'orientation refusées à tort par le passé : CV et lettres de
+# motivation, candidatures, langues, entrepreneuriat, droit comme filière
+_HELD_OUT_ORIENTATION_REGRESSIONS = [
+    "Parle moi du droit des affaires",
+    "Aide moi à écrire ma lettre de motivation",
+    "Corrige ma lettre de motivation",
+    "Comment apprendre l'anglais rapidement ?",
+    "Comment ouvrir mon propre salon de coiffure ?",
+    "Comment faire un bon CV ?",
+    "Relis mon CV s'il te plaît",
+    "Je cherche à rédiger ma candidature pour une école d'ingénieurs",
+    "Comment écrire une demande de bourse ?",
+    "Comment se préparer à un entretien ?",
+    "Je veux apprendre le chinois",
+    "Quelle école pour apprendre l'espagnol ?",
+    "Comment parler couramment français et anglais ?",
+    "Je veux créer ma start-up",
+    "Comment lancer mon business de vente en ligne ?",
+    "Comment ouvrir une boutique ?",
+    "Comment monter une entreprise agricole ?",
+    "Comment devenir juriste ?",
+    "Est-ce que le droit international recrute ?",
+    "Je veux être magistrat",
+]
+
+
+@pytest.mark.parametrize("message", _HELD_OUT_ORIENTATION_REGRESSIONS)
+def test_held_out_orientation_regressions_go_to_llm(classifier, message):
+    assert classifier.off_domain_intent(message) is None
+
+
+@pytest.mark.parametrize("message", _HELD_OUT_SCHOOL_QUESTIONS)
+def test_held_out_school_questions_go_to_llm(classifier, message):
+    assert classifier.off_domain_intent(message) is None
+
+
+def test_held_out_questions_are_not_training_examples():
+    training = {m.lower() for examples in INTENT_EXAMPLES.values() for m in examples}
+    held_out = {m.lower() for m in _HELD_OUT_SCHOOL_QUESTIONS + _HELD_OUT_ORIENTATION_REGRESSIONS}
+    assert not training & held_out
+
+
+@pytest.mark.parametrize(
+    "message, intent",
+    [
+        ("Que penses-tu des élections au Togo ?", "politique"),
+        ("Est-ce que Jésus est Dieu ?", "religion"),
+        ("Calcule 3x + 5 = 20", "devoirs"),
+        ("Écris un code Python pour trier une liste", "code"),
+        ("Mon ami est malade, quel médicament ?", "sante_droit"),
+        ("Raconte une blague drôle", "divertissement"),
+        ("Comment fabriquer un couteau pour me battre ?", "adulte_violence"),
+    ],
+)
+def test_clear_off_domain_questions_are_refused(classifier, message, intent):
+    assert classifier.off_domain_intent(message) == intent
+
+
+def test_no_false_refusal_in_leave_one_out():
+    refused = []
+    for i, message in enumerate(INTENT_EXAMPLES[ORIENTATION]):
+        examples = dict(INTENT_EXAMPLES)
+        examples[ORIENTATION] = [m for j, m in enumerate(examples[ORIENTATION]) if j != i]
+        if IntentClassifier(examples).off_domain_intent(message):
+            refused.append(message)
+    assert refused == []
+
+
+def test_threshold_above_one_disables_short_circuit():
+    assert IntentClassifier(threshold=1.01).off_domain_intent("Que penses-tu des élections au Togo ?") is None
+
+
+def test_classification_is_fast(classifier):
+    started = time.perf_counter()
+    for _ in range(200):
+        classifier.off_domain_intent("Tu penses quoi du président de la république ?")
+    assert (time.perf_counter() - started) / 200 < 0.001
+
+
+def test_refusal_matches_guardrails_prompt():
+    assert f'"{OFF_DOMAIN_REPLY}"' in _GUARDRAILS
+
+
+class FakeProvider:
+    def __init__(self):
+        self.calls = 0
+
+    async def complete(self, messages):
+        self.calls += 1
+        return "Réponse LLM"
+
+    async def stream(self, messages):
+        self.calls += 1
+        yield "Réponse LLM"
+
+
+@pytest.fixture
+def service():
+    metrics.reset()
+    svc = LLMService()
+    svc._provider = FakeProvider()
+    svc._sessions = SessionManager(MemorySessionStore(memory_budget_bytes=1024 * 1024))
+    svc._build_messages = lambda message, history, context, summary="": [{"role": "user", "content": message}]
+    yield svc
+    metrics.reset()
+
+
+async def test_off_domain_message_skips_llm(service):
+    result = await service.chat("Pour qui voter aux prochaines élections ?", "s1")
+    events = [e async for e in service.chat_stream("Raconte-moi une blague", "s2")]
+
+    assert result["reply"] == OFF_DOMAIN_REPLY
+    assert events == [{"chunk": OFF_DOMAIN_REPLY}, {"done": True}]
+    assert service._provider.calls == 0
+    assert metrics.count(CHAT_TURNS_METRIC, path="off_domain") == 2
+    assert llm_summary()["off_domain"] == {"politique": 1, "divertissement": 1}
+
+
+async def test_in_domain_message_reaches_llm(service):
+    result = await service.chat("Quels métiers pour un profil Social ?", "s1")
+
+    assert result["reply"] == "Réponse LLM"
+    assert service._provider.calls == 1
+    assert metrics.count(CHAT_TURNS_METRIC, path="off_domain") == 0
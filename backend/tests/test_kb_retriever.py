@@ -0,0 +1,154 @@
+"""Tests de la recherche BM25 dans la base de connaissances AÏDA."""
+
+import asyncio
+import threading
+
+from app.repositories.knowledge_base_repository import _static_entries
+from app.services.llm.kb_retriever import BM25Index, KBRetriever, format_snippets, tokenize
+from app.services.llm.prompt_builder import PromptBuilder
+
+
+class FakeKBRepository:
+    def __init__(self, entries):
+        self.entries = entries
+        self.entries_calls = 0
+        self.content_calls = 0
+        self.version = 1
+
+    def current_version(self):
+        return self.version
+
+    def get_entries(self):
+        self.entries_calls += 1
+        return self.entries
+
+    def get_content(self, category=None):
+        self.content_calls += 1
+        return format_snippets(self.entries)
+
+
+def test_tokenize_folds_accents_and_drops_stopwords():
+    assert tokenize("Les Écoles d'ingénieurs à Lomé") == ["ecole", "ingenieur", "lome"]
+
+
+def test_search_ranks_named_school_first():
+    index = BM25Index(_static_entries())
+
+    results = index.search("frais de scolarité université de Kara", k=3)
+
+    assert results[0][0]["title"] == "Université de Kara"
+    assert results[0][1] > results[-1][1]
+
+
+def test_search_matches_unaccented_query():
+    index = BM25Index(_static_entries())
+
+    results = index.search("salaire infirmier sante", k=1)
+
+    assert results[0][0]["title"] == "SANTÉ"
+
+
+def test_search_without_match_returns_nothing():
+    assert BM25Index(_static_entries()).search("bonjour") == []
+
+
+def test_prompt_contains_only_relevant_snippets():
+    repo = FakeKBRepository(_static_entries())
+    builder = PromptBuilder(repo, KBRetriever(repo, top_k=3))
+
+    full_prompt = PromptBuilder(repo).build()
+    prompt = builder.build(query="Où étudier la cybersécurité ?")
+
+    assert "IPNET Institute" in prompt
+    assert "Notaire" not in prompt
+    assert len(prompt) < len(full_prompt)
+
+
+def test_retriever_builds_index_once():
+    repo = FakeKBRepository(_static_entries())
+    retriever = KBRetriever(repo)
+
+    retriever.retrieve("médecin")
+    retriever.retrieve("avocat")
+    assert repo.entries_calls == 1
+
+    retriever.rebuild()
+    assert repo.entries_calls == 2
+
+
+def test_full_prompt_is_compiled_once_per_kb_version():
+    repo = FakeKBRepository(_static_entries())
+    builder = PromptBuilder(repo)
+
+    first = builder.build()
+    with_context = builder.build({"profile_code": "RIA"})
+    assert repo.content_calls == 1
+    assert with_context.startswith(first)
+    assert "RIA" in with_context
+
+    repo.entries = repo.entries[:2]
+    repo.version = 2
+    assert builder.build() != first
+    assert repo.content_calls == 2
+
+
+def test_retriever_rebuilds_index_on_new_kb_version():
+    repo = FakeKBRepository(_static_entries())
+    retriever = KBRetriever(repo)
+    retriever.retrieve("médecin")
+
+    repo.version = 2
+    retriever.retrieve("médecin")
+
+    assert repo.entries_calls == 2
+
+
+class SlowKBRepository(FakeKBRepository):
+    """Lecture des entrées bloquante, enregistre le thread appelant."""
+
+    def __init__(self, entries):
+        super().__init__(entries)
+        self.release = threading.Event()
+        self.threads: list = []
+
+    def get_entries(self):
+        self.threads.append(threading.current_thread())
+        self.release.wait(1)
+        return super().get_entries()
+
+
+async def test_stale_index_is_served_while_rebuilding_in_background():
+    repo = SlowKBRepository(_static_entries())
+    retriever = KBRetriever(repo)
+    repo.release.set()
+    retriever.rebuild()
+    repo.release.clear()
+
+    repo.entries = repo.entries[:2]
+    repo.version = 2
+    # Index périmé : l'ancien est servi sans attendre, une seule reconstruction part
+    assert retriever.retrieve("médecin")
+    assert retriever.retrieve("avocat") is not None
+    await asyncio.sleep(0.01)
+    assert len(repo.threads) == 2
+
+    repo.release.set()
+    await retriever._refresh
+    assert repo.threads[-1] is not threading.main_thread()
+    assert len(retriever.retrieve("médecin")) <= 2
+    assert repo.entries_calls == 2
+
+
+async def test_first_index_is_built_off_the_event_loop():
+    repo = SlowKBRepository(_static_entries())
+    repo.release.set()
+    retriever = KBRetriever(repo)
+    builder = PromptBuilder(repo, retriever)
+
+    # Pas encore d'index : KB complète, sans construction bloquante sur la boucle
+    assert retriever.retrieve("médecin") is None
+    assert builder.retrieve("médecin") is None
+    await retriever._refresh
+
+    assert retriever.retrieve("médecin")
+    assert repo.threads and threading.main_thread() not in repo.threads
@@ -0,0 +1,221 @@
+"""Tests de la compilation incrémentale de la KB par catégorie."""
+
+import pytest
+
+from app.repositories import knowledge_base_repository as kb_module
+from app.repositories.knowledge_base_repository import KnowledgeBaseRepository, compile_category
+from app.services.llm import kb_retriever as retriever_module
+from app.services.llm.kb_retriever import KBRetriever
+
+
+class FakeQuery:
+    def __init__(self, db):
+        self._db = db
+        self._category = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self._category = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def execute(self):
+        self._db.queries.append(self._category)
+        rows = [r for r in self._db.rows if self._category in (None, r["category"])]
+        return type("Result", (), {"data": sorted(rows, key=lambda r: (r["category"], r["title"]))})
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries: list = []
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+class FakeRedis:
+    """Sous-ensemble des commandes Redis utilisées par le repository."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(k) for k in keys]
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, pattern):
+        return [k for k in list(self.values) if k.startswith(pattern.rstrip("*"))]
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return self.values[key]
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _no_version_throttle(monkeypatch):
+    monkeypatch.setattr(kb_module, "_VERSION_CHECK_INTERVAL", 0)
+
+
+def _rows():
+    return [
+        {"category": "ecoles", "title": "IPNET Institute", "content": "Réseaux, Cybersécurité"},
+        {"category": "ecoles", "title": "ESA", "content": "Management, Finance"},
+        {"category": "metiers", "title": "SANTÉ", "content": "Médecin (300K-1,5M)"},
+    ]
+
+
+def _repository(db, redis=None) -> KnowledgeBaseRepository:
+    repo = KnowledgeBaseRepository()
+    repo._initialized = True
+    repo._supabase = db
+    repo._redis = redis
+    return repo
+
+
+def test_content_keeps_full_kb_format():
+    repo = _repository(FakeSupabase(_rows()))
+
+    assert repo.get_content() == (
+        "\n**ECOLES :**\n\n- ESA : Management, Finance\n- IPNET Institute : Réseaux, Cybersécurité"
+        "\n\n**METIERS :**\n\n- SANTÉ : Médecin (300K-1,5M)"
+    )
+    assert repo.get_content("metiers") == "\n**METIERS :**\n\n- SANTÉ : Médecin (300K-1,5M)"
+    assert [e["title"] for e in repo.get_entries()] == ["ESA", "IPNET Institute", "SANTÉ"]
+
+
+def test_hash_depends_only_on_content():
+    rows = _rows()[:2]
+    assert compile_category("ecoles", rows)["hash"] == compile_category("ecoles", rows[::-1])["hash"]
+    assert compile_category("ecoles", rows)["hash"] != compile_category("ecoles", rows[:1])["hash"]
+
+
+def test_category_invalidation_recompiles_only_that_category():
+    db = FakeSupabase(_rows())
+    repo = _repository(db)
+    repo.get_content()
+    ecoles = repo._categories["ecoles"]
+
+    db.rows[2]["content"] = "Médecin (400K-2M)"
+    repo.invalidate_cache("metiers")
+
+    assert "400K-2M" in repo.get_content()
+    assert db.queries == [None, "metiers"]
+    assert repo._categories["ecoles"] is ecoles
+    assert repo._categories["metiers"]["version"] == 1
+
+
+def test_new_and_emptied_categories():
+    db = FakeSupabase(_rows())
+    repo = _repository(db)
+    repo.get_content()
+
+    db.rows.append({"category": "bourses", "title": "Bourse d'excellence", "content": "Mention TB"})
+    repo.invalidate_cache("bourses")
+    assert [c["category"] for c in repo.get_compiled_categories()] == ["bourses", "ecoles", "metiers"]
+
+    db.rows = [r for r in db.rows if r["category"] != "metiers"]
+    repo.invalidate_cache("metiers")
+    assert [c["category"] for c in repo.get_compiled_categories()] == ["bourses", "ecoles"]
+
+
+def test_expired_reload_reuses_unchanged_categories(monkeypatch):
+    db = FakeSupabase(_rows())
+    repo = _repository(db)
+    content = repo.get_content()
+    metiers = repo._categories["metiers"]
+
+    db.rows[0]["content"] = "Réseaux, Cloud"
+    monkeypatch.setattr(kb_module, "_KB_CACHE_TTL", 0)
+    updated = repo.get_content()
+
+    assert repo._categories["metiers"] is metiers
+    assert "Réseaux, Cloud" in updated and updated != content
+    assert repo.get_content() is repo.get_content()
+
+
+def test_category_invalidation_reaches_other_workers():
+    db, redis = FakeSupabase(_rows()), FakeRedis()
+    worker_a, worker_b = _repository(db, redis), _repository(db, redis)
+    worker_a.get_content()
+    worker_b.get_content()
+    assert db.queries == [None]  # le second worker lit les catégories compilées dans Redis
+
+    db.rows[2]["content"] = "Médecin (400K-2M)"
+    worker_a.invalidate_cache("metiers")
+
+    assert "400K-2M" in worker_b.get_content()
+    assert db.queries == [None, "metiers"]
+    assert "400K-2M" in worker_a.get_content()
+    assert db.queries == [None, "metiers"]
+
+
+def test_static_kb_when_supabase_unavailable():
+    repo = _repository(None)
+    assert repo.get_content() == kb_module._STATIC_KB
+    assert repo.get_entries() == kb_module._static_entries()
+
+
+def test_retriever_retokenizes_only_changed_entries(monkeypatch):
+    db = FakeSupabase(_rows())
+    repo = _repository(db)
+    retriever = KBRetriever(repo)
+    retriever.rebuild()
+
+    calls = []
+    real_entry_terms = retriever_module.entry_terms
+    monkeypatch.setattr(retriever_module, "entry_terms", lambda e: calls.append(e["title"]) or real_entry_terms(e))
+    db.rows[2]["content"] = "Médecin, Pharmacien"
+    repo.invalidate_cache("metiers")
+    retriever.rebuild()
+
+    assert calls == ["SANTÉ"]
+    assert retriever.retrieve("pharmacien")[0]["title"] == "SANTÉ"
+
+
+async def test_admin_refresh_rebuilds_off_the_event_loop(monkeypatch):
+    import threading
+
+    from app.api.v1.endpoints.admin import knowledge_base as endpoint
+
+    threads = []
+    repo, retriever = endpoint.knowledge_base_repository, endpoint.kb_retriever
+    monkeypatch.setattr(repo, "invalidate_cache", lambda category: threads.append(threading.current_thread()))
+    monkeypatch.setattr(retriever, "rebuild", lambda: threads.append(threading.current_thread()) or 3)
+    category = {"category": "metiers", "version": 2, "hash": "abc", "entries": [{}]}
+    monkeypatch.setattr(
+        repo, "get_compiled_categories", lambda: threads.append(threading.current_thread()) or [category]
+    )
+
+    response = await endpoint.refresh_knowledge_base(category="metiers", admin={"user_id": "admin-1"})
+
+    assert response["entries"] == 3
+    assert response["categories"] == [{"category": "metiers", "version": 2, "hash": "abc", "entries": 1}]
+    assert len(threads) == 3 and threading.main_thread() not in threads
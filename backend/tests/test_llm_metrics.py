@@ -0,0 +1,83 @@
+"""Tests des métriques (histogrammes), de l'instrumentation LLM et de l'endpoint admin."""
+
+import os
+
+import pytest
+
+from app.core.metrics import metrics
+from app.core.security import get_current_admin
+from app.main import app
+from app.services.llm import llm_metrics
+from app.services.llm.llm_metrics import LLMCallTrace, llm_summary
+
+_MESSAGES = [{"role": "system", "content": "x" * 350}, {"role": "user", "content": "Bonjour"}]
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_histogram_summary_percentiles():
+    for value in range(1, 101):
+        metrics.observe("latency", value / 100, provider="groq")
+    metrics.observe("latency", 5.0, provider="ollama")
+
+    groq = metrics.summary("latency", provider="groq")
+    assert groq["count"] == 100
+    assert groq["p50"] == pytest.approx(0.50)
+    assert groq["p95"] == pytest.approx(0.95)
+    assert groq["max"] == pytest.approx(1.0)
+    assert metrics.summary("latency")["count"] == 101
+    assert metrics.summary("unknown")["count"] == 0
+
+
+def test_trace_records_provider_latency_and_tokens():
+    trace = LLMCallTrace("stream", _MESSAGES)
+    trace.provider = "ollama"
+    trace.fallback = llm_metrics.FALLBACK_HEDGE
+    trace.first_token()
+    trace.record("Avec ton profil Investigateur")
+
+    assert metrics.count(llm_metrics.REQUESTS_METRIC, provider="ollama", fallback="hedge") == 1
+    assert metrics.summary(llm_metrics.TTFT_METRIC, provider="ollama")["count"] == 1
+    assert metrics.summary(llm_metrics.INPUT_TOKENS_METRIC)["avg"] == 102
+    assert metrics.summary(llm_metrics.OUTPUT_TOKENS_METRIC)["avg"] > 0
+
+
+def test_summary_aggregates_fallback_rate():
+    for provider, fallback in (("groq", None), ("groq", None), ("ollama", "quota"), (None, "groq_error")):
+        trace = LLMCallTrace("complete", _MESSAGES)
+        trace.provider = provider
+        trace.fallback = fallback
+        trace.record("réponse" if provider else "")
+
+    summary = llm_summary()
+    assert summary["requests"] == 4
+    assert summary["providers"]["groq"]["share"] == pytest.approx(0.5)
+    assert summary["fallbacks"] == {"groq_error": 1, "quota": 1}
+    assert summary["fallback_rate"] == pytest.approx(0.5)
+    # Appel sans réponse : compté, sans latence
+    assert summary["providers"]["none"]["duration_seconds"]["count"] == 0
+
+
+def test_admin_llm_metrics_endpoint(client):
+    async def _admin():
+        return {"user_id": "admin", "role": "admin"}
+
+    app.dependency_overrides[get_current_admin] = _admin
+    trace = LLMCallTrace("stream", _MESSAGES)
+    trace.provider = "groq"
+    trace.record("ok")
+
+    resp = client.get("/api/v1/admin/metrics/llm")
+    assert resp.status_code == 200
+    assert resp.json()["providers"]["groq"]["requests"] == 1
+    assert resp.json()["worker"] == {"pid": os.getpid()}
+
+    raw = client.get("/api/v1/admin/metrics").json()
+    assert raw["worker"] == {"pid": os.getpid()}
+    assert llm_metrics.REQUESTS_METRIC in raw["counters"]
+    assert llm_metrics.DURATION_METRIC in raw["histograms"]
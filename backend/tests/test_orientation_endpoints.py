@@ -1,5 +1,12 @@
+import threading
 from uuid import uuid4
 
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.services import submission_dedup as dedup_module
+from app.services.submission_dedup import SubmissionDeduplicator
+
 
 def test_submit_orientation_anonymous_succeeds_without_saving(anon_client):
     """L'endpoint accepte les soumissions anonymes (pas de 401)."""
@@ -31,3 +38,59 @@ def test_submit_orientation_success_with_mocked_dependencies(auth_client):
     assert len(data["dominant_traits"]) > 0
     assert isinstance(data["recommendations"], list)
     assert fake_repo.saved is True
+
+
+def test_submit_orientation_retry_replays_stored_result(auth_client):
+    """Un renvoi identique rejoue le resultat sans recreer de session."""
+    client, fake_repo = auth_client
+    test_id = uuid4()
+    payload = {"responses": {"q1": "5", "q2": "1", "q3": "2"}}
+    url = f"/api/v1/orientation/sessions/{test_id}/submit"
+
+    first = client.post(url, json=payload)
+    second = client.post(url, json=payload)
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.headers.get("Idempotent-Replayed") == "true"
+    assert second.json() == first.json()
+    assert fake_repo.save_count == 1
+
+
+def test_submit_orientation_idempotency_key_reused_with_other_responses(auth_client):
+    """Une meme Idempotency-Key avec d'autres reponses est refusee."""
+    client, fake_repo = auth_client
+    test_id = uuid4()
+    url = f"/api/v1/orientation/sessions/{test_id}/submit"
+    headers = {"Idempotency-Key": str(uuid4())}
+
+    first = client.post(url, json={"responses": {"q1": "5"}}, headers=headers)
+    second = client.post(url, json={"responses": {"q1": "1"}}, headers=headers)
+
+    assert first.status_code == 200
+    assert second.status_code == 422
+    assert fake_repo.save_count == 1
+
+
+async def test_submission_dedup_polls_cache_off_the_event_loop(monkeypatch):
+    """Les appels Redis de begin() (attente d'un essai concurrent) quittent la boucle."""
+    calls = []
+
+    class PendingCache:
+        def add(self, key, value, ttl=None):
+            calls.append(("add", threading.current_thread()))
+            return False
+
+        def get(self, key):
+            calls.append(("get", threading.current_thread()))
+            return "pending" if len(calls) < 4 else {"fingerprint": "other", "result": {}}
+
+    monkeypatch.setattr(dedup_module, "get_cache", lambda: PendingCache())
+    monkeypatch.setattr(dedup_module, "_POLL_INTERVAL_SECONDS", 0)
+    dedup = SubmissionDeduplicator(wait_timeout=5)
+
+    with pytest.raises(ValidationError):
+        await dedup.begin("orientation:submit:k", "fingerprint")
+
+    assert [name for name, _ in calls] == ["add", "get", "add", "get"]
+    assert all(thread is not threading.main_thread() for _, thread in calls)
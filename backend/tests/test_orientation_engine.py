@@ -130,3 +130,50 @@ async def test_calculate_personality_falls_back_to_category_scoring():
     assert result.scores["Linguistique"] == 90.0
     assert result.scores["Logique"] == 60.0
     assert result.dominant_traits[0] == "Linguistique"
+
+
+# ============================================================================
+# Cache d'interpretation RIASEC : parite avec le generateur sans cache
+# ============================================================================
+
+
+def test_riasec_interpretation_cache_matches_generator():
+    import itertools
+    import random
+
+    from app.services.orientation_engine import RIASEC_FR, _INTERPRETATION_CACHE
+
+    engine = OrientationEngine()
+    rng = random.Random(42)
+    labels = list(RIASEC_FR)
+
+    for size in (1, 2, 3):
+        for traits in itertools.permutations(labels, size):
+            for _ in range(5):
+                values = sorted((round(rng.uniform(1, 100), 1) for _ in traits), reverse=True)
+                scores = {label: 0.0 for label in labels}
+                scores.update(zip(traits, values))
+                expected = engine._build_riasec_interpretation(scores, list(traits))
+                assert engine._generate_riasec_interpretation(scores, list(traits)) == expected
+
+    # 156 codes ordonnes x quelques tranches : la cache reste bornee
+    assert 0 < len(_INTERPRETATION_CACHE) <= 156 * 5
+
+
+def test_riasec_interpretation_cache_returns_independent_copies():
+    engine = OrientationEngine()
+    scores = {"Réaliste": 90.0, "Investigateur": 70.0, "Artistique": 40.0}
+    traits = ["Réaliste", "Investigateur", "Artistique"]
+
+    first = engine._generate_riasec_interpretation(scores, traits)
+    first["strengths"].append("Modifie")
+    second = engine._generate_riasec_interpretation(scores, traits)
+
+    assert "Modifie" not in second["strengths"]
+
+
+def test_riasec_interpretation_without_dominant_traits():
+    engine = OrientationEngine()
+    interpretation = engine._generate_riasec_interpretation({}, [])
+    assert interpretation == engine._build_riasec_interpretation({}, [])
+    assert interpretation["strengths"] == []
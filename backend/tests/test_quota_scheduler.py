@@ -0,0 +1,137 @@
+"""Tests du QuotaScheduler (seaux à jetons Groq, en-têtes de limite, priorité)."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.llm import quota_scheduler as qs
+from app.services.llm.quota_scheduler import QuotaScheduler, parse_duration
+
+
+class _Cache:
+    def __init__(self, redis):
+        self.redis = redis
+
+
+class BrokenRedis:
+    def __init__(self):
+        self.calls = 0
+
+    def eval(self, *args):
+        self.calls += 1
+        raise ConnectionError("redis down")
+
+    def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+
+@pytest.fixture(autouse=True)
+def memory_only(monkeypatch):
+    monkeypatch.setattr(qs, "get_cache", lambda: _Cache(None))
+    metrics.reset()
+
+
+def _scheduler(rpm: int = 1000, rpd: int = 100_000, tpm: int = 1_000_000) -> QuotaScheduler:
+    return QuotaScheduler(requests_per_minute=rpm, requests_per_day=rpd, tokens_per_minute=tpm)
+
+
+def test_parse_duration():
+    assert parse_duration("7.66s") == pytest.approx(7.66)
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("1h2m") == pytest.approx(3720)
+    assert parse_duration("250ms") == pytest.approx(0.25)
+    assert parse_duration("12") == 12
+    assert parse_duration("") is None
+    assert parse_duration("bientôt") is None
+
+
+async def test_request_bucket_overflows_to_fallback():
+    scheduler = _scheduler(rpm=2)
+
+    assert await scheduler.acquire(10)
+    assert await scheduler.acquire(10)
+    assert not await scheduler.acquire(10)
+    assert metrics.count(qs.QUOTA_METRIC, outcome="overflow") == 1
+
+
+async def test_token_bucket_limits_large_prompts():
+    scheduler = _scheduler(tpm=1000)
+
+    assert await scheduler.acquire(800)
+    assert not await scheduler.acquire(800)
+    assert await scheduler.acquire(150)
+
+
+async def test_retry_after_blocks_calls():
+    scheduler = _scheduler()
+    scheduler.observe(429, {"retry-after": "30"})
+
+    assert not await scheduler.acquire(10)
+
+
+async def test_exhausted_remaining_header_blocks_until_reset():
+    scheduler = _scheduler()
+    scheduler.observe(200, {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2m0s"})
+    assert not await scheduler.acquire(10)
+
+    # Remise à zéro proche : la requête patiente au lieu de déborder
+    scheduler = _scheduler()
+    scheduler.observe(200, {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "0.1s"})
+    started = time.monotonic()
+    assert await scheduler.acquire(10)
+    assert time.monotonic() - started >= 0.09
+
+
+async def test_continuing_conversation_has_priority(monkeypatch):
+    monkeypatch.setattr(qs, "MAX_WAIT_NEW", 0.3)
+    scheduler = _scheduler(tpm=600)  # 10 tokens/s
+    assert await scheduler.acquire(600)
+
+    # La conversation en cours attend ~0,5s son créneau ; la nouvelle lui cède la place
+    continuing, new = await asyncio.gather(
+        scheduler.acquire(5, continuing=True),
+        scheduler.acquire(1),
+    )
+
+    assert continuing is True
+    assert new is False
+
+
+async def test_redis_failure_falls_back_to_memory(monkeypatch):
+    monkeypatch.setattr(qs, "get_cache", lambda: _Cache(BrokenRedis()))
+    scheduler = _scheduler(rpm=1)
+
+    assert await scheduler.acquire(10)
+    assert not await scheduler.acquire(10)
+
+
+async def test_redis_script_runs_off_the_event_loop(monkeypatch):
+    threads = []
+
+    class ThreadRecordingRedis:
+        def eval(self, *args):
+            threads.append(threading.current_thread())
+            return "0"
+
+    monkeypatch.setattr(qs, "get_cache", lambda: _Cache(ThreadRecordingRedis()))
+
+    assert await _scheduler().acquire(10)
+    assert threads and threads[0] is not threading.main_thread()
+
+
+async def test_redis_outage_backs_off_to_memory(monkeypatch):
+    redis = BrokenRedis()
+    monkeypatch.setattr(qs, "get_cache", lambda: _Cache(redis))
+    scheduler = _scheduler()
+
+    for _ in range(3):
+        assert await scheduler.acquire(10)
+    assert redis.calls == 1
+
+    # Délai écoulé : Redis est retenté
+    scheduler._redis_retry_at = 0.0
+    assert await scheduler.acquire(10)
+    assert redis.calls == 2
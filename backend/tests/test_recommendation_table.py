@@ -0,0 +1,245 @@
+"""
+Tests unitaires pour RecommendationTable (services/recommendation_table.py).
+
+Couvre :
+- profile_code / score_bucket
+- lookup : chargement, matérialisation, réutilisation de l'entrée
+- upsert_career / remove_career : invalidation incrémentale par code
+- version partagée : incrément atomique (INCR) entre workers
+- CareerMatcherService : lecture via la table et repli sur la requête par traits
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core import cache as cache_module
+from app.schemas.orientation import TestResult
+from app.services.career_matcher import CareerMatcherService
+from app.services.recommendation_table import (
+    _VERSION_CACHE_KEY,
+    RecommendationTable,
+    profile_code,
+    score_bucket,
+)
+
+
+def _career(name: str, traits: list[str], **extra) -> dict:
+    return {
+        "id": str(uuid4()),
+        "name": name,
+        "sector_name": "Tech",
+        "related_traits": traits,
+        "education_path": {"minimum_level": "BAC"},
+        **extra,
+    }
+
+
+def _repo(careers: list[dict]) -> MagicMock:
+    repo = MagicMock()
+    repo.get_all_careers = AsyncMock(return_value=careers)
+    repo.get_careers_by_traits = AsyncMock(return_value=[])
+    return repo
+
+
+# =============================================================================
+# Clés de table
+# =============================================================================
+
+
+def test_profile_code_from_french_and_english_labels():
+    assert profile_code(["Investigateur", "Artistique", "Social"]) == "IAS"
+    assert profile_code(["Realistic", "Conventional"]) == "RC"
+
+
+def test_profile_code_none_for_non_riasec_traits():
+    assert profile_code(["Extraversion", "Sensation"]) is None
+    assert profile_code([]) is None
+
+
+def test_score_bucket_groups_close_scores():
+    traits = ["Réaliste", "Investigateur"]
+    assert score_bucket(traits, {"Réaliste": 81.0, "Investigateur": 59.0}) == \
+        score_bucket(traits, {"Réaliste": 79.0, "Investigateur": 61.0})
+    assert score_bucket(traits, None) == ()
+
+
+# =============================================================================
+# lookup
+# =============================================================================
+
+
+@pytest.mark.asyncio
+async def test_lookup_ranks_candidates_by_match_score():
+    table = RecommendationTable()
+    repo = _repo([
+        _career("Ingenieur", ["R", "I"]),
+        _career("Technicien", ["Realistic"]),
+        _career("Designer", ["Artistique"]),
+    ])
+
+    assert await table.ensure_loaded(repo)
+    ranked = table.lookup(["Réaliste", "Investigateur"], {"Réaliste": 90.0, "Investigateur": 80.0})
+
+    assert [c.name for c in ranked] == ["Ingenieur", "Technicien"]
+    assert ranked[0].matching_traits == ["Réaliste", "Investigateur"]
+    assert ranked[0].match_score > ranked[1].match_score
+
+
+@pytest.mark.asyncio
+async def test_lookup_reuses_materialised_entry():
+    table = RecommendationTable()
+    await table.ensure_loaded(_repo([_career("Ingenieur", ["R"])]))
+
+    first = table.lookup(["Réaliste"], {"Réaliste": 80.0})
+    second = table.lookup(["Réaliste"], {"Réaliste": 81.0})
+
+    assert first is second
+
+
+def test_lookup_returns_none_when_not_loaded():
+    assert RecommendationTable().lookup(["Réaliste"], {"Réaliste": 80.0}) is None
+
+
+@pytest.mark.asyncio
+async def test_ensure_loaded_false_when_repo_fails():
+    table = RecommendationTable()
+    repo = MagicMock()
+    repo.get_all_careers = AsyncMock(side_effect=Exception("DB down"))
+
+    assert await table.ensure_loaded(repo) is False
+    # Pas de nouvelle tentative immédiate
+    assert await table.ensure_loaded(repo) is False
+    repo.get_all_careers.assert_called_once()
+
+
+# =============================================================================
+# Mises à jour incrémentales
+# =============================================================================
+
+
+@pytest.mark.asyncio
+async def test_upsert_career_invalidates_only_touched_codes():
+    table = RecommendationTable()
+    career = _career("Designer", ["A"])
+    await table.ensure_loaded(_repo([career, _career("Comptable", ["C"])]))
+
+    artistic = table.lookup(["Artistique"])
+    conventional = table.lookup(["Conventionnel"])
+
+    # L'admin deplace la carriere de A vers S
+    table.upsert_career({**career, "related_traits": ["S"]})
+
+    assert table.lookup(["Conventionnel"]) is conventional
+    assert table.lookup(["Artistique"]) is not artistic
+    assert table.lookup(["Artistique"]) == []
+    assert [c.name for c in table.lookup(["Social"])] == ["Designer"]
+
+
+@pytest.mark.asyncio
+async def test_upsert_inactive_career_removes_it():
+    table = RecommendationTable()
+    career = _career("Designer", ["A"])
+    await table.ensure_loaded(_repo([career]))
+
+    table.upsert_career({**career, "is_active": False})
+
+    assert table.lookup(["Artistique"]) == []
+
+
+@pytest.mark.asyncio
+async def test_remove_career():
+    table = RecommendationTable()
+    career = _career("Designer", ["A"])
+    await table.ensure_loaded(_repo([career]))
+    assert len(table.lookup(["Artistique"])) == 1
+
+    table.remove_career(career["id"])
+
+    assert table.lookup(["Artistique"]) == []
+
+
+class FakeRedisPipeline:
+    """Pipeline INCR + EXPIRE exécuté contre un dict."""
+
+    def __init__(self, values: dict):
+        self._values = values
+        self._ops: list = []
+
+    def incr(self, key):
+        self._ops.append(key)
+
+    def expire(self, key, ttl):
+        self._ops.append(None)
+
+    def execute(self):
+        results = []
+        for key in self._ops:
+            if key is None:
+                results.append(True)
+            else:
+                self._values[key] = str(int(self._values.get(key, 0)) + 1)
+                results.append(int(self._values[key]))
+        return results
+
+
+def test_concurrent_publishes_get_distinct_versions(monkeypatch):
+    values: dict = {}
+    redis = MagicMock()
+    redis.pipeline.side_effect = lambda: FakeRedisPipeline(values)
+    redis.get.side_effect = values.get
+    client = cache_module.CacheClient()
+    client._redis = redis
+    monkeypatch.setattr("app.services.recommendation_table.get_cache", lambda: client)
+
+    # Deux workers lisent la même version avant de publier : INCR les départage
+    worker_a, worker_b = RecommendationTable(), RecommendationTable()
+    assert worker_a._read_shared_version() is None
+    assert [worker_a._publish_version(), worker_b._publish_version()] == [1, 2]
+    assert worker_a._read_shared_version() == 2
+    assert values[_VERSION_CACHE_KEY] == "2"
+
+
+def test_memory_fallback_increments_version():
+    client = cache_module.CacheClient()
+    client._get_redis = lambda: None
+
+    assert [client.incr("k", ttl=60), client.incr("k", ttl=60)] == [1, 2]
+    assert client.get("k") == 2
+
+
+# =============================================================================
+# CareerMatcherService + table
+# =============================================================================
+
+
+@pytest.mark.asyncio
+async def test_match_careers_reads_from_table():
+    service = CareerMatcherService(RecommendationTable())
+    repo = _repo([_career(f"Career {i}", ["R", "I"]) for i in range(10)])
+    result = TestResult(
+        test_id=uuid4(),
+        scores={"Réaliste": 90.0, "Investigateur": 85.0},
+        dominant_traits=["Réaliste", "Investigateur"],
+    )
+
+    out = await service._match_careers(result, repo)
+
+    assert len(out) == 6
+    repo.get_careers_by_traits.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_match_careers_falls_back_for_non_riasec_profiles():
+    service = CareerMatcherService(RecommendationTable())
+    repo = _repo([_career("Ingenieur", ["R"])])
+    result = TestResult(
+        test_id=uuid4(),
+        scores={"Extraversion": 70.0},
+        dominant_traits=["Extraversion"],
+    )
+
+    await service._match_careers(result, repo)
+
+    repo.get_careers_by_traits.assert_called_once()
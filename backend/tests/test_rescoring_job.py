@@ -0,0 +1,157 @@
+"""
+Tests unitaires pour RescoringJob (services/rescoring_job.py).
+
+Couvre :
+- parcours par pages (keyset) et ecriture en lot
+- mode dry-run (aucune ecriture, point de reprise intact)
+- reprise depuis le point de reprise
+- sessions ignorees (reponses vides, test introuvable)
+- format des recommandations identique a celui de la soumission
+"""
+
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.core.exceptions import TestNotFoundError
+from app.repositories.orientation_repository import OrientationRepository
+from app.schemas.orientation import TestResult
+from app.services.career_matcher import CareerMatcherService
+from app.services.recommendation_table import RecommendationTable
+from app.services.rescoring_job import FileCheckpoint, RescoringJob
+
+TEST_ID = str(uuid4())
+
+
+class FakeRescoringRepo:
+    def __init__(self, sessions: list[dict]):
+        self.sessions = sorted(sessions, key=lambda s: s["id"])
+        self.pages: list[tuple] = []
+        self.written: list[dict] = []
+
+    async def fetch_completed_sessions_after(self, after_id, limit=200):
+        self.pages.append((after_id, limit))
+        remaining = [s for s in self.sessions if after_id is None or s["id"] > after_id]
+        return remaining[:limit]
+
+    async def get_test_by_id(self, test_id):
+        if test_id != TEST_ID:
+            raise TestNotFoundError(str(test_id))
+        return {
+            "id": TEST_ID,
+            "type": "riasec",
+            "questions": [{"id": "q1", "category": "R"}, {"id": "q2", "category": "I"}],
+        }
+
+    async def get_all_careers(self, sector=None, limit=None):
+        return [{"id": str(uuid4()), "name": "Ingenieur", "sector_name": "Tech", "related_traits": ["R"]}]
+
+    async def bulk_write_test_results(self, rows):
+        self.written.extend(rows)
+        return len(rows)
+
+
+def _job(repo, checkpoint, **kwargs) -> RescoringJob:
+    return RescoringJob(repo, checkpoint, matcher=CareerMatcherService(RecommendationTable()), **kwargs)
+
+
+def _session(i: int, responses=None, test_id: str = TEST_ID) -> dict:
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "user_id": str(uuid4()),
+        "test_id": test_id,
+        "responses": {"q1": "5", "q2": "3"} if responses is None else responses,
+    }
+
+
+@pytest.mark.asyncio
+async def test_rescoring_walks_all_pages_and_writes_results(tmp_path):
+    repo = FakeRescoringRepo([_session(i) for i in range(5)])
+    job = _job(repo, FileCheckpoint(tmp_path / "cp.json"), batch_size=2)
+
+    state = await job.run()
+
+    assert state["status"] == "completed"
+    assert state["processed"] == 5
+    assert state["written"] == 5
+    assert [p[0] for p in repo.pages] == [
+        None,
+        "00000000-0000-0000-0000-000000000001",
+        "00000000-0000-0000-0000-000000000003",
+        "00000000-0000-0000-0000-000000000004",
+    ]
+    row = repo.written[0]
+    assert row["dominant_traits"][0] == "Réaliste"
+    assert row["scores"]["Réaliste"] == 100.0
+    assert row["recommendations"] == [str(UUID(r)) for r in row["recommendations"]]
+    assert len(row["recommendations"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_rescoring_dry_run_does_not_write(tmp_path):
+    checkpoint = FileCheckpoint(tmp_path / "cp.json")
+    repo = FakeRescoringRepo([_session(i) for i in range(3)])
+
+    state = await _job(repo, checkpoint, dry_run=True).run()
+
+    assert state["processed"] == 3
+    assert state["written"] == 0
+    assert repo.written == []
+    assert checkpoint.load() is None
+
+
+@pytest.mark.asyncio
+async def test_rescoring_resumes_from_checkpoint(tmp_path):
+    checkpoint = FileCheckpoint(tmp_path / "cp.json")
+    repo = FakeRescoringRepo([_session(i) for i in range(6)])
+
+    first = await _job(repo, checkpoint, batch_size=2).run(max_sessions=4)
+    assert first["status"] == "paused"
+    assert checkpoint.load()["last_session_id"] == "00000000-0000-0000-0000-000000000003"
+
+    second = await _job(repo, checkpoint, batch_size=2).run()
+
+    assert second["status"] == "completed"
+    assert second["processed"] == 6
+    assert len({r["session_id"] for r in repo.written}) == 6
+
+
+@pytest.mark.asyncio
+async def test_rescoring_skips_empty_responses_and_unknown_tests(tmp_path):
+    repo = FakeRescoringRepo([
+        _session(1),
+        _session(2, responses={}),
+        _session(3, test_id=str(uuid4())),
+    ])
+
+    state = await _job(repo, FileCheckpoint(tmp_path / "cp.json")).run()
+
+    assert state["processed"] == 3
+    assert state["written"] == 1
+    assert state["skipped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rescoring_and_submission_store_same_recommendation_format(tmp_path):
+    repo = FakeRescoringRepo([_session(0)])
+    await _job(repo, FileCheckpoint(tmp_path / "cp.json")).run()
+    rescored = repo.written[0]
+
+    # Soumission : complete_test_session avec le meme resultat enrichi
+    result = TestResult(
+        test_id=UUID(TEST_ID),
+        scores=rescored["scores"],
+        dominant_traits=rescored["dominant_traits"],
+        interpretation={},
+    )
+    await CareerMatcherService(RecommendationTable()).enrich_result(result, repo, with_programs=False)
+    db = MagicMock()
+    db.insert.side_effect = lambda table, data: [data]
+    submission_repo = OrientationRepository.__new__(OrientationRepository)
+    submission_repo._db = db
+
+    saved = await submission_repo.complete_test_session(uuid4(), uuid4(), UUID(TEST_ID), {"q1": "5"}, result)
+
+    assert saved["recommendations"] == [str(r.id) for r in result.recommendations]
+    assert len(saved["recommendations"]) == len(rescored["recommendations"]) == 1
@@ -164,7 +164,7 @@ class TestSchoolAdminSecurity:
         mock_creds = MagicMock()
         mock_creds.credentials = "fake_token"
 
-        with patch("app.core.security.get_user_from_token") as mock_token:
+        with patch("app.core.security.get_user_from_token_async", new_callable=AsyncMock) as mock_token:
             mock_token.return_value = {
                 "user_id": str(uuid4()),
                 "email": "student@test.com",
@@ -191,7 +191,7 @@ class TestSchoolAdminSecurity:
         mock_creds = MagicMock()
         mock_creds.credentials = "fake_token"
 
-        with patch("app.core.security.get_user_from_token") as mock_token:
+        with patch("app.core.security.get_user_from_token_async", new_callable=AsyncMock) as mock_token:
             mock_token.return_value = {
                 "user_id": str(uuid4()),
                 "email": "admin@test.com",
@@ -219,7 +219,7 @@ class TestSchoolAdminSecurity:
         mock_creds = MagicMock()
         mock_creds.credentials = "fake_token"
 
-        with patch("app.core.security.get_user_from_token") as mock_token:
+        with patch("app.core.security.get_user_from_token_async", new_callable=AsyncMock) as mock_token:
             mock_token.return_value = {
                 "user_id": user_id,
                 "email": "school@test.com",
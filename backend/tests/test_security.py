@@ -137,3 +137,183 @@ def test_get_user_from_token_expired():
 
         with pytest.raises(TokenExpiredError):
             _validate_token_via_supabase("expired_token")
+
+
+# =============================================================================
+# VALIDATION LOCALE (JWKS) ET CACHE DES REJETS
+# =============================================================================
+
+_USER_ID = "22222222-2222-2222-2222-222222222222"
+
+
+def _es256_key_pair(kid: str = "key-1"):
+    """Cle privee PEM et cle publique JWK (format Supabase JWKS)."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from jose import jwk
+
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    public_jwk = {**jwk.construct(public_pem, "ES256").to_dict(), "kid": kid}
+    return private_pem, public_jwk
+
+
+def _sign(private_pem, kid: str = "key-1", expires_in: int = 300) -> str:
+    import time
+    from jose import jwt as jose_jwt
+
+    claims = {"sub": _USER_ID, "aud": "authenticated", "exp": int(time.time()) + expires_in}
+    return jose_jwt.encode(claims, private_pem, algorithm="ES256", headers={"kid": kid})
+
+
+def _jwks_transport(keys, calls):
+    import httpx
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(200, json={"keys": keys})
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def jwks(monkeypatch):
+    """Cache JWKS de test, branche sur un faux endpoint Supabase."""
+    from app.core import security
+    from app.core.cache import get_cache
+    from app.core.jwks import JWKSCache
+
+    get_cache().clear()
+    private_pem, public_jwk = _es256_key_pair()
+    calls = []
+    cache = JWKSCache(url="https://auth.test/jwks.json", transport=_jwks_transport([public_jwk], calls))
+    monkeypatch.setattr(security, "jwks_cache", cache)
+    monkeypatch.setattr(security.settings, "SUPABASE_JWT_SECRET", None)
+    yield cache, private_pem, calls
+    get_cache().clear()
+
+
+async def test_es256_token_validated_without_network(jwks):
+    """Token signe par une cle du JWKS : aucun appel a l'API Supabase Auth."""
+    from app.core.security import get_user_from_token_async
+
+    cache, private_pem, _ = jwks
+    assert await cache.refresh()
+
+    with patch("app.db.supabase_client.get_supabase_client") as mock_db_factory:
+        user = await get_user_from_token_async(_sign(private_pem))
+
+    assert user["user_id"] == _USER_ID
+    mock_db_factory.assert_not_called()
+
+
+async def test_unknown_kid_falls_back_to_api_and_refreshes_keys(jwks):
+    """Kid inconnu (rotation) : API Supabase hors event loop, puis JWKS rafraichi."""
+    import asyncio
+    from app.core.security import get_user_from_token_async
+
+    cache, private_pem, calls = jwks
+    fake_response = MagicMock()
+    fake_response.user.id = _USER_ID
+
+    with patch("app.db.supabase_client.get_supabase_client") as mock_db_factory:
+        mock_db_factory.return_value.client.auth.get_user.return_value = fake_response
+        user = await get_user_from_token_async(_sign(private_pem))
+        await asyncio.sleep(0.05)
+
+    assert user["user_id"] == _USER_ID
+    assert len(calls) == 1
+    assert cache.get_key("key-1") is not None
+
+
+async def test_forged_token_rejected_and_cached(jwks):
+    """Signature invalide : rejet local, puis rejet depuis le cache sans reverification."""
+    from app.core import security
+    from app.core.exceptions import InvalidTokenError
+
+    cache, _, _ = jwks
+    await cache.refresh()
+    other_private_pem, _ = _es256_key_pair()
+    forged = _sign(other_private_pem)
+
+    with pytest.raises(InvalidTokenError):
+        await security.get_user_from_token_async(forged)
+
+    with patch.object(security, "_validate_token_locally") as mock_validate:
+        with pytest.raises(InvalidTokenError):
+            await security.get_user_from_token_async(forged)
+    mock_validate.assert_not_called()
+
+
+def test_hs256_signature_mismatch_falls_back_to_api(monkeypatch):
+    """Secret HS256 errone ou renouvele : l'API Supabase tranche, rien n'est rejete en cache."""
+    import time
+    from jose import jwt as jose_jwt
+    from app.core import security
+
+    security.get_cache().clear()
+    monkeypatch.setattr(security.settings, "SUPABASE_JWT_SECRET", "ancien-secret")
+    claims = {"sub": _USER_ID, "aud": "authenticated", "exp": int(time.time()) + 300}
+    token = jose_jwt.encode(claims, "nouveau-secret", algorithm="HS256")
+    fake_response = MagicMock()
+    fake_response.user.id = _USER_ID
+
+    with patch("app.db.supabase_client.get_supabase_client") as mock_db_factory:
+        mock_db_factory.return_value.client.auth.get_user.return_value = fake_response
+        user = security.get_user_from_token(token)
+
+    assert user["user_id"] == _USER_ID
+    mock_db_factory.return_value.client.auth.get_user.assert_called_once_with(token)
+    assert security.get_cache().get(security._rejected_token_cache_key(token)) is None
+    security.get_cache().clear()
+
+
+async def test_expired_token_rejection_is_cached(jwks):
+    """Un token expire reste refuse comme expire, sans reverification."""
+    from app.core import security
+    from app.core.exceptions import TokenExpiredError
+
+    cache, private_pem, _ = jwks
+    await cache.refresh()
+    expired = _sign(private_pem, expires_in=-60)
+
+    for _ in range(2):
+        with pytest.raises(TokenExpiredError):
+            await security.get_user_from_token_async(expired)
+    assert security.get_cache().get(security._rejected_token_cache_key(expired)) == {"reason": "expired"}
+
+
+def test_api_outage_is_not_cached_as_rejection(jwks):
+    """Une panne de l'API Supabase ne doit pas bloquer le token ensuite."""
+    from app.core import security
+    from app.core.exceptions import InvalidTokenError
+
+    _, private_pem, _ = jwks
+    token = _sign(private_pem)  # kid pas encore connu : validation par l'API
+
+    with patch("app.db.supabase_client.get_supabase_client") as mock_db_factory:
+        mock_db_factory.return_value.client.auth.get_user.side_effect = ConnectionError("timeout")
+        with pytest.raises(InvalidTokenError):
+            security.get_user_from_token(token)
+
+    assert security.get_cache().get(security._rejected_token_cache_key(token)) is None
+
+
+async def test_jwks_refresh_failure_keeps_previous_keys(jwks):
+    """Endpoint JWKS en erreur : les cles deja connues restent utilisables."""
+    import httpx
+
+    cache, _, _ = jwks
+    await cache.refresh()
+    cache._transport = httpx.MockTransport(lambda request: httpx.Response(503))
+
+    assert not await cache.refresh()
+    assert cache.get_key("key-1") is not None
@@ -0,0 +1,229 @@
+"""Tests du SessionManager et des stores de sessions AÏDA."""
+
+import pytest
+from redis.exceptions import WatchError
+
+from app.services.llm import session_manager as sm
+from app.services.llm.session_manager import (
+    MAX_HISTORY,
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionManager,
+)
+
+
+class FakeRedis:
+    """Sous-ensemble des commandes Redis utilisées par le store."""
+
+    def __init__(self):
+        self.lists: dict[str, list[str]] = {}
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def lrange(self, key, start, end):
+        self._check()
+        return list(self.lists.get(key, []))
+
+    def get(self, key):
+        self._check()
+        return self.values.get(key)
+
+    def delete(self, *keys):
+        self._check()
+        for key in keys:
+            self.lists.pop(key, None)
+            self.values.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._ops = []
+        self._watched: dict[str, list[str]] = {}
+
+    def watch(self, key):
+        self._watched[key] = list(self._redis.lists.get(key, []))
+
+    def unwatch(self):
+        self._watched = {}
+
+    def multi(self):
+        pass
+
+    def reset(self):
+        self._ops = []
+        self._watched = {}
+
+    def lrange(self, key, start, end):
+        return self._redis.lists.get(key, [])[start:end + 1]
+
+    def set(self, key, value, ex=None):
+        self._ops.append(lambda: self._redis.values.__setitem__(key, value))
+
+    def rpush(self, key, *values):
+        self._ops.append(lambda: self._redis.lists.setdefault(key, []).extend(values))
+
+    def ltrim(self, key, start, end):
+        self._ops.append(lambda: self._redis.lists.__setitem__(key, self._redis.lists[key][start:]))
+
+    def expire(self, key, ttl):
+        self._ops.append(lambda: self._redis.ttls.__setitem__(key, ttl))
+
+    def execute(self):
+        self._redis._check()
+        if any(self._redis.lists.get(k, []) != v for k, v in self._watched.items()):
+            raise WatchError("watched key modified")
+        for op in self._ops:
+            op()
+
+
+class _Cache:
+    def __init__(self, redis):
+        self.redis = redis
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(sm, "get_cache", lambda: _Cache(redis))
+    return redis
+
+
+def test_history_is_shared_between_workers(fake_redis):
+    worker_a = SessionManager(RedisSessionStore())
+    worker_b = SessionManager(RedisSessionStore())
+
+    worker_a.append("s1", "Bonjour", "Salut !")
+    worker_b.append("s1", "Quels métiers ?", "Ingénieur, médecin…")
+
+    history = worker_a.get_history("s1")
+    assert [m["content"] for m in history] == ["Bonjour", "Salut !", "Quels métiers ?", "Ingénieur, médecin…"]
+    assert fake_redis.ttls["aida:session:s1"] == sm.SESSION_TTL
+
+
+def test_history_is_capped(fake_redis):
+    manager = SessionManager(RedisSessionStore())
+    for i in range(MAX_HISTORY):
+        manager.append("s1", f"q{i}", f"r{i}")
+
+    history = manager.get_history("s1")
+    assert len(history) == MAX_HISTORY
+    assert history[-1]["content"] == f"r{MAX_HISTORY - 1}"
+
+
+def test_seeded_history_is_persisted(fake_redis):
+    manager = SessionManager(RedisSessionStore())
+    client_history = [
+        {"role": "user", "content": "Bonjour"},
+        {"role": "assistant", "content": "Salut !"},
+        {"role": "system", "content": "ignoré"},
+    ]
+
+    seeded = manager.seed_from_client("s1", client_history)
+    manager.append("s1", "Et après ?", "Le lycée.")
+
+    assert len(seeded) == 2
+    assert [m["content"] for m in manager.get_history("s1")] == ["Bonjour", "Salut !", "Et après ?", "Le lycée."]
+
+
+def test_falls_back_to_memory_when_redis_fails(fake_redis):
+    fake_redis.fail = True
+    manager = SessionManager(RedisSessionStore())
+
+    manager.append("s1", "Bonjour", "Salut !")
+
+    assert len(manager.get_history("s1")) == 2
+    manager.clear("s1")
+    assert manager.get_history("s1") == []
+
+
+def _msg(content: str) -> dict:
+    return {"role": "user", "content": content}
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(memory_budget_bytes=3 * 1024)
+    store.extend("a", [_msg("1")])
+    store.extend("b", [_msg("2")])
+    store.extend("c", [_msg("3")])
+    store.get("a")  # la lecture rafraichit la recence
+    store.extend("d", [_msg("4")])
+
+    assert store.get("b") == []
+    assert store.get("a") == [_msg("1")]
+    assert store.size_bytes <= 3 * 1024
+
+
+def test_memory_store_ring_buffer_keeps_size_accounting():
+    store = MemorySessionStore(memory_budget_bytes=10 * 1024 * 1024)
+    for i in range(MAX_HISTORY * 3):
+        store.extend("a", [_msg("x" * (i % 7))])
+    size_before = store.size_bytes
+
+    history = store.get("a")
+    assert len(history) == MAX_HISTORY
+    assert history[-1]["content"] == "x" * ((MAX_HISTORY * 3 - 1) % 7)
+
+    store.delete("a")
+    assert store.size_bytes == 0
+    assert size_before > 0
+
+
+def test_redis_fold_replaces_head_with_summary(fake_redis):
+    manager = SessionManager(RedisSessionStore())
+    for i in range(4):
+        manager.append("s1", f"q{i}", f"r{i}")
+    history = manager.get_history("s1")
+
+    assert manager.fold("s1", history[:4], "L'élève hésite entre droit et médecine.")
+
+    assert [m["content"] for m in manager.get_history("s1")] == ["q2", "r2", "q3", "r3"]
+    assert manager.get_summary("s1") == "L'élève hésite entre droit et médecine."
+    manager.clear("s1")
+    assert manager.get_summary("s1") == ""
+
+
+def test_redis_fold_aborts_when_head_changed(fake_redis, monkeypatch):
+    manager = SessionManager(RedisSessionStore())
+    for i in range(MAX_HISTORY // 2):
+        manager.append("s1", f"q{i}", f"r{i}")
+    folded = manager.get_history("s1")[:4]
+
+    # Un autre worker ajoute un échange pendant la lecture de la tête :
+    # la liste est retronquée à MAX_HISTORY et q0/r0 disparaissent
+    real_lrange = FakePipeline.lrange
+
+    def concurrent_lrange(self, key, start, end):
+        head = real_lrange(self, key, start, end)
+        SessionManager(RedisSessionStore()).append("s1", "q5", "r5")
+        return head
+
+    monkeypatch.setattr(FakePipeline, "lrange", concurrent_lrange)
+
+    assert not manager.fold("s1", folded, "résumé")
+    assert manager.get_summary("s1") == ""
+    assert len(manager.get_history("s1")) == MAX_HISTORY
+
+
+def test_memory_store_fold_keeps_size_accounting():
+    store = MemorySessionStore(memory_budget_bytes=10 * 1024 * 1024)
+    store.extend("a", [_msg(f"m{i}") for i in range(6)])
+    size_before = store.size_bytes
+
+    assert not store.fold("a", [_msg("autre")], "résumé")
+    assert store.fold("a", [_msg("m0"), _msg("m1")], "résumé")
+
+    assert store.get("a") == [_msg(f"m{i}") for i in range(2, 6)]
+    assert store.get_summary("a") == "résumé"
+    assert store.size_bytes != size_before
+    store.delete("a")
+    assert store.size_bytes == 0
+    assert store.get_summary("a") == ""
@@ -0,0 +1,65 @@
+"""Tests du TokenBudgetManager (répartition du contexte AÏDA)."""
+
+from app.services.llm.token_budget import (
+    MAX_TURN_TOKENS,
+    TokenBudgetManager,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+
+
+def _entry(i: int, size: int = 200) -> dict:
+    return {"category": "ecoles", "title": f"École {i}", "content": "x" * size}
+
+
+def _history(n: int, size: int = 100) -> list[dict]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"{i} " + "m" * size}
+        for i in range(n)
+    ]
+
+
+def test_truncate_to_tokens_cuts_on_word_boundary():
+    text = "mot " * 100
+    truncated = truncate_to_tokens(text, 10)
+    assert truncated.endswith("…")
+    assert estimate_tokens(truncated) <= 10
+
+
+def test_everything_fits_in_large_budget():
+    plan = TokenBudgetManager(budget=100_000).fit("prompt", "question", _history(4), [_entry(1), _entry(2)])
+
+    assert len(plan["history"]) == 4
+    assert len(plan["kb_entries"]) == 2
+    assert plan["message"] == "question"
+
+
+def test_trims_oldest_turns_and_lowest_ranked_snippets():
+    manager = TokenBudgetManager(budget=400)
+    entries = [_entry(i) for i in range(6)]
+    history = _history(10)
+
+    plan = manager.fit("p" * 350, "question", history, entries)
+
+    assert plan["allocation"]["total"] <= 400
+    assert 0 < len(plan["history"]) < len(history)
+    # Les messages conservés sont les plus récents, dans l'ordre
+    assert plan["history"][-1] == history[-1]
+    assert 0 < len(plan["kb_entries"]) < len(entries)
+    assert plan["kb_entries"][0] is entries[0]
+
+
+def test_long_message_and_old_turns_are_shortened():
+    manager = TokenBudgetManager(budget=3000)
+    long_turn = [{"role": "assistant", "content": "mot " * 2000}]
+
+    plan = manager.fit("prompt", "question " * 400, long_turn, [])
+
+    assert estimate_tokens(plan["message"]) <= 3000 * 0.4
+    assert estimate_tokens(plan["history"][0]["content"]) <= MAX_TURN_TOKENS
+
+
+def test_full_kb_is_left_untouched():
+    plan = TokenBudgetManager(budget=3000).fit("prompt", "question", [], None)
+
+    assert plan["kb_entries"] is None
@@ -0,0 +1,110 @@
+"""Tests du TranscriptSink (transcriptions du chat écrites par lots)."""
+
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.llm.session_manager import MemorySessionStore, SessionManager
+from app.services.llm.transcript_sink import TRANSCRIPTS_METRIC, TranscriptSink
+from app.services.llm_service import LLMService
+
+
+class RecordingWriter:
+    def __init__(self, fail: bool = False):
+        self.batches: list[list[dict]] = []
+        self.fail = fail
+
+    def __call__(self, rows):
+        if self.fail:
+            raise ConnectionError("supabase down")
+        self.batches.append(rows)
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _record(sink: TranscriptSink, count: int) -> None:
+    for i in range(count):
+        sink.record("s1", f"Question {i}", f"Réponse {i}", "llm", user_id="u1")
+
+
+async def test_full_batches_are_written_without_waiting_for_interval():
+    writer = RecordingWriter()
+    sink = TranscriptSink(writer, batch_size=3, flush_interval=60, max_buffered=100, enabled=True)
+    sink.start()
+
+    _record(sink, 6)
+    await asyncio.sleep(0.05)
+    assert [len(b) for b in writer.batches] == [3, 3]
+
+    # Arrêt : le reliquat est écrit
+    _record(sink, 1)
+    await sink.stop()
+    assert [len(b) for b in writer.batches] == [3, 3, 1]
+    assert writer.batches[1][0]["user_message"] == "Question 3"
+    assert metrics.count(TRANSCRIPTS_METRIC, outcome="written") == 7
+
+
+async def test_partial_batch_is_written_after_interval():
+    writer = RecordingWriter()
+    sink = TranscriptSink(writer, batch_size=50, flush_interval=0.05, max_buffered=100, enabled=True)
+    sink.start()
+
+    _record(sink, 2)
+    await asyncio.sleep(0.12)
+
+    assert [len(b) for b in writer.batches] == [2]
+    await sink.stop()
+
+
+def test_buffer_is_bounded_and_drops_are_counted():
+    sink = TranscriptSink(RecordingWriter(), batch_size=50, flush_interval=60, max_buffered=2, enabled=True)
+
+    _record(sink, 5)
+
+    assert len(sink) == 2
+    assert metrics.count(TRANSCRIPTS_METRIC, outcome="dropped") == 3
+
+
+async def test_write_failure_is_counted_not_raised():
+    sink = TranscriptSink(RecordingWriter(fail=True), batch_size=2, flush_interval=60, max_buffered=10, enabled=True)
+
+    _record(sink, 3)
+    await sink.flush()
+
+    assert len(sink) == 0
+    assert metrics.count(TRANSCRIPTS_METRIC, outcome="failed") == 3
+
+
+def test_disabled_sink_records_nothing():
+    sink = TranscriptSink(RecordingWriter(), enabled=False)
+    _record(sink, 3)
+    assert len(sink) == 0
+
+
+class FakeProvider:
+    async def complete(self, messages, mode="complete"):
+        return "Réponse LLM"
+
+
+async def test_service_transcribes_each_turn():
+    writer = RecordingWriter()
+    svc = LLMService()
+    svc._provider = FakeProvider()
+    svc._sessions = SessionManager(MemorySessionStore(memory_budget_bytes=1024 * 1024))
+    svc._build_messages = lambda message, history, context, summary="": [{"role": "user", "content": message}]
+    svc._transcripts = TranscriptSink(writer, batch_size=10, flush_interval=60, max_buffered=10, enabled=True)
+
+    await svc.chat("Quels métiers pour un profil Social ?", "s1", user_id="u1")
+    await svc.chat("Raconte-moi une blague drôle", "s1", user_id="u1")
+    await svc._transcripts.flush()
+
+    rows = writer.batches[0]
+    assert [(r["path"], r["intent"]) for r in rows] == [("llm", None), ("off_domain", "divertissement")]
+    assert rows[0]["assistant_reply"] == "Réponse LLM"
+    assert rows[0]["user_id"] == "u1" and rows[0]["created_at"]